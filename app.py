@@ -7,6 +7,7 @@ import os
 from flask import Flask, render_template, send_from_directory, redirect, url_for, flash
 from flask_login import LoginManager, login_required, current_user
 from models import db, User
+from utils.cache import load_cached_user
 from argon2 import PasswordHasher
 from functools import wraps
 from flask_mail import Mail
@@ -14,11 +15,10 @@ from datetime import datetime
 from dotenv import load_dotenv
 from werkzeug.utils import secure_filename
 from flask_wtf.csrf import CSRFProtect
-import psycopg2  # PostgreSQL adapter
-from sqlalchemy import create_engine
 
 # Import the register_routes function from routes module
 from routes import register_routes
+from cli import register_commands
 
 # Import Supabase client 
 from supabase_client import supabase, get_db_url
@@ -62,6 +62,83 @@ def create_app():
     
     app.config['MAX_CONTENT_LENGTH'] = 16 * 1024 * 1024  # Limit uploads to 16MB
 
+    # Outbound mail - 'thread' sends queued mail in-process after the commit
+    # that queued it, 'external' leaves it for `flask send-queued-mail`
+    app.config['MAIL_QUEUE_RUNNER'] = os.environ.get(
+        'MAIL_QUEUE_RUNNER', 'external' if os.environ.get('VERCEL', False) else 'thread'
+    )
+    app.config['MAIL_QUEUE_BATCH_SIZE'] = int(os.environ.get('MAIL_QUEUE_BATCH_SIZE', '50'))
+    app.config['MAIL_QUEUE_MAX_ATTEMPTS'] = int(os.environ.get('MAIL_QUEUE_MAX_ATTEMPTS', '5'))
+    app.config['MAIL_QUEUE_RETRY_BACKOFF'] = int(os.environ.get('MAIL_QUEUE_RETRY_BACKOFF', '30'))
+
+    # Background report exports - 'thread' builds them in-process, 'external'
+    # leaves them for `flask run-report-jobs` (e.g. a cron job on serverless);
+    # jobs still running after REPORT_JOB_TIMEOUT seconds are marked failed
+    app.config['REPORT_JOB_RUNNER'] = os.environ.get(
+        'REPORT_JOB_RUNNER', 'external' if os.environ.get('VERCEL', False) else 'thread'
+    )
+    app.config['REPORT_JOB_WORKERS'] = int(os.environ.get('REPORT_JOB_WORKERS', '2'))
+    app.config['REPORT_JOB_TIMEOUT'] = int(os.environ.get('REPORT_JOB_TIMEOUT', '900'))
+
+    # Login rate limiting - 'memory' keeps failures per process, 'database'
+    # shares them between instances through the login_throttle table
+    app.config['LOGIN_RATE_LIMIT_BACKEND'] = os.environ.get('LOGIN_RATE_LIMIT_BACKEND', 'memory')
+    app.config['LOGIN_RATE_LIMIT_ATTEMPTS'] = int(os.environ.get('LOGIN_RATE_LIMIT_ATTEMPTS', '5'))
+    app.config['LOGIN_RATE_LIMIT_WINDOW'] = int(os.environ.get('LOGIN_RATE_LIMIT_WINDOW', '900'))
+
+    # Login audit rows - 'batch' writes them from a background thread,
+    # 'sync' inserts each one during the request (serverless)
+    app.config['LOGIN_AUDIT_WRITER'] = os.environ.get(
+        'LOGIN_AUDIT_WRITER', 'sync' if os.environ.get('VERCEL', False) else 'batch'
+    )
+    app.config['LOGIN_AUDIT_BATCH_SIZE'] = int(os.environ.get('LOGIN_AUDIT_BATCH_SIZE', '50'))
+    app.config['LOGIN_AUDIT_FLUSH_SECONDS'] = float(os.environ.get('LOGIN_AUDIT_FLUSH_SECONDS', '2'))
+
+    # Argon2 costs (unset keeps argon2-cffi's defaults; see
+    # `python -m benchmarks.argon2_calibrate`) and the hashing concurrency cap
+    for name in ('ARGON2_TIME_COST', 'ARGON2_MEMORY_COST', 'ARGON2_PARALLELISM'):
+        app.config[name] = int(os.environ[name]) if os.environ.get(name) else None
+    app.config['PASSWORD_HASH_CONCURRENCY'] = int(os.environ.get('PASSWORD_HASH_CONCURRENCY', str(os.cpu_count() or 2)))
+    app.config['PASSWORD_HASH_QUEUE_TIMEOUT'] = float(os.environ.get('PASSWORD_HASH_QUEUE_TIMEOUT', '5'))
+
+    # Days of raw login attempts kept by `flask compact-login-attempts`
+    app.config['LOGIN_ATTEMPT_RETENTION_DAYS'] = int(os.environ.get('LOGIN_ATTEMPT_RETENTION_DAYS', '90'))
+
+    # Seconds a computed dashboard is reused; 0 disables the cache
+    app.config['DASHBOARD_CACHE_TTL'] = int(os.environ.get('DASHBOARD_CACHE_TTL', '300'))
+
+    # Seconds the logged-in user and profile are reused between requests; 0 disables the cache
+    app.config['USER_CACHE_TTL'] = int(os.environ.get('USER_CACHE_TTL', '60'))
+
+    # Seconds the chatbot reuses a user's context for its prompt; 0 disables the cache
+    app.config['CHATBOT_CONTEXT_CACHE_TTL'] = int(os.environ.get('CHATBOT_CONTEXT_CACHE_TTL', '300'))
+
+    # Seconds a chatbot answer to a generic policy question is shared between users; 0 disables the cache
+    app.config['CHATBOT_RESPONSE_CACHE_TTL'] = int(os.environ.get('CHATBOT_RESPONSE_CACHE_TTL', '3600'))
+
+    # Gemini calls - concurrent calls allowed, seconds to wait for a free slot,
+    # seconds per call, and consecutive failures that stop calls for
+    # GEMINI_BREAKER_RESET seconds
+    app.config['GEMINI_MAX_CONCURRENCY'] = int(os.environ.get('GEMINI_MAX_CONCURRENCY', '4'))
+    app.config['GEMINI_QUEUE_TIMEOUT'] = float(os.environ.get('GEMINI_QUEUE_TIMEOUT', '2'))
+    app.config['GEMINI_TIMEOUT'] = float(os.environ.get('GEMINI_TIMEOUT', '20'))
+    app.config['GEMINI_BREAKER_FAILURES'] = int(os.environ.get('GEMINI_BREAKER_FAILURES', '5'))
+    app.config['GEMINI_BREAKER_RESET'] = float(os.environ.get('GEMINI_BREAKER_RESET', '30'))
+
+    # Chatbot history - exchanges and tokens kept per conversation before older
+    # turns are folded into a summary; 'database' keeps it across restarts once
+    # `flask create-tables` has created chat_conversation (memory until then)
+    app.config['CHATBOT_HISTORY_STORE'] = os.environ.get(
+        'CHATBOT_HISTORY_STORE', 'database' if os.environ.get('VERCEL', False) else 'memory'
+    )
+    app.config['CHATBOT_HISTORY_CONVERSATIONS'] = int(os.environ.get('CHATBOT_HISTORY_CONVERSATIONS', '1000'))
+    app.config['CHATBOT_HISTORY_TURNS'] = int(os.environ.get('CHATBOT_HISTORY_TURNS', '6'))
+    app.config['CHATBOT_HISTORY_TOKENS'] = int(os.environ.get('CHATBOT_HISTORY_TOKENS', '1500'))
+    app.config['CHATBOT_SUMMARY_TOKENS'] = int(os.environ.get('CHATBOT_SUMMARY_TOKENS', '300'))
+
+    # Recent chatbot messages whose prompt size and latency are kept for /admin/metrics/chatbot
+    app.config['CHATBOT_METRICS_SAMPLES'] = int(os.environ.get('CHATBOT_METRICS_SAMPLES', '500'))
+
     # Initialize extensions
     mail = Mail(app)
 
@@ -73,11 +150,39 @@ def create_app():
     # User loader for Flask-Login
     @login_manager.user_loader
     def load_user(user_id):
-        return User.query.get(int(user_id))
+        return load_cached_user(int(user_id), ttl=app.config['USER_CACHE_TTL'])
 
     # Initialize database
     db.init_app(app)
 
+    # Invalidate cached pages and users when their rows change
+    from utils.cache import register_cache_invalidation
+    register_cache_invalidation()
+
+    # Send queued mail after the commits that queue it
+    from utils.mail_queue import init_mail_queue
+    init_mail_queue(app)
+
+    # Apply the Gemini call limits
+    from utils.upstream import init_gemini_guard
+    init_gemini_guard(app)
+
+    # Apply the chatbot history limits
+    from utils.conversations import init_conversation_store
+    init_conversation_store(app)
+
+    # Size the chatbot metrics buffer
+    from utils.chatbot_metrics import init_chatbot_metrics
+    init_chatbot_metrics(app)
+
+    # Apply the password hashing settings
+    from utils.passwords import init_password_hashing
+    init_password_hashing(app)
+
+    # Initialize login rate limiting
+    from utils.rate_limit import init_login_rate_limit
+    init_login_rate_limit(app)
+
     # Initialize Argon2 password hasher
     ph = PasswordHasher()
 
@@ -118,10 +223,16 @@ def create_app():
         @admin_required
         def protected_migration():
             try:
+                # Create tables added to the models since the database was set up
+                from utils.schema import create_missing_tables
+                created = create_missing_tables()
+                if created:
+                    flash(f"Created tables: {', '.join(created)}", 'info')
+                
                 # Use SQLAlchemy execute method instead of SQLite-specific operations
-                with db.engine.connect() as connection:
+                with db.engine.begin() as connection:
                     # Add created_at column to payroll_deduction if it doesn't exist
-                    connection.execute("""
+                    connection.execute(db.text("""
                         DO $$
                         BEGIN
                             IF NOT EXISTS (
@@ -132,7 +243,7 @@ def create_app():
                             END IF;
                         END
                         $$;
-                    """)
+                    """))
                 flash('Database migrations executed successfully!', 'success')
             except Exception as e:
                 flash(f'Error running migrations: {str(e)}', 'danger')
@@ -144,6 +255,9 @@ def create_app():
     # Register routes
     register_routes(app)
 
+    # Register CLI commands
+    register_commands(app)
+
     return app
 
 # Create database tables - for local development
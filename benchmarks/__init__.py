@@ -0,0 +1,12 @@
+"""
+Benchmarks for the HR System.
+Each module is runnable with `python -m benchmarks.<name>` from the project root.
+"""
+
+import os
+
+
+def configure_environment(database_url):
+    """Point the app at a local benchmark database before it is imported"""
+    os.environ['POSTGRES_URL'] = database_url
+    os.environ.pop('POSTGRES_URL_NON_POOLING', None)
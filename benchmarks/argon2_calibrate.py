@@ -0,0 +1,158 @@
+"""
+Argon2 calibration for the HR System.
+
+Measures how long one argon2 hash takes on this machine for a grid of
+memory and time costs and suggests the strongest parameters that stay
+under a latency target. It then measures login throughput at the
+suggested parameters with several threads hashing at once, which is the
+basis for PASSWORD_HASH_CONCURRENCY.
+
+The suggestion is printed as the environment variables read by the app;
+hashes made with the old parameters are upgraded on each user's next login.
+
+Usage:
+    python -m benchmarks.argon2_calibrate [--target-ms 250] [--threads 1,2,4,8]
+"""
+
+import os
+import sys
+import json
+import time
+import argparse
+import statistics
+from concurrent.futures import ThreadPoolExecutor
+
+from argon2 import PasswordHasher
+
+# Memory costs in KiB: 19 MiB (OWASP minimum) up to 256 MiB
+DEFAULT_MEMORY_COSTS = [19456, 32768, 65536, 131072, 262144]
+DEFAULT_TIME_COSTS = [1, 2, 3, 4, 6, 8]
+
+PASSWORD = 'calibration-password'
+
+
+def time_hash(hasher, samples):
+    """Median seconds for one hash with the given hasher"""
+    hasher.hash(PASSWORD)
+    timings = []
+    for _ in range(samples):
+        started = time.perf_counter()
+        hasher.hash(PASSWORD)
+        timings.append(time.perf_counter() - started)
+    return statistics.median(timings)
+
+
+def calibrate(memory_costs, time_costs, parallelism, target_ms, samples=3):
+    """
+    Time every (memory_cost, time_cost) pair up to the target
+
+    Time costs for a memory cost stop at the first one over the target,
+    since hashing time grows with both.
+
+    Returns:
+        tuple: (all measurements, best measurement under the target or None)
+    """
+    results = []
+    best = None
+    for memory_cost in memory_costs:
+        for time_cost in time_costs:
+            hasher = PasswordHasher(time_cost=time_cost, memory_cost=memory_cost, parallelism=parallelism)
+            ms = time_hash(hasher, samples) * 1000
+            result = {'memory_cost': memory_cost, 'time_cost': time_cost, 'parallelism': parallelism, 'ms': round(ms, 1)}
+            results.append(result)
+            print(f"memory {memory_cost // 1024:>4} MiB  time {time_cost:>2}  parallelism {parallelism}  {ms:>8.1f} ms")
+            if ms > target_ms:
+                break
+            # Prefer memory hardness, then iterations
+            if best is None or (memory_cost, time_cost) > (best['memory_cost'], best['time_cost']):
+                best = result
+    return results, best
+
+
+def throughput(hasher, threads, duration):
+    """
+    Hashes per second with `threads` threads hashing for `duration` seconds
+
+    Returns:
+        dict: threads, hashes_per_second and the median latency of one hash
+    """
+    deadline = time.perf_counter() + duration
+
+    def worker():
+        timings = []
+        while time.perf_counter() < deadline:
+            started = time.perf_counter()
+            hasher.hash(PASSWORD)
+            timings.append(time.perf_counter() - started)
+        return timings
+
+    started = time.perf_counter()
+    with ThreadPoolExecutor(max_workers=threads) as executor:
+        timings = [timing for result in executor.map(lambda _: worker(), range(threads)) for timing in result]
+    elapsed = time.perf_counter() - started
+
+    return {
+        'threads': threads,
+        'hashes_per_second': round(len(timings) / elapsed, 1),
+        'median_ms': round(statistics.median(timings) * 1000, 1) if timings else None,
+    }
+
+
+def main(argv=None):
+    parser = argparse.ArgumentParser(description='Calibrate argon2 costs for this machine.')
+    parser.add_argument('--target-ms', type=float, default=250.0, help='Longest acceptable time for one hash.')
+    parser.add_argument('--memory-costs', default=','.join(str(cost) for cost in DEFAULT_MEMORY_COSTS),
+                        help='Comma separated memory costs in KiB.')
+    parser.add_argument('--time-costs', default=','.join(str(cost) for cost in DEFAULT_TIME_COSTS),
+                        help='Comma separated time costs.')
+    parser.add_argument('--parallelism', type=int, default=PasswordHasher().parallelism,
+                        help='Argon2 lanes per hash.')
+    parser.add_argument('--samples', type=int, default=3, help='Hashes timed per parameter pair.')
+    parser.add_argument('--threads', default=','.join(str(count) for count in sorted({1, 2, os.cpu_count() or 1, 2 * (os.cpu_count() or 1)})),
+                        help='Comma separated thread counts for the throughput run.')
+    parser.add_argument('--duration', type=float, default=3.0, help='Seconds per throughput run.')
+    parser.add_argument('--output', help='Write results to this JSON file.')
+    args = parser.parse_args(argv)
+
+    memory_costs = [int(cost) for cost in args.memory_costs.split(',') if cost]
+    time_costs = [int(cost) for cost in args.time_costs.split(',') if cost]
+
+    print(f"Timing argon2 on {os.cpu_count()} CPUs, target {args.target_ms:.0f} ms per hash")
+    results, best = calibrate(memory_costs, time_costs, args.parallelism, args.target_ms, samples=args.samples)
+    if best is None:
+        print("No parameters hash within the target; raise --target-ms or lower the costs.")
+        return 1
+
+    print(f"\nThroughput at memory {best['memory_cost']} KiB, time {best['time_cost']}:")
+    hasher = PasswordHasher(time_cost=best['time_cost'], memory_cost=best['memory_cost'], parallelism=best['parallelism'])
+    runs = []
+    for threads in [int(count) for count in args.threads.split(',') if count]:
+        run = throughput(hasher, threads, args.duration)
+        runs.append(run)
+        print(f"{threads:>3} threads  {run['hashes_per_second']:>7.1f} hashes/s  median {run['median_ms']:>8.1f} ms")
+
+    # The smallest thread count within 10% of the best throughput; more
+    # concurrent hashes only add latency
+    peak = max(run['hashes_per_second'] for run in runs)
+    concurrency = min(run['threads'] for run in runs if run['hashes_per_second'] >= peak * 0.9)
+
+    print("\nSuggested settings:")
+    print(f"ARGON2_TIME_COST={best['time_cost']}")
+    print(f"ARGON2_MEMORY_COST={best['memory_cost']}")
+    print(f"ARGON2_PARALLELISM={best['parallelism']}")
+    print(f"PASSWORD_HASH_CONCURRENCY={concurrency}")
+
+    if args.output:
+        with open(args.output, 'w') as output:
+            json.dump({
+                'cpus': os.cpu_count(),
+                'target_ms': args.target_ms,
+                'grid': results,
+                'suggested': dict(best, concurrency=concurrency),
+                'throughput': runs,
+            }, output, indent=2)
+    return 0
+
+
+if __name__ == '__main__':
+    sys.exit(main())
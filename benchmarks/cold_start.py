@@ -0,0 +1,122 @@
+"""
+Cold start benchmark for the HR System.
+
+Starts a fresh Python process per run and times importing a deployment
+entry point (index.py for Vercel, wsgi.py for Gunicorn) and serving its
+first request, which is what a serverless cold start pays before the
+first response. It also records how many modules were loaded and whether
+the Gemini and Supabase SDKs were imported along the way.
+
+Usage:
+    python -m benchmarks.cold_start [--runs 7] [--entry index --entry wsgi] [--output cold.json]
+    python -m benchmarks.cold_start --compare cold.json
+"""
+
+import os
+import sys
+import json
+import argparse
+import tempfile
+import statistics
+import subprocess
+
+from benchmarks import configure_environment
+
+# entry module -> (attribute holding the app, path of the first request)
+ENTRY_POINTS = {
+    'index': ('app', '/health'),
+    'wsgi': ('application', '/login'),
+}
+
+# SDKs only needed by the chatbot and Supabase storage
+WATCHED_MODULES = ['google.genai', 'supabase', 'reportlab', 'pandas', 'psycopg2']
+
+CHILD = """
+import sys, time, json, importlib
+started = time.perf_counter()
+module = importlib.import_module({entry!r})
+imported = time.perf_counter()
+response = getattr(module, {attribute!r}).test_client().get({path!r})
+served = time.perf_counter()
+print(json.dumps({{
+    'import_ms': (imported - started) * 1000,
+    'first_request_ms': (served - imported) * 1000,
+    'status': response.status_code,
+    'modules': len(sys.modules),
+    'loaded': [name for name in {watched!r} if name in sys.modules],
+}}))
+"""
+
+
+def run_once(entry, root):
+    """Time one cold start of an entry point in a new interpreter"""
+    attribute, path = ENTRY_POINTS[entry]
+    code = CHILD.format(entry=entry, attribute=attribute, path=path, watched=WATCHED_MODULES)
+    result = subprocess.run(
+        [sys.executable, '-c', code], cwd=root, env=os.environ.copy(),
+        capture_output=True, text=True, check=True
+    )
+    return json.loads(result.stdout.strip().splitlines()[-1])
+
+
+def measure(entry, runs, root):
+    """
+    Median timings over several cold starts
+
+    Returns:
+        dict: import_ms, first_request_ms and total_ms medians, module count
+        and the watched SDKs the entry point loaded
+    """
+    samples = [run_once(entry, root) for _ in range(runs)]
+    import_ms = statistics.median(sample['import_ms'] for sample in samples)
+    first_request_ms = statistics.median(sample['first_request_ms'] for sample in samples)
+    return {
+        'entry': entry,
+        'runs': runs,
+        'import_ms': round(import_ms, 1),
+        'first_request_ms': round(first_request_ms, 1),
+        'total_ms': round(statistics.median(sample['import_ms'] + sample['first_request_ms'] for sample in samples), 1),
+        'status': samples[-1]['status'],
+        'modules': samples[-1]['modules'],
+        'loaded': samples[-1]['loaded'],
+    }
+
+
+def main(argv=None):
+    parser = argparse.ArgumentParser(description='Measure cold start time of the deployment entry points.')
+    parser.add_argument('--runs', type=int, default=7, help='Fresh processes per entry point.')
+    parser.add_argument('--entry', action='append', choices=sorted(ENTRY_POINTS),
+                        help='Entry point to measure (repeatable, default all).')
+    parser.add_argument('--database-url', help='Database the app is pointed at (default a temporary SQLite file).')
+    parser.add_argument('--output', help='Write results to this JSON file.')
+    parser.add_argument('--compare', help='Earlier --output file to compare against.')
+    args = parser.parse_args(argv)
+
+    root = os.path.dirname(os.path.dirname(os.path.abspath(__file__)))
+    workdir = tempfile.mkdtemp(prefix='hr_cold_start_')
+    configure_environment(args.database_url or f"sqlite:///{os.path.join(workdir, 'cold_start.db')}")
+
+    previous = {}
+    if args.compare:
+        with open(args.compare) as handle:
+            previous = {result['entry']: result for result in json.load(handle)}
+
+    results = []
+    for entry in args.entry or sorted(ENTRY_POINTS):
+        result = measure(entry, args.runs, root)
+        results.append(result)
+        line = (f"{entry:<6} import {result['import_ms']:>7.1f} ms  first request {result['first_request_ms']:>6.1f} ms  "
+                f"total {result['total_ms']:>7.1f} ms  {result['modules']} modules  loaded: {', '.join(result['loaded']) or '-'}")
+        if entry in previous:
+            before = previous[entry]['total_ms']
+            line += f"  ({(result['total_ms'] - before) / before * 100:+.0f}% vs {before:.1f} ms)"
+        print(line)
+
+    if args.output:
+        with open(args.output, 'w') as handle:
+            json.dump(results, handle, indent=2)
+    return 0
+
+
+if __name__ == '__main__':
+    sys.exit(main())
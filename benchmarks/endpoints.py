@@ -0,0 +1,211 @@
+"""
+Endpoint benchmark for the HR System.
+
+Boots the app against a seeded local database and requests the hot pages
+with the Flask test client, recording wall time, the number of SQL
+statements and the peak Python memory allocated per request. Each route is
+checked against the budgets in endpoint_budgets.json and the run exits
+with status 1 when any budget is exceeded, so it can gate a CI job.
+
+Usage:
+    python -m benchmarks.endpoints [--scale small] [--repeat 5] [--output results.json]
+    python -m benchmarks.endpoints --database-url sqlite:////tmp/hr_load.db --only dashboard
+"""
+
+import os
+import sys
+import json
+import time
+import argparse
+import tempfile
+import statistics
+import tracemalloc
+
+from benchmarks import configure_environment
+
+DEFAULT_BUDGETS = os.path.join(os.path.dirname(os.path.abspath(__file__)), 'endpoint_budgets.json')
+
+# (name, role of the requesting user, path)
+SCENARIOS = [
+    ('dashboard_hr', 'hr', '/dashboard'),
+    ('dashboard_employee', 'employee', '/dashboard'),
+    ('dashboard_widget_stats', 'employee', '/api/dashboard/stats'),
+    ('dashboard_widget_activities', 'employee', '/api/dashboard/activities'),
+    ('dashboard_widget_attendance_chart', 'employee', '/api/dashboard/attendance_chart'),
+    ('dashboard_widget_teaching_units', 'employee', '/api/dashboard/teaching_units'),
+    ('attendance_hr', 'hr', '/attendance'),
+    ('attendance_employee', 'employee', '/attendance'),
+    ('attendance_analytics', 'hr', '/attendance/analytics'),
+    ('payroll_hr', 'hr', '/payroll'),
+    ('payroll_employee', 'employee', '/payroll'),
+    ('reports_index', 'hr', '/hr/reports'),
+    ('reports_employee_demographics', 'hr', '/hr/reports/employee-demographics'),
+    ('reports_time_off_analysis', 'hr', '/hr/reports/time-off-analysis'),
+    ('reports_training_analytics', 'hr', '/hr/reports/training-analytics'),
+    ('reports_salary', 'hr', '/hr/reports/salary'),
+]
+
+
+def load_budgets(path):
+    """
+    Read per-route budgets
+
+    The file has a `default` entry and optional per-scenario overrides under
+    `routes`; each may set max_queries, max_ms and max_peak_kb.
+    """
+    with open(path) as budget_file:
+        config = json.load(budget_file)
+
+    default = config.get('default', {})
+    return {
+        name: dict(default, **config.get('routes', {}).get(name, {}))
+        for name, _, _ in SCENARIOS
+    }
+
+
+class QueryCounter:
+    """Counts SQL statements sent through an engine"""
+
+    def __init__(self, engine):
+        from sqlalchemy import event
+
+        self.count = 0
+        event.listen(engine, 'before_cursor_execute', self._on_execute)
+
+    def _on_execute(self, *args):
+        self.count += 1
+
+
+def _client_for(app, user_id):
+    """Test client with a logged-in session for the given user"""
+    client = app.test_client()
+    with client.session_transaction() as session:
+        session['_user_id'] = str(user_id)
+        session['_fresh'] = True
+    return client
+
+
+def measure(client, path, counter, repeat):
+    """
+    Request a path and collect timing, query count and peak memory
+
+    The first request warms template and query caches. Timed runs are made
+    without tracemalloc, which would otherwise inflate the wall time; one
+    extra traced run records queries and peak allocations.
+    """
+    response = client.get(path)
+    status = response.status_code
+
+    timings = []
+    for _ in range(repeat):
+        started = time.perf_counter()
+        client.get(path)
+        timings.append((time.perf_counter() - started) * 1000)
+
+    tracemalloc.start()
+    counter.count = 0
+    client.get(path)
+    queries = counter.count
+    _, peak = tracemalloc.get_traced_memory()
+    tracemalloc.stop()
+
+    return {
+        'status': status,
+        'median_ms': round(statistics.median(timings), 1),
+        'max_ms': round(max(timings), 1),
+        'queries': queries,
+        'peak_kb': round(peak / 1024, 1),
+    }
+
+
+def check_budget(result, budget):
+    """Return a list of budget violations for one result"""
+    violations = []
+    if result['status'] != 200:
+        violations.append(f"status {result['status']}")
+    if 'max_queries' in budget and result['queries'] > budget['max_queries']:
+        violations.append(f"{result['queries']} queries > {budget['max_queries']}")
+    if 'max_ms' in budget and result['median_ms'] > budget['max_ms']:
+        violations.append(f"{result['median_ms']} ms > {budget['max_ms']} ms")
+    if 'max_peak_kb' in budget and result['peak_kb'] > budget['max_peak_kb']:
+        violations.append(f"{result['peak_kb']} KB peak > {budget['max_peak_kb']} KB")
+    return violations
+
+
+def run(database_url, budgets, repeat=5, only=None):
+    """
+    Benchmark every scenario against an already seeded database
+
+    Returns:
+        list: One result dict per scenario, including any budget violations
+    """
+    configure_environment(database_url)
+    from app import create_app
+    from models import db, User
+
+    app = create_app()
+    app.config['WTF_CSRF_ENABLED'] = False
+    # Budgets cover the computed pages, not per-user cache hits
+    app.config['DASHBOARD_CACHE_TTL'] = 0
+    app.config['USER_CACHE_TTL'] = 0
+
+    with app.app_context():
+        user_ids = {
+            role: User.query.filter_by(role=role).order_by(User.id).first().id
+            for role in ('hr', 'employee')
+        }
+        counter = QueryCounter(db.engine)
+
+    # Requests run outside this app context so each one gets a fresh
+    # session, as in production, instead of sharing an identity map
+    results = []
+    for name, role, path in SCENARIOS:
+        if only and not any(pattern in name for pattern in only):
+            continue
+        client = _client_for(app, user_ids[role])
+        result = dict(name=name, path=path, role=role, **measure(client, path, counter, repeat))
+        result['violations'] = check_budget(result, budgets.get(name, {}))
+        results.append(result)
+        print(f"{name:<32} {result['median_ms']:>9.1f} ms {result['queries']:>6} queries "
+              f"{result['peak_kb'] / 1024:>8.1f} MB  {'FAIL: ' + '; '.join(result['violations']) if result['violations'] else 'ok'}")
+
+    return results
+
+
+def main(argv=None):
+    from benchmarks.synthetic_data import SCALES, generate
+
+    parser = argparse.ArgumentParser(description='Benchmark hot endpoints against per-route budgets.')
+    parser.add_argument('--database-url', help='Use an already seeded database instead of generating one.')
+    parser.add_argument('--scale', choices=sorted(SCALES), default='small', help='Dataset size to generate.')
+    parser.add_argument('--seed', type=int, default=42, help='Random seed for the generated dataset.')
+    parser.add_argument('--budgets', default=DEFAULT_BUDGETS, help='Budget JSON file.')
+    parser.add_argument('--repeat', type=int, default=5, help='Timed requests per route.')
+    parser.add_argument('--only', action='append', help='Only run scenarios whose name contains this text.')
+    parser.add_argument('--output', help='Write results to this JSON file.')
+    args = parser.parse_args(argv)
+
+    budgets = load_budgets(args.budgets)
+
+    with tempfile.TemporaryDirectory() as workdir:
+        database_url = args.database_url
+        if not database_url:
+            database_url = f"sqlite:///{os.path.join(workdir, 'benchmark.db')}"
+            print(f"Seeding a {args.scale} dataset...")
+            generate(database_url, SCALES[args.scale], seed=args.seed, log=lambda line: None)
+
+        results = run(database_url, budgets, repeat=args.repeat, only=args.only)
+
+    if args.output:
+        with open(args.output, 'w') as output:
+            json.dump({'scale': None if args.database_url else args.scale, 'results': results}, output, indent=2)
+
+    failed = [result['name'] for result in results if result['violations']]
+    if failed:
+        print(f"Budget exceeded: {', '.join(failed)}")
+        return 1
+    return 0
+
+
+if __name__ == '__main__':
+    sys.exit(main())
@@ -0,0 +1,145 @@
+"""
+Import time budget for the HR System.
+
+Imports the app in a fresh process with `python -X importtime`, which
+builds it through create_app(), and reports the total import time, the
+slowest top-level packages and the time of a further create_app() call.
+The run is checked against import_budgets.json:
+
+    total_import_ms      wall time of `import app` (includes create_app())
+    create_app_ms        one more create_app() once everything is imported
+    forbidden_modules    modules that must not be imported at startup
+                         because only some requests need them
+
+and exits with status 1 when a budget is exceeded, so it can gate a CI job.
+
+Usage:
+    python -m benchmarks.import_budget [--runs 5] [--top 15] [--output imports.json]
+"""
+
+import os
+import sys
+import json
+import argparse
+import tempfile
+import statistics
+import subprocess
+
+from benchmarks import configure_environment
+
+DEFAULT_BUDGETS = os.path.join(os.path.dirname(os.path.abspath(__file__)), 'import_budgets.json')
+
+CHILD = """
+import sys, time, json
+started = time.perf_counter()
+import app
+imported = time.perf_counter()
+app.create_app()
+created = time.perf_counter()
+print(json.dumps({
+    'total_import_ms': (imported - started) * 1000,
+    'create_app_ms': (created - imported) * 1000,
+    'modules': sorted(sys.modules),
+}))
+"""
+
+
+def parse_importtime(stderr):
+    """
+    Per-package times from `-X importtime` output
+
+    Returns:
+        dict: {top-level package: microseconds}, the self time of each
+        module summed per package, so the values add up to the total
+    """
+    packages = {}
+    for line in stderr.splitlines():
+        if not line.startswith('import time:') or 'cumulative' in line:
+            continue
+        fields = line[len('import time:'):].split('|')
+        if len(fields) != 3:
+            continue
+        package = fields[2].strip().split('.')[0]
+        packages[package] = packages.get(package, 0) + int(fields[0])
+    return packages
+
+
+def run_once(root):
+    result = subprocess.run(
+        [sys.executable, '-X', 'importtime', '-c', CHILD], cwd=root, env=os.environ.copy(),
+        capture_output=True, text=True, check=True
+    )
+    measurement = json.loads(result.stdout.strip().splitlines()[-1])
+    measurement['packages'] = parse_importtime(result.stderr)
+    return measurement
+
+
+def check_budgets(result, budgets):
+    """List of budget violation messages"""
+    failures = []
+    for key in ('total_import_ms', 'create_app_ms'):
+        if key in budgets and result[key] > budgets[key]:
+            failures.append(f"{key} {result[key]:.1f} > {budgets[key]}")
+    for module in budgets.get('forbidden_modules', []):
+        if module in result['loaded_forbidden']:
+            failures.append(f"{module} is imported at startup")
+    return failures
+
+
+def main(argv=None):
+    parser = argparse.ArgumentParser(description='Check app import time against a budget.')
+    parser.add_argument('--runs', type=int, default=5, help='Fresh processes to take the median over.')
+    parser.add_argument('--top', type=int, default=15, help='Slowest packages to list.')
+    parser.add_argument('--budgets', default=DEFAULT_BUDGETS, help='Budget file.')
+    parser.add_argument('--database-url', help='Database the app is pointed at (default a temporary SQLite file).')
+    parser.add_argument('--output', help='Write results to this JSON file.')
+    args = parser.parse_args(argv)
+
+    root = os.path.dirname(os.path.dirname(os.path.abspath(__file__)))
+    workdir = tempfile.mkdtemp(prefix='hr_import_budget_')
+    configure_environment(args.database_url or f"sqlite:///{os.path.join(workdir, 'import_budget.db')}")
+
+    with open(args.budgets) as handle:
+        budgets = json.load(handle)
+
+    samples = [run_once(root) for _ in range(args.runs)]
+    packages = {
+        package: statistics.median(sample['packages'].get(package, 0) for sample in samples) / 1000
+        for package in samples[-1]['packages']
+    }
+    result = {
+        'runs': args.runs,
+        'total_import_ms': round(statistics.median(sample['total_import_ms'] for sample in samples), 1),
+        'create_app_ms': round(statistics.median(sample['create_app_ms'] for sample in samples), 1),
+        'modules': len(samples[-1]['modules']),
+        'loaded_forbidden': [
+            module for module in budgets.get('forbidden_modules', [])
+            if module in samples[-1]['modules']
+        ],
+        'packages': {package: round(ms, 1) for package, ms in sorted(packages.items(), key=lambda item: -item[1])},
+    }
+
+    print(f"import app      {result['total_import_ms']:>8.1f} ms  (budget {budgets.get('total_import_ms', '-')})")
+    print(f"create_app()    {result['create_app_ms']:>8.1f} ms  (budget {budgets.get('create_app_ms', '-')})")
+    print(f"modules loaded  {result['modules']:>8}")
+    print(f"\nSlowest packages (ms spent importing their modules):")
+    for package, ms in list(result['packages'].items())[:args.top]:
+        print(f"  {package:<28} {ms:>8.1f}")
+
+    failures = check_budgets(result, budgets)
+    result['failures'] = failures
+    if args.output:
+        with open(args.output, 'w') as handle:
+            json.dump(result, handle, indent=2)
+
+    if failures:
+        print("\nOver budget:")
+        for failure in failures:
+            print(f"  {failure}")
+        return 1
+    print("\nWithin budget")
+    return 0
+
+
+if __name__ == '__main__':
+    sys.exit(main())
@@ -0,0 +1,252 @@
+"""
+Micro-benchmarks for the CPU hot spots of the HR System.
+
+Times individual functions on synthetic inputs of increasing size
+(1k -> 1M rows by default) and reports how their cost scales:
+
+    attendance_rate            TeachingUnit.attendance_rate over N attendance records
+    leave_calendar             time-off heat map calendar for N leave periods
+    faculty_breakdown          attendance report faculty breakdown over N records
+    calculate_attendance_stats attendance stats for one employee with N records (SQLite)
+    optimized_url              N calls to cloud_config.get_optimized_url
+
+Results are written as JSON so runs from different commits can be compared
+with --compare, which also fails the run when a benchmark got slower than
+--threshold.
+
+Usage:
+    python -m benchmarks.micro [--only leave_calendar] [--sizes 1000,10000] [--output micro.json]
+    python -m benchmarks.micro --compare before.json --output after.json
+"""
+
+import os
+import sys
+import json
+import time
+import random
+import argparse
+import platform
+import tempfile
+import subprocess
+from types import SimpleNamespace
+from datetime import date, datetime, timedelta
+
+from benchmarks import configure_environment
+
+DEFAULT_SIZES = [1000, 10000, 100000, 1000000]
+
+STATUSES = ['present', 'late', 'excused', 'absent']
+STATUS_WEIGHTS = [80, 8, 6, 6]
+
+
+def _statuses(rng, size):
+    return rng.choices(STATUSES, STATUS_WEIGHTS, k=size)
+
+
+def setup_attendance_rate(size, rng, context):
+    return SimpleNamespace(attendances=[SimpleNamespace(status=status) for status in _statuses(rng, size)])
+
+
+def run_attendance_rate(unit):
+    from models import TeachingUnit
+
+    # Call the property getter directly so no database is involved
+    return TeachingUnit.attendance_rate.fget(unit)
+
+
+def setup_leave_calendar(size, rng, context):
+    year = date.today().year
+    periods = []
+    for _ in range(size):
+        start = date(year, 1, 1) + timedelta(days=rng.randint(-20, 364))
+        periods.append((start, start + timedelta(days=min(int(rng.expovariate(0.3)), 20))))
+    return year, periods
+
+
+def run_leave_calendar(state):
+    from routes.reports import _leave_calendar
+
+    year, periods = state
+    return _leave_calendar(year, periods)
+
+
+def setup_faculty_breakdown(size, rng, context):
+    from models import User
+
+    teachers = [User(id=index, username=f'teacher{index}') for index in range(1, 201)]
+    units = [SimpleNamespace(employee=rng.choice(teachers)) for _ in range(1000)]
+    return [
+        SimpleNamespace(teaching_unit=rng.choice(units), status=status, hours=rng.choice((1.0, 1.5, 2.0, 3.0)))
+        for status in _statuses(rng, size)
+    ]
+
+
+def run_faculty_breakdown(attendances):
+    from routes.attendance import _faculty_breakdown
+
+    return _faculty_breakdown(attendances)
+
+
+def setup_calculate_attendance_stats(size, rng, context):
+    from benchmarks.synthetic_data import generate
+
+    # Three users leaves a single employee who owns every teaching unit
+    generate(context['database_url'], {
+        'users': 3,
+        'teaching_units': max(size // 100, 1),
+        'attendance': size,
+        'leaves': 0,
+        'payrolls': 0,
+        'training_programs': 0,
+        'enrollments': 0,
+    }, reset=True, log=lambda line: None)
+    return 3
+
+
+def run_calculate_attendance_stats(employee_id):
+    from app import app
+    from models import db
+    from routes.attendance import calculate_attendance_stats
+
+    today = date.today()
+    with app.app_context():
+        try:
+            return calculate_attendance_stats(employee_id, today - timedelta(days=3 * 365), today + timedelta(days=365))
+        finally:
+            db.session.remove()
+
+
+def setup_optimized_url(size, rng, context):
+    # URLs are built locally; only a cloud name is needed
+    os.environ.setdefault('CLOUDINARY_CLOUD_NAME', 'benchmark')
+    return [(f'user_{index}_{rng.randint(0, 10 ** 6)}', str(rng.randint(10 ** 9, 10 ** 10))) for index in range(size)]
+
+
+def run_optimized_url(public_ids):
+    from cloud_config import get_optimized_url
+
+    for public_id, version in public_ids:
+        get_optimized_url(public_id, width=150, height=150, version=version)
+
+
+# name -> (setup(size, rng, context) -> state, run(state))
+BENCHMARKS = {
+    'attendance_rate': (setup_attendance_rate, run_attendance_rate),
+    'leave_calendar': (setup_leave_calendar, run_leave_calendar),
+    'faculty_breakdown': (setup_faculty_breakdown, run_faculty_breakdown),
+    'calculate_attendance_stats': (setup_calculate_attendance_stats, run_calculate_attendance_stats),
+    'optimized_url': (setup_optimized_url, run_optimized_url),
+}
+
+
+def time_benchmark(name, sizes, context, repeat=3, max_seconds=30.0, seed=42):
+    """
+    Time one benchmark at each size, best of `repeat` runs
+
+    Larger sizes are skipped once a single run takes longer than
+    max_seconds, so quadratic hot spots don't stall the whole suite.
+    """
+    setup, run = BENCHMARKS[name]
+    points = []
+    for size in sizes:
+        state = setup(size, random.Random(f'{seed}:{name}:{size}'), context)
+        timings = []
+        for _ in range(repeat):
+            started = time.perf_counter()
+            run(state)
+            timings.append(time.perf_counter() - started)
+            if timings[-1] > max_seconds:
+                break
+        best = min(timings)
+        points.append({
+            'size': size,
+            'seconds': round(best, 6),
+            'us_per_row': round(best / size * 1e6, 3),
+        })
+        print(f"{name:<28} {size:>9,} rows {best:>10.4f}s {best / size * 1e6:>10.3f} us/row")
+        del state
+        if best > max_seconds:
+            print(f"{name:<28} stopping: {best:.1f}s exceeds --max-seconds")
+            break
+    return points
+
+
+def compare(results, baseline, threshold):
+    """
+    Print the slowdown of each (benchmark, size) against a baseline run
+
+    Returns:
+        list: Descriptions of points slower than the threshold ratio
+    """
+    regressions = []
+    for name, points in results.items():
+        previous = {point['size']: point for point in baseline.get('results', {}).get(name, [])}
+        for point in points:
+            before = previous.get(point['size'])
+            if not before or not before['seconds']:
+                continue
+            ratio = point['seconds'] / before['seconds']
+            flag = ' REGRESSION' if ratio > threshold else ''
+            print(f"{name:<28} {point['size']:>9,} rows {before['seconds']:>10.4f}s -> {point['seconds']:>10.4f}s  x{ratio:.2f}{flag}")
+            if flag:
+                regressions.append(f"{name}@{point['size']}")
+    return regressions
+
+
+def _git_revision():
+    try:
+        return subprocess.run(['git', 'rev-parse', '--short', 'HEAD'], capture_output=True,
+                              text=True, check=True).stdout.strip()
+    except (OSError, subprocess.CalledProcessError):
+        return None
+
+
+def main(argv=None):
+    parser = argparse.ArgumentParser(description='Time CPU hot spots at increasing input sizes.')
+    parser.add_argument('--only', action='append', choices=sorted(BENCHMARKS), help='Run only this benchmark.')
+    parser.add_argument('--sizes', default=','.join(str(size) for size in DEFAULT_SIZES),
+                        help='Comma separated input sizes.')
+    parser.add_argument('--repeat', type=int, default=3, help='Runs per size; the fastest is kept.')
+    parser.add_argument('--max-seconds', type=float, default=30.0,
+                        help='Skip larger sizes once a run takes longer than this.')
+    parser.add_argument('--seed', type=int, default=42, help='Random seed for the inputs.')
+    parser.add_argument('--output', help='Write results to this JSON file.')
+    parser.add_argument('--compare', help='Baseline JSON results to compare against.')
+    parser.add_argument('--threshold', type=float, default=1.25,
+                        help='Slowdown ratio that counts as a regression in --compare.')
+    args = parser.parse_args(argv)
+
+    sizes = [int(size) for size in args.sizes.split(',') if size]
+
+    with tempfile.TemporaryDirectory() as workdir:
+        context = {'database_url': f'sqlite:///{workdir}/micro.db'}
+        configure_environment(context['database_url'])
+
+        results = {}
+        for name in args.only or BENCHMARKS:
+            results[name] = time_benchmark(name, sizes, context, repeat=args.repeat,
+                                           max_seconds=args.max_seconds, seed=args.seed)
+
+    report = {
+        'revision': _git_revision(),
+        'python': platform.python_version(),
+        'platform': platform.platform(),
+        'created_at': datetime.now().isoformat(timespec='seconds'),
+        'results': results,
+    }
+
+    if args.output:
+        with open(args.output, 'w') as output:
+            json.dump(report, output, indent=2)
+
+    if args.compare:
+        with open(args.compare) as baseline_file:
+            regressions = compare(results, json.load(baseline_file), args.threshold)
+        if regressions:
+            print(f"Regressions: {', '.join(regressions)}")
+            return 1
+    return 0
+
+
+if __name__ == '__main__':
+    sys.exit(main())
@@ -0,0 +1,611 @@
+"""
+Synthetic data generator for load testing the HR System.
+
+Fills a database with a deterministic, seedable dataset at a configurable
+scale so that dashboards, reports and exports can be benchmarked locally
+against realistic volumes. The same seed, scale and anchor date always
+produce the same rows (only the argon2 salt of the shared password hash
+differs between runs).
+
+Rows are generated lazily and bulk loaded in batches: SQLite (and other
+databases) use DBAPI executemany, PostgreSQL uses COPY FROM STDIN.
+
+Usage:
+    python -m benchmarks.synthetic_data --database-url sqlite:////tmp/hr_load.db --scale large
+    python -m benchmarks.synthetic_data --database-url sqlite:////tmp/hr_load.db --scale small --attendance 200000 --seed 7 --reset
+"""
+
+import io
+import csv
+import sys
+import time
+import random
+import argparse
+from datetime import date, datetime, timedelta
+
+# Row counts per table for each preset scale
+SCALES = {
+    'small': {
+        'users': 200,
+        'teaching_units': 1000,
+        'attendance': 50000,
+        'leaves': 4000,
+        'payrolls': 2000,
+        'training_programs': 50,
+        'enrollments': 2000,
+    },
+    'medium': {
+        'users': 2000,
+        'teaching_units': 10000,
+        'attendance': 500000,
+        'leaves': 40000,
+        'payrolls': 20000,
+        'training_programs': 200,
+        'enrollments': 20000,
+    },
+    'large': {
+        'users': 10000,
+        'teaching_units': 50000,
+        'attendance': 5000000,
+        'leaves': 200000,
+        'payrolls': 100000,
+        'training_programs': 1000,
+        'enrollments': 100000,
+    },
+}
+
+DEFAULT_BATCH_SIZE = 10000
+
+# Password for every generated account
+DEFAULT_PASSWORD = 'password123'
+
+# Weighted choices used by the generators: (value, weight)
+DEPARTMENTS = [
+    ('mathematics', 14), ('science', 14), ('english', 13), ('social_studies', 10),
+    ('languages', 8), ('arts', 7), ('physical_education', 6), ('special_education', 7),
+    ('administration', 9), ('counseling', 5), ('library', 3),
+]
+EDUCATION_LEVELS = [('bachelor', 45), ('master', 40), ('doctorate', 10), ('other', 5)]
+POSITIONS = [
+    ('Teacher', 55), ('Senior Teacher', 15), ('Department Head', 5), ('Teaching Assistant', 12),
+    ('Counselor', 5), ('Librarian', 3), ('Administrative Staff', 5),
+]
+CONTRACT_TYPES = [('full_time', 70), ('part_time', 15), ('adjunct', 10), ('temporary', 5)]
+LEAVE_TYPES = [
+    ('sick', 35), ('vacation', 30), ('personal', 15), ('professional', 8), ('bereavement', 4),
+    ('maternity', 2), ('paternity', 2), ('unpaid', 3), ('sabbatical', 1),
+]
+TRAINING_CATEGORIES = [
+    ('technical', 15), ('curriculum', 20), ('classroom_management', 15), ('professional', 20),
+    ('compliance', 15), ('technology', 10), ('special_ed', 5),
+]
+PAYMENT_METHODS = [('bank_transfer', 80), ('check', 15), ('cash', 5)]
+TERMS = ['Fall', 'Spring', 'Summer']
+SUBJECTS = [
+    'Algebra', 'Geometry', 'Calculus', 'Biology', 'Chemistry', 'Physics', 'Literature',
+    'Composition', 'World History', 'Civics', 'Spanish', 'French', 'Music', 'Drawing',
+    'Health', 'Reading', 'Statistics', 'Economics',
+]
+FIRST_NAMES = [
+    'Maria', 'James', 'Ana', 'John', 'Grace', 'Michael', 'Sofia', 'David', 'Liza', 'Mark',
+    'Angela', 'Paolo', 'Camille', 'Joseph', 'Bea', 'Carlo', 'Nina', 'Miguel', 'Rosa', 'Daniel',
+]
+LAST_NAMES = [
+    'Santos', 'Reyes', 'Cruz', 'Bautista', 'Garcia', 'Mendoza', 'Torres', 'Flores', 'Ramos',
+    'Smith', 'Johnson', 'Lee', 'Brown', 'Lopez', 'Castillo', 'Rivera', 'Aquino', 'Villanueva',
+]
+CITIES = ['Manila', 'Quezon City', 'Cebu', 'Davao', 'Makati', 'Pasig', 'Taguig', 'Baguio']
+
+
+def _weighted(rng, choices):
+    """Pick a value from (value, weight) pairs"""
+    values = [value for value, _ in choices]
+    weights = [weight for _, weight in choices]
+    return rng.choices(values, weights)[0]
+
+
+def _split(total, parts, rng):
+    """Split a total into `parts` positive-ish counts with mild variation"""
+    if parts <= 0:
+        return []
+    weights = [rng.uniform(0.5, 1.5) for _ in range(parts)]
+    scale = total / sum(weights)
+    counts = [int(weight * scale) for weight in weights]
+    # Hand out the rounding remainder one by one
+    for index in range(total - sum(counts)):
+        counts[index % parts] += 1
+    return counts
+
+
+def _class_days(start, sessions, rng):
+    """Weekday dates on which a unit meets, starting from its start date"""
+    days = []
+    current = start
+    while len(days) < sessions:
+        if current.weekday() < 5:
+            days.append(current)
+        current += timedelta(days=rng.choice((1, 1, 2, 2, 3)))
+    return days
+
+
+class BulkLoader:
+    """Writes row iterables into tables in batches using the fastest path per dialect"""
+
+    def __init__(self, engine, batch_size=DEFAULT_BATCH_SIZE):
+        self.engine = engine
+        self.batch_size = batch_size
+        self.is_postgres = engine.dialect.name == 'postgresql'
+
+    def load(self, table, columns, rows):
+        """
+        Insert rows into a table
+
+        Args:
+            table: SQLAlchemy Table
+            columns: Column names, in the order each row tuple uses
+            rows: Iterable of tuples
+
+        Returns:
+            int: Number of rows written
+        """
+        connection = self.engine.raw_connection()
+        try:
+            cursor = connection.cursor()
+            if self.is_postgres:
+                count = self._copy(cursor, table, columns, rows)
+            else:
+                count = self._executemany(cursor, table, columns, rows)
+            connection.commit()
+        finally:
+            connection.close()
+        return count
+
+    def _batches(self, rows):
+        batch = []
+        for row in rows:
+            batch.append(row)
+            if len(batch) >= self.batch_size:
+                yield batch
+                batch = []
+        if batch:
+            yield batch
+
+    def _executemany(self, cursor, table, columns, rows):
+        preparer = self.engine.dialect.identifier_preparer
+        placeholder = '%s' if self.engine.dialect.paramstyle in ('format', 'pyformat') else '?'
+        statement = 'INSERT INTO {} ({}) VALUES ({})'.format(
+            preparer.format_table(table),
+            ', '.join(preparer.quote(column) for column in columns),
+            ', '.join([placeholder] * len(columns))
+        )
+        count = 0
+        for batch in self._batches(rows):
+            cursor.executemany(statement, batch)
+            count += len(batch)
+        return count
+
+    def _copy(self, cursor, table, columns, rows):
+        preparer = self.engine.dialect.identifier_preparer
+        statement = "COPY {} ({}) FROM STDIN WITH (FORMAT csv, NULL '\\N')".format(
+            preparer.format_table(table),
+            ', '.join(preparer.quote(column) for column in columns)
+        )
+        count = 0
+        for batch in self._batches(rows):
+            buffer = io.StringIO()
+            writer = csv.writer(buffer)
+            for row in batch:
+                writer.writerow(['\\N' if value is None else value for value in row])
+            buffer.seek(0)
+            cursor.copy_expert(statement, buffer)
+            count += len(batch)
+        return count
+
+    def reset_sequences(self, tables):
+        """Move PostgreSQL id sequences past the explicitly inserted ids"""
+        if not self.is_postgres:
+            return
+        connection = self.engine.raw_connection()
+        try:
+            cursor = connection.cursor()
+            for table in tables:
+                cursor.execute(
+                    "SELECT setval(pg_get_serial_sequence(%s, 'id'), COALESCE(MAX(id), 1)) FROM {}".format(
+                        self.engine.dialect.identifier_preparer.format_table(table)
+                    ),
+                    (table.name,)
+                )
+            connection.commit()
+        finally:
+            connection.close()
+
+
+class SyntheticDataset:
+    """
+    Deterministic row generators for every table in the load-test dataset
+
+    Each table draws from its own random stream derived from the seed, so
+    changing the size of one table does not reshuffle the others.
+    """
+
+    def __init__(self, counts, seed=42, anchor=None):
+        self.counts = counts
+        self.seed = seed
+        self.anchor = anchor or date.today()
+        self.now = datetime.combine(self.anchor, datetime.min.time()) + timedelta(hours=9)
+        self.user_count = max(counts['users'], 3)
+        # One admin, about 2% HR staff, everyone else is faculty/staff
+        self.hr_count = max(1, self.user_count // 50)
+        self.hr_ids = list(range(2, 2 + self.hr_count))
+        self.employee_ids = list(range(2 + self.hr_count, self.user_count + 1))
+        self._unit_spans = []
+
+    def rng(self, name):
+        """Random stream for one table"""
+        return random.Random(f'{self.seed}:{name}')
+
+    def users(self, password_hash):
+        rng = self.rng('users')
+        columns = ('id', 'username', 'email', 'password_hash', 'department', 'role')
+
+        def rows():
+            for user_id in range(1, self.user_count + 1):
+                if user_id == 1:
+                    username, role, department = 'admin', 'admin', 'administration'
+                elif user_id in self.hr_ids:
+                    username, role, department = f'hr{user_id}', 'hr', _weighted(rng, DEPARTMENTS)
+                else:
+                    username, role, department = f'user{user_id}', 'employee', _weighted(rng, DEPARTMENTS)
+                yield (user_id, username, f'{username}@example.edu', password_hash, department, role)
+
+        return columns, rows()
+
+    def profiles(self):
+        rng = self.rng('profiles')
+        columns = ('id', 'user_id', 'first_name', 'last_name', 'phone_number', 'city', 'country',
+                   'position', 'hire_date', 'birth_date', 'education_level', 'teaching_subjects',
+                   'cloudinary_folder', 'cloudinary_public_id', 'created_at', 'updated_at')
+
+        def rows():
+            for user_id in range(1, self.user_count + 1):
+                # Hiring skews towards recent years
+                tenure_days = int(rng.triangular(0, 25 * 365, 3 * 365))
+                hire_date = self.anchor - timedelta(days=tenure_days)
+                birth_date = hire_date - timedelta(days=int(rng.triangular(22 * 365, 45 * 365, 27 * 365)))
+                created_at = self.now - timedelta(days=rng.randint(0, 730), minutes=rng.randint(0, 1440))
+                yield (
+                    user_id, user_id,
+                    rng.choice(FIRST_NAMES), rng.choice(LAST_NAMES),
+                    f'09{rng.randint(100000000, 999999999)}',
+                    rng.choice(CITIES), 'Philippines',
+                    _weighted(rng, POSITIONS),
+                    hire_date, birth_date,
+                    _weighted(rng, EDUCATION_LEVELS),
+                    ', '.join(rng.sample(SUBJECTS, rng.randint(1, 3))),
+                    'hr_profile_pictures', 'default-profile',
+                    created_at, created_at
+                )
+
+        return columns, rows()
+
+    def salaries(self):
+        rng = self.rng('salaries')
+        columns = ('id', 'employee_id', 'amount', 'currency', 'effective_date', 'end_date',
+                   'salary_type', 'contract_type', 'academic_year', 'created_by', 'created_at', 'updated_at')
+
+        def rows():
+            salary_id = 0
+            for user_id in range(1, self.user_count + 1):
+                contract_type = _weighted(rng, CONTRACT_TYPES)
+                salary_type = 'annual' if contract_type == 'full_time' else rng.choice(('monthly', 'hourly', 'contract'))
+                # Log-normal pay around a median for the salary type
+                median = {'annual': 42000, 'monthly': 3200, 'hourly': 22, 'contract': 15000}[salary_type]
+                amount = round(median * rng.lognormvariate(0, 0.25), 2)
+                effective_date = self.anchor - timedelta(days=rng.randint(30, 5 * 365))
+                # About a third of employees also have a previous, ended salary
+                if rng.random() < 0.33:
+                    salary_id += 1
+                    previous_start = effective_date - timedelta(days=rng.randint(180, 3 * 365))
+                    yield (salary_id, user_id, round(amount * rng.uniform(0.8, 0.95), 2), 'USD',
+                           previous_start, effective_date - timedelta(days=1), salary_type, contract_type,
+                           f'{previous_start.year}-{previous_start.year + 1}', 1, self.now, self.now)
+                salary_id += 1
+                yield (salary_id, user_id, amount, 'USD', effective_date, None, salary_type, contract_type,
+                       f'{effective_date.year}-{effective_date.year + 1}', 1, self.now, self.now)
+
+        return columns, rows()
+
+    def teaching_units(self):
+        rng = self.rng('teaching_units')
+        unit_count = self.counts['teaching_units']
+        sessions = _split(self.counts['attendance'], unit_count, rng)
+        columns = ('id', 'title', 'code', 'academic_term', 'employee_id', 'start_date', 'end_date',
+                   'hours_per_week', 'unit_value', 'rate_per_unit', 'status', 'created_by',
+                   'created_at', 'updated_at')
+        self._unit_spans = []
+
+        def rows():
+            for unit_id in range(1, unit_count + 1):
+                subject = rng.choice(SUBJECTS)
+                start_date = self.anchor - timedelta(days=int(rng.triangular(0, 2 * 365, 60)))
+                class_days = _class_days(start_date, sessions[unit_id - 1], self.rng(f'class_days:{unit_id}'))
+                end_date = max(start_date + timedelta(weeks=16), class_days[-1] if class_days else start_date)
+                employee_id = rng.choice(self.employee_ids)
+                # Each unit has its own attendance reliability; class days are
+                # regenerated from their own stream so they are not kept in memory
+                reliability = rng.betavariate(9, 1)
+                self._unit_spans.append((unit_id, employee_id, start_date, sessions[unit_id - 1], reliability))
+                if end_date < self.anchor:
+                    status = 'completed' if rng.random() < 0.95 else 'cancelled'
+                else:
+                    status = 'active'
+                term = TERMS[(start_date.month - 1) // 4]
+                yield (
+                    unit_id, f'{subject} {rng.randint(1, 4)}', f'{subject[:3].upper()}{rng.randint(100, 499)}',
+                    f'{term} {start_date.year}', employee_id, start_date, end_date,
+                    rng.choice((1.5, 3.0, 3.0, 4.5, 6.0)), rng.choice((1.0, 2.0, 3.0, 3.0, 3.0, 4.0)),
+                    round(rng.uniform(300, 900), 2), status, rng.choice(self.hr_ids),
+                    self.now, self.now
+                )
+
+        return columns, rows()
+
+    def attendance(self):
+        """Attendance rows; must be consumed after teaching_units()"""
+        rng = self.rng('attendance')
+        columns = ('id', 'teaching_unit_id', 'date', 'status', 'hours', 'notes', 'recorded_by', 'created_at')
+
+        def rows():
+            attendance_id = 0
+            for unit_id, employee_id, start_date, sessions, reliability in self._unit_spans:
+                for day in _class_days(start_date, sessions, self.rng(f'class_days:{unit_id}')):
+                    roll = rng.random()
+                    if roll < reliability:
+                        status = 'present'
+                    elif roll < reliability + (1 - reliability) * 0.4:
+                        status = 'late'
+                    elif roll < reliability + (1 - reliability) * 0.7:
+                        status = 'excused'
+                    else:
+                        status = 'absent'
+                    attendance_id += 1
+                    yield (
+                        attendance_id, unit_id, day, status,
+                        0.0 if status == 'absent' else rng.choice((1.0, 1.5, 2.0, 3.0)),
+                        None, employee_id,
+                        datetime.combine(day, datetime.min.time()) + timedelta(hours=rng.randint(7, 17))
+                    )
+
+        return columns, rows()
+
+    def leaves(self):
+        rng = self.rng('leaves')
+        columns = ('id', 'employee_id', 'approver_id', 'leave_type', 'start_date', 'end_date', 'status',
+                   'reason', 'approval_comment', 'created_at', 'updated_at')
+
+        def rows():
+            for leave_id in range(1, self.counts['leaves'] + 1):
+                leave_type = _weighted(rng, LEAVE_TYPES)
+                # Mostly past leave, some upcoming requests
+                start_date = self.anchor + timedelta(days=int(rng.triangular(-2 * 365, 90, 0)))
+                if leave_type in ('maternity', 'sabbatical'):
+                    length = rng.randint(30, 120)
+                elif leave_type == 'sick':
+                    length = min(int(rng.expovariate(0.5)) + 1, 14)
+                else:
+                    length = min(int(rng.expovariate(0.3)) + 1, 21)
+                created_at = datetime.combine(start_date, datetime.min.time()) - timedelta(days=rng.randint(1, 30))
+                if start_date > self.anchor and rng.random() < 0.6:
+                    status, approver_id, comment = 'pending', None, None
+                else:
+                    status = 'approved' if rng.random() < 0.85 else 'denied'
+                    approver_id = rng.choice(self.hr_ids)
+                    comment = 'Approved' if status == 'approved' else 'Insufficient coverage'
+                yield (
+                    leave_id, rng.choice(self.employee_ids), approver_id, leave_type,
+                    start_date, start_date + timedelta(days=length - 1), status,
+                    f'{leave_type.title()} leave', comment, created_at, created_at + timedelta(days=1)
+                )
+
+        return columns, rows()
+
+    def payrolls(self):
+        rng = self.rng('payrolls')
+        columns = ('id', 'employee_id', 'period_start', 'period_end', 'base_pay', 'unit_pay', 'deductions',
+                   'payment_date', 'status', 'payment_method', 'reference_number', 'created_by',
+                   'created_at', 'updated_at')
+
+        def rows():
+            employee_count = len(self.employee_ids)
+            for payroll_id in range(1, self.counts['payrolls'] + 1):
+                # Walk employees round-robin, one month further back per pass
+                employee_id = self.employee_ids[(payroll_id - 1) % employee_count]
+                months_back = (payroll_id - 1) // employee_count + 1
+                year = self.anchor.year
+                month = self.anchor.month - months_back
+                while month <= 0:
+                    month += 12
+                    year -= 1
+                period_start = date(year, month, 1)
+                period_end = (period_start + timedelta(days=32)).replace(day=1) - timedelta(days=1)
+                base_pay = round(3200 * rng.lognormvariate(0, 0.25), 2)
+                unit_pay = round(rng.choice((0, 0, 1, 2, 3)) * rng.uniform(900, 2700), 2)
+                deductions = round((base_pay + unit_pay) * rng.uniform(0.08, 0.2), 2)
+                status = 'paid' if months_back > 1 else rng.choice(('pending', 'processed', 'paid'))
+                payment_date = period_end + timedelta(days=rng.randint(1, 5)) if status == 'paid' else None
+                yield (
+                    payroll_id, employee_id, period_start, period_end, base_pay, unit_pay, deductions,
+                    payment_date, status, _weighted(rng, PAYMENT_METHODS), f'PR-{payroll_id:08d}',
+                    rng.choice(self.hr_ids), self.now, self.now
+                )
+
+        return columns, rows()
+
+    def training_programs(self):
+        rng = self.rng('training_programs')
+        columns = ('id', 'title', 'description', 'instructor', 'start_date', 'end_date', 'location',
+                   'max_participants', 'category', 'status', 'created_by', 'created_at', 'updated_at')
+
+        def rows():
+            for program_id in range(1, self.counts['training_programs'] + 1):
+                category = _weighted(rng, TRAINING_CATEGORIES)
+                start_date = self.anchor + timedelta(days=int(rng.triangular(-2 * 365, 120, 0)))
+                end_date = start_date + timedelta(days=rng.randint(0, 14))
+                if end_date < self.anchor:
+                    status = 'completed' if rng.random() < 0.9 else 'cancelled'
+                elif start_date <= self.anchor:
+                    status = 'in-progress'
+                else:
+                    status = 'upcoming'
+                yield (
+                    program_id, f'{category.replace("_", " ").title()} Workshop {program_id}',
+                    'Synthetic training program', f'{rng.choice(FIRST_NAMES)} {rng.choice(LAST_NAMES)}',
+                    start_date, end_date, rng.choice(('Main Hall', 'Room 101', 'Online', 'Library')),
+                    rng.choice((0, 20, 30, 50, 100)), category, status, rng.choice(self.hr_ids),
+                    self.now, self.now
+                )
+
+        return columns, rows()
+
+    def enrollments(self):
+        rng = self.rng('enrollments')
+        program_count = self.counts['training_programs']
+        columns = ('id', 'training_id', 'employee_id', 'status', 'enrollment_date', 'completion_date',
+                   'feedback', 'rating')
+
+        def rows():
+            if not program_count:
+                return
+            per_program = _split(self.counts['enrollments'], program_count, rng)
+            enrollment_id = 0
+            for program_id, count in enumerate(per_program, start=1):
+                # The unique (training, employee) constraint caps each program at one row per employee
+                count = min(count, len(self.employee_ids))
+                enrollment_date = self.now - timedelta(days=int(rng.triangular(0, 2 * 365, 0)))
+                for employee_id in rng.sample(self.employee_ids, count):
+                    status = rng.choices(('enrolled', 'completed', 'dropped', 'failed'), (30, 55, 10, 5))[0]
+                    completed = status == 'completed'
+                    # Ratings skew positive and only some completers leave one
+                    rating = rng.choices((1, 2, 3, 4, 5), (2, 5, 18, 40, 35))[0] if completed and rng.random() < 0.7 else None
+                    enrollment_id += 1
+                    yield (
+                        enrollment_id, program_id, employee_id, status,
+                        enrollment_date + timedelta(days=rng.randint(0, 20)),
+                        enrollment_date + timedelta(days=rng.randint(21, 60)) if completed else None,
+                        'Useful session' if rating else None, rating
+                    )
+
+        return columns, rows()
+
+
+def normalize_database_url(url):
+    """Use the SQLAlchemy driver name for postgres:// URLs"""
+    if url.startswith('postgres://'):
+        return 'postgresql://' + url[len('postgres://'):]
+    return url
+
+
+def generate(database_url, counts, seed=42, anchor=None, reset=False, batch_size=DEFAULT_BATCH_SIZE, log=print):
+    """
+    Create the schema and bulk load a synthetic dataset
+
+    Args:
+        database_url: SQLAlchemy database URL
+        counts: Row counts per table (see SCALES)
+        seed: Random seed; the same seed produces the same rows
+        anchor: Date the dataset is built around (defaults to today)
+        reset: Drop and recreate all tables first
+        batch_size: Rows per executemany / COPY batch
+        log: Callable receiving progress lines
+
+    Returns:
+        dict: Rows written and seconds taken per table
+    """
+    from sqlalchemy import create_engine, inspect
+    from models import (db, ph, User, EmployeeProfile, EmployeeSalary, TeachingUnit, UnitAttendance,
+                        LeaveRequest, Payroll, TrainingProgram, TrainingEnrollment)
+
+    engine = create_engine(normalize_database_url(database_url))
+    try:
+        if reset:
+            db.metadata.drop_all(engine)
+        db.metadata.create_all(engine)
+
+        # Refuse to mix generated ids with existing rows
+        with engine.connect() as connection:
+            if connection.execute(User.__table__.select().limit(1)).first() is not None:
+                raise RuntimeError('The user table is not empty; rerun with --reset to replace the data.')
+
+        dataset = SyntheticDataset(counts, seed=seed, anchor=anchor)
+        loader = BulkLoader(engine, batch_size=batch_size)
+        # Hashing once keeps argon2 out of the load time
+        password_hash = ph.hash(DEFAULT_PASSWORD)
+
+        plan = [
+            (User.__table__, dataset.users(password_hash)),
+            (EmployeeProfile.__table__, dataset.profiles()),
+            (EmployeeSalary.__table__, dataset.salaries()),
+            (TeachingUnit.__table__, dataset.teaching_units()),
+            (UnitAttendance.__table__, dataset.attendance()),
+            (LeaveRequest.__table__, dataset.leaves()),
+            (Payroll.__table__, dataset.payrolls()),
+            (TrainingProgram.__table__, dataset.training_programs()),
+            (TrainingEnrollment.__table__, dataset.enrollments()),
+        ]
+
+        results = {}
+        for table, (columns, rows) in plan:
+            started = time.perf_counter()
+            count = loader.load(table, columns, rows)
+            elapsed = time.perf_counter() - started
+            results[table.name] = {'rows': count, 'seconds': round(elapsed, 3)}
+            rate = count / elapsed if elapsed else 0
+            log(f'{table.name:<20} {count:>10,} rows  {elapsed:8.2f}s  {rate:>12,.0f} rows/s')
+
+        loader.reset_sequences([table for table, _ in plan])
+
+        # Refresh planner statistics after the bulk load
+        with engine.begin() as connection:
+            if engine.dialect.name in ('postgresql', 'sqlite'):
+                connection.exec_driver_sql('ANALYZE')
+
+        log(f'Login with admin / {DEFAULT_PASSWORD} (HR accounts: hr2..hr{1 + dataset.hr_count})')
+        return results
+    finally:
+        engine.dispose()
+
+
+def main(argv=None):
+    parser = argparse.ArgumentParser(description='Generate a synthetic HR dataset for load testing.')
+    # Never defaults to the app's POSTGRES_URL: --reset drops every table
+    parser.add_argument('--database-url', required=True,
+                        help='SQLAlchemy URL of a scratch database to fill.')
+    parser.add_argument('--scale', choices=sorted(SCALES), default='small', help='Preset row counts.')
+    parser.add_argument('--seed', type=int, default=42, help='Random seed.')
+    parser.add_argument('--anchor-date', type=date.fromisoformat, default=None,
+                        help='Date the data is centred on (YYYY-MM-DD, default today).')
+    parser.add_argument('--batch-size', type=int, default=DEFAULT_BATCH_SIZE, help='Rows per bulk insert.')
+    parser.add_argument('--reset', action='store_true', help='Drop and recreate all tables first.')
+    for name in SCALES['small']:
+        parser.add_argument(f'--{name.replace("_", "-")}', type=int, default=None, dest=name,
+                            help=f'Override the {name.replace("_", " ")} count.')
+    args = parser.parse_args(argv)
+
+    counts = dict(SCALES[args.scale])
+    for name in counts:
+        if getattr(args, name) is not None:
+            counts[name] = getattr(args, name)
+
+    started = time.perf_counter()
+    try:
+        generate(args.database_url, counts, seed=args.seed, anchor=args.anchor_date,
+                 reset=args.reset, batch_size=args.batch_size)
+    except RuntimeError as e:
+        print(f'Error: {e}', file=sys.stderr)
+        return 1
+    print(f'Done in {time.perf_counter() - started:.1f}s')
+    return 0
+
+
+if __name__ == '__main__':
+    sys.exit(main())
@@ -0,0 +1,172 @@
+"""
+Peak memory benchmark for the Excel report exports.
+
+Compares the previous export path (ORM objects -> pandas DataFrame ->
+ExcelWriter into BytesIO) with the streaming path (query cursor ->
+xlsxwriter constant_memory -> temp file) for the employee demographics
+export. Each variant runs in its own process so peak RSS is not shared.
+The DataFrame variant needs pandas installed; it is skipped otherwise.
+
+Usage:
+    python -m benchmarks.xlsx_memory --rows 50000 [--output results.json]
+"""
+
+import os
+import sys
+import json
+import time
+import resource
+import argparse
+import importlib.util
+import tempfile
+import subprocess
+from datetime import date, timedelta
+
+from benchmarks import configure_environment
+
+
+def _peak_rss_kb():
+    """Peak resident set size of this process in KB"""
+    peak = resource.getrusage(resource.RUSAGE_SELF).ru_maxrss
+    # macOS reports bytes, Linux reports kilobytes
+    return peak // 1024 if sys.platform == 'darwin' else peak
+
+
+def seed(db_path, rows):
+    """Create the schema and bulk insert employees with profiles"""
+    configure_environment(f'sqlite:///{db_path}')
+    from app import create_app
+    from models import db, User, EmployeeProfile, ph
+
+    app = create_app()
+    departments = ['mathematics', 'science', 'english', 'history', 'arts', 'physical_education']
+    education = ['bachelor', 'master', 'doctorate', 'other', None]
+    password_hash = ph.hash('benchmark')
+
+    with app.app_context():
+        db.create_all()
+        with db.engine.begin() as connection:
+            for offset in range(0, rows, 5000):
+                batch = range(offset + 1, min(offset + 5000, rows) + 1)
+                connection.execute(User.__table__.insert(), [{
+                    'id': i,
+                    'username': f'user{i}',
+                    'email': f'user{i}@example.com',
+                    'password_hash': password_hash,
+                    'department': departments[i % len(departments)],
+                    'role': 'employee'
+                } for i in batch])
+                connection.execute(EmployeeProfile.__table__.insert(), [{
+                    'user_id': i,
+                    'first_name': f'First{i}',
+                    'last_name': f'Last{i}',
+                    'position': 'Teacher',
+                    'hire_date': date(2000, 1, 1) + timedelta(days=i % 9000),
+                    'education_level': education[i % len(education)]
+                } for i in batch])
+
+
+def _legacy_export(app):
+    """The export as it was built before streaming: ORM objects into a DataFrame"""
+    import io
+    import pandas as pd
+    from models import User
+
+    employee_data = []
+    for employee in User.query.all():
+        profile = employee.profile
+        hire_date = profile.hire_date if profile and profile.hire_date else None
+        employee_data.append({
+            'name': employee.get_display_name(),
+            'department': employee.department,
+            'position': profile.position if profile else 'N/A',
+            'hire_date': hire_date.strftime('%Y-%m-%d') if hire_date else 'N/A',
+            'tenure': (date.today() - hire_date).days / 365.25 if hire_date else 0,
+            'education': profile.education_level if profile and profile.education_level else 'Unknown'
+        })
+
+    output = io.BytesIO()
+    with pd.ExcelWriter(output, engine='xlsxwriter') as writer:
+        pd.DataFrame(employee_data).to_excel(writer, sheet_name='Employees', index=False)
+    return len(output.getvalue())
+
+
+def _streaming_export(app):
+    """The current streaming export"""
+    from routes.reports import build_employee_demographics_export
+
+    path, _, _ = build_employee_demographics_export({'export_format': 'excel'})
+    size = os.path.getsize(path)
+    os.remove(path)
+    return size
+
+
+VARIANTS = {
+    'dataframe': _legacy_export,
+    'streaming': _streaming_export,
+}
+
+
+def run_variant(variant, db_path):
+    """Run one export variant and report timing and memory as JSON"""
+    configure_environment(f'sqlite:///{db_path}')
+    from app import create_app
+
+    app = create_app()
+    with app.app_context():
+        baseline = _peak_rss_kb()
+        started = time.perf_counter()
+        size = VARIANTS[variant](app)
+        elapsed = time.perf_counter() - started
+
+    peak = _peak_rss_kb()
+    print(json.dumps({
+        'variant': variant,
+        'seconds': round(elapsed, 3),
+        'file_bytes': size,
+        'baseline_rss_kb': baseline,
+        'peak_rss_kb': peak,
+        'export_rss_kb': peak - baseline
+    }))
+
+
+def main():
+    parser = argparse.ArgumentParser(description='Compare peak memory of Excel export paths.')
+    parser.add_argument('--rows', type=int, default=20000, help='Number of employees to export.')
+    parser.add_argument('--output', help='Write results to this JSON file.')
+    parser.add_argument('--variant', choices=sorted(VARIANTS), help=argparse.SUPPRESS)
+    parser.add_argument('--db', help=argparse.SUPPRESS)
+    args = parser.parse_args()
+
+    # Worker process: run a single variant against an existing database
+    if args.variant:
+        run_variant(args.variant, args.db)
+        return
+
+    with tempfile.TemporaryDirectory() as workdir:
+        db_path = os.path.join(workdir, 'benchmark.db')
+        print(f"Seeding {args.rows} employees...")
+        seed(db_path, args.rows)
+
+        results = []
+        for variant in VARIANTS:
+            if variant == 'dataframe' and importlib.util.find_spec('pandas') is None:
+                print(f"{variant:>10}: skipped (pandas is not installed)")
+                continue
+            completed = subprocess.run(
+                [sys.executable, '-m', 'benchmarks.xlsx_memory', '--variant', variant, '--db', db_path],
+                capture_output=True, text=True, check=True
+            )
+            result = json.loads(completed.stdout.strip().splitlines()[-1])
+            results.append(result)
+            print(f"{variant:>10}: {result['seconds']:8.2f}s  "
+                  f"peak {result['peak_rss_kb'] / 1024:8.1f} MB  "
+                  f"export {result['export_rss_kb'] / 1024:8.1f} MB")
+
+    if args.output:
+        with open(args.output, 'w') as output:
+            json.dump({'rows': args.rows, 'results': results}, output, indent=2)
+
+
+if __name__ == '__main__':
+    main()
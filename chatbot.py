@@ -2,24 +2,179 @@
 School HR System Chatbot using Google Gemini API with user data integration
 """
 import os
+import re
 import json
+import time
+import threading
+from collections import OrderedDict
 from dotenv import load_dotenv
-from google import genai
+from flask import current_app
 from flask_login import current_user
 from models import db, User, EmployeeProfile, LeaveRequest, TrainingEnrollment, TrainingProgram
+from utils.conversations import conversation_store
+from utils.cache import chatbot_context_cache
+from utils.intents import intent_router, singular
+from utils.upstream import gemini_guard
+from utils.chatbot_metrics import chatbot_metrics, prompt_size, usage_tokens, LOCAL, CACHE, MODEL
+from sqlalchemy.orm import joinedload, contains_eager
 
 # Load environment variables
 load_dotenv()
 
-# Initialize Gemini API client
-client = genai.Client(api_key=os.environ.get("GEMINI_API_KEY"))
+_client = None
+_client_lock = threading.Lock()
+
+def get_genai_client():
+    """
+    Get the Gemini API client, creating it on first use
+    
+    The google-genai SDK is only imported here, so the app starts without
+    it and processes that never chat don't pay for it.
+    """
+    global _client
+    if _client is None:
+        with _client_lock:
+            if _client is None:
+                from google import genai
+                _client = genai.Client(api_key=os.environ.get("GEMINI_API_KEY"))
+    return _client
+
+# Questions about the asker's own situation get a personalized answer
+PERSONAL_QUESTION = re.compile(r"\b(my|mine|me|myself|i'm|i've|i'd|i am|i have|i was)\b")
+
+# Elliptical follow-ups only make sense with the earlier conversation
+FOLLOW_UP_QUESTION = re.compile(r"\b(it|its|that|this|those|these|they|them|what about|how about|and|also|else|instead)\b")
+
+# Words that don't change what a cached question asks
+CACHE_STOPWORDS = {
+    'a', 'an', 'the', 'is', 'are', 'was', 'were', 'be', 'been', 'do', 'does', 'did', 'please',
+    'to', 'of', 'for', 'in', 'on', 'at', 'by', 'there', 'any', 'i', 'we', 'you', 'our', 'your'
+}
+
+# Negated contractions split into their words, so "isn't" and "is not" match
+CACHE_NEGATIONS = {
+    'no': ('not',), 'never': ('not',), 'cannot': ('can', 'not'), 'cant': ('can', 'not'),
+    'wont': ('will', 'not'), 'dont': ('do', 'not'), 'doesnt': ('does', 'not'), 'didnt': ('did', 'not'),
+    'isnt': ('is', 'not'), 'arent': ('are', 'not'), 'wasnt': ('was', 'not'), 'werent': ('were', 'not'),
+    'hasnt': ('has', 'not'), 'havent': ('have', 'not'), 'shouldnt': ('should', 'not'),
+    'wouldnt': ('would', 'not'), 'couldnt': ('could', 'not')
+}
+
+class ResponseCache:
+    """
+    Model answers to generic questions, keyed by normalized question text
+    
+    A lookup first tries the exact normalized text, then a cached question
+    with the same content words - the words left after dropping
+    CACHE_STOPWORDS and plural endings, numbers and negations included -
+    so only word order, filler words and plurals may differ. Questions
+    that differ in any other word ("maternity" / "paternity", "part time" /
+    "full time", "paid" / "not paid") are different questions. Entries
+    expire after a TTL and the least recently used go first once
+    max_entries is reached.
+    """
+    
+    def __init__(self, max_entries=500):
+        self.max_entries = max_entries
+        self._entries = OrderedDict()  # key -> (answer, content words, expires_at)
+        self._by_content = {}  # content words -> keys sharing them
+        self._lock = threading.Lock()
+        self.hits = 0
+        self.fuzzy_hits = 0
+        self.misses = 0
+    
+    @staticmethod
+    def normalize(question):
+        """Lowercase words without punctuation, single spaced"""
+        return ' '.join(re.findall(r"[a-z0-9]+", question.lower().replace("'", '')))
+    
+    @staticmethod
+    def content_words(key):
+        """
+        Words of a normalized question that change its meaning
+        
+        Returns:
+            tuple: (frozenset of singular content words, number of negations)
+        """
+        words = []
+        for word in key.split():
+            words.extend(CACHE_NEGATIONS.get(word, (word,)))
+        negations = words.count('not')
+        return frozenset(singular(word) for word in words if word not in CACHE_STOPWORDS), negations
+    
+    def _remove(self, key):
+        _, content, _ = self._entries.pop(key)
+        keys = self._by_content.get(content)
+        if keys is not None:
+            keys.discard(key)
+            if not keys:
+                del self._by_content[content]
+    
+    def get(self, question):
+        """Cached answer for the question or a rewording of it, or None"""
+        key = self.normalize(question)
+        now = time.monotonic()
+        with self._lock:
+            fuzzy = key not in self._entries
+            if fuzzy:
+                # Any rewording will do; they all have the same content words
+                key = next(iter(self._by_content.get(self.content_words(key), ())), None)
+            if key is not None:
+                answer, _, expires_at = self._entries[key]
+                if expires_at > now:
+                    self._entries.move_to_end(key)
+                    self.hits += 1
+                    if fuzzy:
+                        self.fuzzy_hits += 1
+                    return answer
+                self._remove(key)
+            self.misses += 1
+            return None
+    
+    def set(self, question, answer, ttl):
+        """Store an answer for ttl seconds; 0 disables caching"""
+        if ttl <= 0 or not answer:
+            return
+        key = self.normalize(question)
+        with self._lock:
+            if key in self._entries:
+                self._remove(key)
+            content = self.content_words(key)
+            self._entries[key] = (answer, content, time.monotonic() + ttl)
+            self._by_content.setdefault(content, set()).add(key)
+            while len(self._entries) > self.max_entries:
+                self._remove(next(iter(self._entries)))
+    
+    def clear(self):
+        with self._lock:
+            self._entries.clear()
+            self._by_content.clear()
+    
+    def stats(self):
+        """Current size and hit/miss counters"""
+        with self._lock:
+            lookups = self.hits + self.misses
+            return {
+                'entries': len(self._entries),
+                'max_entries': self.max_entries,
+                'hits': self.hits,
+                'fuzzy_hits': self.fuzzy_hits,
+                'misses': self.misses,
+                'hit_rate': round(self.hits / lookups, 3) if lookups else None
+            }
 
 class HRChatbot:
     """School HR Assistant powered by Google Gemini API with user data integration"""
     
-    def __init__(self):
+    def __init__(self, genai_client=None, response_cache=None, guard=None, metrics=None):
         self.model_name = "gemini-2.0-flash"
-        self.history = {}  # Store conversation history per user
+        # A stub with the same models.generate_content(_stream) methods can be passed in for testing
+        self._client = genai_client
+        # Concurrency cap, deadline and circuit breaker for every model call
+        self.guard = guard or gemini_guard
+        self.conversations = conversation_store  # Bounded history per user
+        self.response_cache = response_cache or ResponseCache()  # Answers shared by every user
+        self.metrics = metrics or chatbot_metrics  # Prompt size and latency per message
         self.base_system_prompt = """
         You are an AI assistant for a School HR Management System. Your name is School HR Assistant.
         
@@ -39,58 +194,78 @@ class HRChatbot:
         staff management issues, and suggest contacting the appropriate academic department.
         """
     
+    @property
+    def client(self):
+        """The client passed in, or the shared Gemini client"""
+        return self._client or get_genai_client()
+    
     def get_user_context(self, user_id):
-        """Get personalized context for the current user"""
+        """
+        Get personalized context for the current user
+        
+        The context is cached per user until a commit changes their user,
+        profile, leave or training rows, so a conversation queries it once.
+        """
         try:
-            # Get user info
-            user = User.query.get(user_id)
-            if not user:
-                return {}
-            
-            # Get user profile
-            profile = EmployeeProfile.query.filter_by(user_id=user_id).first()
-            
-            # Get pending leave requests
-            pending_leaves = LeaveRequest.query.filter_by(
-                employee_id=user_id, 
-                status='pending'
-            ).count()
-            
-            # Get upcoming trainings
-            upcoming_trainings = TrainingEnrollment.query.filter_by(
-                employee_id=user_id, 
-                status='enrolled'
-            ).join(TrainingEnrollment.training).filter(
-                TrainingProgram.status.in_(['upcoming', 'in-progress'])
-            ).count()
-            
-            # Get leave details for context
-            leave_details = self.get_leave_details(user_id)
-            
-            # Create context object
-            context = {
-                "name": f"{profile.first_name} {profile.last_name}" if profile and profile.first_name else user.username,
-                "username": user.username,
-                "email": user.email,
-                "department": user.department,
-                "role": user.role,
-                "position": profile.position if profile else None,
-                "hire_date": profile.hire_date.strftime("%Y-%m-%d") if profile and profile.hire_date else None,
-                "pending_leaves": pending_leaves,
-                "upcoming_trainings": upcoming_trainings,
-                "leave_details": leave_details
-            }
-            
-            return context
+            return chatbot_context_cache.get_or_set(
+                user_id,
+                lambda: self._build_user_context(user_id),
+                ttl=current_app.config.get('CHATBOT_CONTEXT_CACHE_TTL', 0)
+            )
         except Exception as e:
             print(f"Error getting user context: {e}")
             return {}
     
+    def _build_user_context(self, user_id):
+        """Query the context returned by get_user_context"""
+        # Get user info
+        user = User.query.get(user_id)
+        if not user:
+            return {}
+        
+        # Get user profile
+        profile = EmployeeProfile.query.filter_by(user_id=user_id).first()
+        
+        # Get pending leave requests
+        pending_leaves = LeaveRequest.query.filter_by(
+            employee_id=user_id, 
+            status='pending'
+        ).count()
+        
+        # Get upcoming trainings
+        upcoming_trainings = TrainingEnrollment.query.filter_by(
+            employee_id=user_id, 
+            status='enrolled'
+        ).join(TrainingEnrollment.training).filter(
+            TrainingProgram.status.in_(['upcoming', 'in-progress'])
+        ).count()
+        
+        # Get leave details for context
+        leave_details = self.get_leave_details(user_id)
+        
+        # Create context object
+        context = {
+            "name": f"{profile.first_name} {profile.last_name}" if profile and profile.first_name else user.username,
+            "username": user.username,
+            "email": user.email,
+            "department": user.department,
+            "role": user.role,
+            "position": profile.position if profile else None,
+            "hire_date": profile.hire_date.strftime("%Y-%m-%d") if profile and profile.hire_date else None,
+            "pending_leaves": pending_leaves,
+            "upcoming_trainings": upcoming_trainings,
+            "leave_details": leave_details
+        }
+        
+        return context
+    
     def get_leave_details(self, user_id):
         """Get detailed information about a user's leave requests"""
         try:
             # Get all leave requests for the user (limit to recent ones to avoid context size issues)
-            leave_requests = LeaveRequest.query.filter_by(employee_id=user_id).order_by(
+            leave_requests = LeaveRequest.query.filter_by(employee_id=user_id).options(
+                joinedload(LeaveRequest.approver)
+            ).order_by(
                 LeaveRequest.created_at.desc()
             ).limit(5).all()
             
@@ -105,9 +280,9 @@ class HRChatbot:
                     "reason": leave.reason,
                     "status": leave.status,
                     "submitted_on": leave.created_at.strftime("%Y-%m-%d"),
-                    "approved_by": leave.approved_by.username if leave.approved_by else None,
-                    "approval_date": leave.approved_at.strftime("%Y-%m-%d") if leave.approved_at else None,
-                    "rejection_reason": leave.rejection_reason
+                    "approved_by": leave.approver.username if leave.approver else None,
+                    "approval_date": leave.updated_at.strftime("%Y-%m-%d") if leave.status != 'pending' and leave.updated_at else None,
+                    "rejection_reason": leave.approval_comment if leave.status == 'denied' else None
                 })
             
             return leave_details
@@ -147,7 +322,7 @@ class HRChatbot:
                 """
                 if leave.get('status') == 'approved':
                     context_prompt += f"- Approved by: {leave.get('approved_by')} on {leave.get('approval_date')}\n"
-                elif leave.get('status') == 'rejected':
+                elif leave.get('status') in ('denied', 'rejected'):
                     context_prompt += f"- Rejected reason: {leave.get('rejection_reason', 'Not provided')}\n"
         
         context_prompt += """
@@ -157,34 +332,160 @@ class HRChatbot:
         
         return self.base_system_prompt + context_prompt
     
+    def is_generic_question(self, user_message, user_id):
+        """
+        True for self-contained questions whose answer doesn't depend on the user
+        
+        These are answered from the base system prompt without the user's
+        context or history, so one answer can be cached for everyone.
+        """
+        text = user_message.lower()
+        if PERSONAL_QUESTION.search(text):
+            return False
+        # Follow-ups need the conversation they follow
+        summary, history = self.conversations.contents(user_id)
+        if (history or summary) and FOLLOW_UP_QUESTION.search(text):
+            return False
+        return True
+    
+    def build_contents(self, user_message, user_id, generic=False):
+        """System prompt, bounded history and the new message as Gemini contents"""
+        if generic:
+            # Same prompt for everyone, so the answer can be shared
+            return [
+                {"role": "model", "parts": [{"text": self.base_system_prompt}]},
+                {"role": "user", "parts": [{"text": user_message}]}
+            ]
+        
+        # Get personalized system prompt
+        system_prompt = self.get_personalized_system_prompt(user_id)
+        
+        # Recent turns, with older ones condensed into a summary
+        summary, history = self.conversations.contents(user_id)
+        if summary:
+            system_prompt += f"""
+        Summary of the earlier conversation:
+        {summary}
+        """
+        
+        # Prepare the conversation history with system prompt
+        conversation = [{"role": "model", "parts": [{"text": system_prompt}]}]
+        conversation.extend(history)
+        conversation.append({"role": "user", "parts": [{"text": user_message}]})
+        return conversation
+    
+    def answer_locally(self, user_message, user_id):
+        """
+        Answer questions about the user's own leave and training data from the database
+        
+        Returns:
+            str: The answer, or None when the message should go to the model
+        """
+        intent = intent_router.classify(user_message)
+        if intent is None:
+            return None
+        
+        answer = self.LOCAL_ANSWERS[intent](self, user_id)
+        if answer is None:
+            return None
+        
+        # Keep the exchange in the history so follow-up questions have context
+        self.conversations.append(user_id, user_message, answer)
+        return answer
+    
+    def _answer_pending_leaves(self, user_id):
+        info = self.get_user_info(user_id, 'pending_leaves')
+        if info.get('status') != 'success':
+            return None
+        leaves = info['leaves']
+        if not leaves:
+            return "You don't have any pending leave requests."
+        
+        lines = [f"You have {len(leaves)} pending leave request{'s' if len(leaves) != 1 else ''}:\n"]
+        for leave in leaves:
+            lines.append(f"- **{leave['leave_type'].title()}** leave: {leave['start_date']} to {leave['end_date']} ({leave['duration_days']} days)\n")
+        return ''.join(lines)
+    
+    def _answer_upcoming_trainings(self, user_id):
+        info = self.get_user_info(user_id, 'upcoming_trainings')
+        if info.get('status') != 'success':
+            return None
+        trainings = info['trainings']
+        if not trainings:
+            return "You don't have any upcoming training programs."
+        
+        lines = [f"You have {len(trainings)} upcoming training program{'s' if len(trainings) != 1 else ''}:\n"]
+        for training in trainings:
+            lines.append(f"- **{training['title']}**: {training['start_date']} to {training['end_date']} ({training['status']})\n")
+        return ''.join(lines)
+    
+    def _answer_leave_details(self, user_id):
+        leaves = self.get_user_context(user_id).get('leave_details')
+        if leaves is None:
+            return None
+        if not leaves:
+            return "You don't have any recent leave requests."
+        
+        lines = ["Your recent leave requests:\n"]
+        for leave in leaves:
+            line = f"- **{leave['leave_type'].title()}** leave, {leave['start_date']} to {leave['end_date']}: {leave['status'].title()}"
+            if leave['status'] == 'approved' and leave.get('approved_by'):
+                line += f" by {leave['approved_by']} on {leave['approval_date']}"
+            elif leave['status'] in ('denied', 'rejected') and leave.get('rejection_reason'):
+                line += f" ({leave['rejection_reason']})"
+            lines.append(line + "\n")
+        return ''.join(lines)
+    
+    # Intent name -> method answering it
+    LOCAL_ANSWERS = {
+        'pending_leaves': _answer_pending_leaves,
+        'upcoming_trainings': _answer_upcoming_trainings,
+        'leave_details': _answer_leave_details,
+    }
+    
     def get_response(self, user_message, user_id):
         """Get a response from the Gemini model for the user message"""
+        started = time.perf_counter()
+        source = LOCAL
+        call = {}
         try:
-            # Initialize history for user if not exists
-            if user_id not in self.history:
-                self.history[user_id] = []
-                
-            # Get personalized system prompt
-            system_prompt = self.get_personalized_system_prompt(user_id)
-            
-            # Add user message to history
-            self.history[user_id].append({"role": "user", "parts": [{"text": user_message}]})
+            # Questions about the user's own data don't need the model
+            local_answer = self.answer_locally(user_message, user_id)
+            if local_answer is not None:
+                self.metrics.record(source, started, response_text=local_answer)
+                return {
+                    "status": "success",
+                    "message": local_answer
+                }
             
-            # Prepare the conversation history with system prompt
-            conversation = [{"role": "model", "parts": [{"text": system_prompt}]}]
-            conversation.extend(self.history[user_id])
+            # Generic questions may already have a shared answer
+            generic = self.is_generic_question(user_message, user_id)
+            response_text = self.response_cache.get(user_message) if generic else None
+            source = CACHE
             
-            # Generate response using the client
-            response = client.models.generate_content(
-                model=self.model_name,
-                contents=conversation
-            )
-            
-            # Extract the text from the response
-            response_text = response.text
+            if response_text is None:
+                source = MODEL
+                conversation = self.build_contents(user_message, user_id, generic=generic)
+                call = dict(prompt_size(conversation), generic=generic)
+                
+                # Generate response using the client
+                upstream_started = time.perf_counter()
+                response = self.guard.call(lambda timeout: self.client.models.generate_content(
+                    model=self.model_name,
+                    contents=conversation,
+                    config=self._call_config(timeout)
+                ))
+                call['upstream_ms'] = round((time.perf_counter() - upstream_started) * 1000, 1)
+                call.update(usage_tokens(response))
+                
+                # Extract the text from the response
+                response_text = response.text
+                if generic:
+                    self.response_cache.set(user_message, response_text, self._response_cache_ttl())
             
-            # Add model response to history
-            self.history[user_id].append({"role": "model", "parts": [{"text": response_text}]})
+            # Record the exchange once it succeeded
+            self.conversations.append(user_id, user_message, response_text)
+            self.metrics.record(source, started, response_text=response_text, **call)
             
             return {
                 "status": "success",
@@ -192,15 +493,81 @@ class HRChatbot:
             }
         except Exception as e:
             print(f"Gemini API error: {str(e)}")
+            self.metrics.record(source, started, error=type(e).__name__, **call)
             return {
                 "status": "error",
                 "message": "I'm having trouble connecting to my knowledge base. Please try again later."
             }
     
+    def stream_response(self, user_message, user_id):
+        """
+        Yield the Gemini model's response to the user message in text chunks
+        
+        The exchange is added to the history once the stream completes; an
+        interrupted stream leaves the history unchanged. Errors propagate to
+        the caller.
+        """
+        started = time.perf_counter()
+        
+        # Questions about the user's own data don't need the model
+        local_answer = self.answer_locally(user_message, user_id)
+        if local_answer is not None:
+            self.metrics.record(LOCAL, started, stream=True, response_text=local_answer)
+            yield local_answer
+            return
+        
+        # Generic questions may already have a shared answer
+        generic = self.is_generic_question(user_message, user_id)
+        if generic:
+            cached_answer = self.response_cache.get(user_message)
+            if cached_answer is not None:
+                self.conversations.append(user_id, user_message, cached_answer)
+                self.metrics.record(CACHE, started, stream=True, response_text=cached_answer)
+                yield cached_answer
+                return
+        
+        conversation = self.build_contents(user_message, user_id, generic=generic)
+        call = dict(prompt_size(conversation), generic=generic)
+        
+        # Upstream time includes waiting for the client to read each chunk
+        chunks = []
+        upstream_started = time.perf_counter()
+        try:
+            for chunk in self.guard.stream(lambda timeout: self.client.models.generate_content_stream(
+                model=self.model_name,
+                contents=conversation,
+                config=self._call_config(timeout)
+            )):
+                call.setdefault('first_chunk_ms', round((time.perf_counter() - upstream_started) * 1000, 1))
+                # Gemini reports usage on the last chunk
+                call.update(usage_tokens(chunk))
+                if chunk.text:
+                    chunks.append(chunk.text)
+                    yield chunk.text
+        except GeneratorExit:
+            self.metrics.record(MODEL, started, stream=True, error='aborted', **call)
+            raise
+        except Exception as e:
+            self.metrics.record(MODEL, started, stream=True, error=type(e).__name__, **call)
+            raise
+        call['upstream_ms'] = round((time.perf_counter() - upstream_started) * 1000, 1)
+        
+        response_text = ''.join(chunks)
+        if generic:
+            self.response_cache.set(user_message, response_text, self._response_cache_ttl())
+        self.conversations.append(user_id, user_message, response_text)
+        self.metrics.record(MODEL, started, stream=True, response_text=response_text, **call)
+    
+    def _call_config(self, timeout):
+        """Request config making the SDK give up after `timeout` seconds"""
+        return {"http_options": {"timeout": int(timeout * 1000)}}
+    
+    def _response_cache_ttl(self):
+        return current_app.config.get('CHATBOT_RESPONSE_CACHE_TTL', 0)
+    
     def reset_conversation(self, user_id):
         """Reset the conversation history for a specific user"""
-        if user_id in self.history:
-            self.history[user_id] = []
+        self.conversations.reset(user_id)
         
         return {
             "status": "success",
@@ -227,8 +594,15 @@ class HRChatbot:
             }
             
         elif info_type == 'upcoming_trainings':
-            # Get actual upcoming training data
-            trainings = TrainingEnrollment.query.filter_by(employee_id=user_id).all()
+            # Same enrollments as the upcoming count in the user context
+            trainings = TrainingEnrollment.query.filter_by(
+                employee_id=user_id,
+                status='enrolled'
+            ).join(TrainingEnrollment.training).filter(
+                TrainingProgram.status.in_(['upcoming', 'in-progress'])
+            ).options(
+                contains_eager(TrainingEnrollment.training)
+            ).order_by(TrainingProgram.start_date).all()
             training_data = []
             
             for enrollment in trainings:
@@ -236,7 +610,7 @@ class HRChatbot:
                     "title": enrollment.training.title,
                     "start_date": enrollment.training.start_date.strftime("%Y-%m-%d"),
                     "end_date": enrollment.training.end_date.strftime("%Y-%m-%d"),
-                    "status": enrollment.status
+                    "status": enrollment.training.status
                 })
                 
             return {
@@ -291,7 +665,7 @@ class HRChatbot:
                 if leave.get('status') == 'approved' and leave.get('approved_by'):
                     details += f"<br><span class='text-success'>Approved by {leave.get('approved_by')} on {leave.get('approval_date')}</span>"
                 
-                if leave.get('status') == 'rejected':
+                if leave.get('status') in ('denied', 'rejected'):
                     rejection_reason = leave.get('rejection_reason') or 'No reason provided'
                     details += f"<br><span class='text-danger'>Rejected: {rejection_reason}</span>"
                 
@@ -320,7 +694,7 @@ class HRChatbot:
         """Helper method to get CSS class for leave status"""
         if status == 'approved':
             return 'success'
-        elif status == 'rejected':
+        elif status in ('denied', 'rejected'):
             return 'danger'
         elif status == 'pending':
             return 'warning'
@@ -0,0 +1,87 @@
+"""
+Command line tasks for the HR System.
+Registers `flask` commands for maintenance work that runs outside requests.
+"""
+
+import click
+
+
+def register_commands(app):
+    """Register custom CLI commands with the Flask application"""
+
+    @app.cli.command('run-report-jobs')
+    @click.option('--limit', type=int, default=None, help='Maximum number of jobs to run.')
+    def run_report_jobs_command(limit):
+        """Build queued report exports."""
+        from utils.report_jobs import run_pending_jobs
+
+        completed, failed = run_pending_jobs(app, limit=limit)
+        click.echo(f"Report jobs: {completed} completed, {failed} failed")
+
+    @app.cli.command('purge-report-jobs')
+    @click.option('--days', type=int, default=7, help='Delete finished jobs older than this many days.')
+    def purge_report_jobs_command(days):
+        """Delete old finished report exports."""
+        from utils.report_jobs import purge_report_jobs
+
+        deleted = purge_report_jobs(older_than_days=days)
+        click.echo(f"Deleted {deleted} report jobs")
+
+    @app.cli.command('send-queued-mail')
+    @click.option('--batch-size', type=int, default=None, help='Messages sent per SMTP connection.')
+    def send_queued_mail_command(batch_size):
+        """Send due messages from the outbound mail queue."""
+        from utils.mail_queue import send_queued_mail
+
+        sent, failed = send_queued_mail(app, batch_size=batch_size)
+        click.echo(f"Mail queue: {sent} sent, {failed} failed")
+
+    @app.cli.command('purge-sent-mail')
+    @click.option('--days', type=int, default=30, help='Delete sent messages older than this many days.')
+    def purge_sent_mail_command(days):
+        """Delete old sent messages from the outbound mail queue."""
+        from utils.mail_queue import purge_sent_mail
+
+        deleted = purge_sent_mail(older_than_days=days)
+        click.echo(f"Deleted {deleted} sent messages")
+
+    @app.cli.command('compact-login-attempts')
+    @click.option('--days', type=int, default=None,
+                  help='Keep raw attempts from this many days back (default LOGIN_ATTEMPT_RETENTION_DAYS).')
+    @click.option('--batch-size', type=int, default=5000, help='Rows summarized and deleted per transaction.')
+    def compact_login_attempts_command(days, batch_size):
+        """Roll old login attempts into per-IP daily totals."""
+        from utils.login_retention import compact_login_attempts
+
+        if days is None:
+            days = app.config['LOGIN_ATTEMPT_RETENTION_DAYS']
+        deleted, batches = compact_login_attempts(older_than_days=days, batch_size=batch_size)
+        click.echo(f"Compacted {deleted} login attempts in {batches} batches")
+
+    @app.cli.command('create-tables')
+    def create_tables_command():
+        """Create tables declared on the models that are missing from the database."""
+        from utils.schema import create_missing_tables
+
+        created = create_missing_tables()
+        for name in created:
+            click.echo(f"Created {name}")
+        click.echo(f"Created {len(created)} tables")
+
+    @app.cli.command('create-indexes')
+    def create_indexes_command():
+        """Create indexes declared on the models that are missing from the database."""
+        from models import db
+
+        inspector = db.inspect(db.engine)
+        created = 0
+        for table in db.metadata.sorted_tables:
+            if not inspector.has_table(table.name):
+                continue
+            existing = {index['name'] for index in inspector.get_indexes(table.name)}
+            for index in table.indexes:
+                if index.name not in existing:
+                    index.create(db.engine)
+                    created += 1
+                    click.echo(f"Created {index.name}")
+        click.echo(f"Created {created} indexes")
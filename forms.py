@@ -235,7 +235,8 @@ class SalaryReportForm(FlaskForm):
     export_format = SelectField('Export Format', choices=[
         ('html', 'Web View'),
         ('csv', 'CSV File'),
-        ('pdf', 'PDF File')
+        ('pdf', 'PDF File'),
+        ('parquet', 'Parquet File (raw data)')
     ])
     submit = SubmitField('Generate Report')
 
@@ -408,7 +409,8 @@ class AttendanceReportForm(FlaskForm):
                         choices=[
                             ('html', 'View in Browser'),
                             ('csv', 'Export as CSV'),
-                            ('pdf', 'Export as PDF')
+                            ('pdf', 'Export as PDF'),
+                            ('parquet', 'Export as Parquet (raw data)')
                         ],
                         default='html')
     submit = SubmitField('Generate Report')
@@ -1,10 +1,8 @@
 """
 Vercel serverless entry point for the HR System.
 """
-from app import create_app
-
-# Create Flask application
-app = create_app()
+# app.py creates the application on import; reuse it rather than building a second one
+from app import app
 
 # Add a simple health check route
 @app.route('/health')
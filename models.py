@@ -1,10 +1,10 @@
 from flask_sqlalchemy import SQLAlchemy
 from flask_login import UserMixin
 from argon2 import PasswordHasher
-from argon2.exceptions import VerifyMismatchError
+from utils.passwords import password_hashing
 from itsdangerous import URLSafeTimedSerializer
 from flask import current_app as app
-from datetime import datetime, timedelta
+from datetime import datetime
 from sqlalchemy.dialects.postgresql import UUID, JSONB
 from sqlalchemy import text
 
@@ -41,14 +41,10 @@ class User(UserMixin, db.Model):
         return self.username
     
     def set_password(self, password):
-        self.password_hash = ph.hash(password)
+        self.password_hash = password_hashing.hash(password)
         
     def verify_password(self, password):
-        try:
-            ph.verify(self.password_hash, password)
-            return True
-        except VerifyMismatchError:
-            return False
+        return password_hashing.verify(self.password_hash, password)
             
     def is_admin(self):
         return self.role == 'admin'
@@ -68,6 +64,11 @@ class User(UserMixin, db.Model):
         
         # Return user if found and password matches
         if user and user.verify_password(password):
+            # Upgrade hashes made with older argon2 parameters
+            if password_hashing.needs_rehash(user.password_hash):
+                user.set_password(password)
+                db.session.commit()
+                password_hashing.record_rehash()
             return user
         
         return None
@@ -93,72 +94,33 @@ class LoginAttempt(db.Model):
     ip_address = db.Column(db.String(45), nullable=False, index=True)  # IPv6 can be up to 45 chars
     username_or_email = db.Column(db.String(120), nullable=True)
     success = db.Column(db.Boolean, default=False)
-    timestamp = db.Column(db.DateTime, default=datetime.utcnow)
+    timestamp = db.Column(db.DateTime, default=datetime.utcnow, index=True)
     user_agent = db.Column(db.String(255), nullable=True)
     
-    @classmethod
-    def is_rate_limited(cls, ip_address, window_minutes=15, max_attempts=5):
-        """
-        Check if the IP address is rate limited
-        
-        Args:
-            ip_address: The IP address to check
-            window_minutes: Time window in minutes to consider (default: 15)
-            max_attempts: Maximum number of failed attempts allowed in the window (default: 5)
-            
-        Returns:
-            tuple: (is_limited, message, remaining_attempts)
-        """
-        # Calculate the timestamp for the window
-        window_start = datetime.utcnow() - timedelta(minutes=window_minutes)
-        
-        # Count failed attempts in the window
-        failed_attempts = cls.query.filter(
-            cls.ip_address == ip_address,
-            cls.success == False,
-            cls.timestamp >= window_start
-        ).count()
-        
-        if failed_attempts >= max_attempts:
-            # Find the most recent attempt to calculate unlock time
-            latest_attempt = cls.query.filter(
-                cls.ip_address == ip_address,
-                cls.success == False
-            ).order_by(cls.timestamp.desc()).first()
-            
-            if latest_attempt:
-                unlock_time = latest_attempt.timestamp + timedelta(minutes=window_minutes)
-                now = datetime.utcnow()
-                
-                if now < unlock_time:
-                    time_remaining = unlock_time - now
-                    minutes = time_remaining.seconds // 60
-                    seconds = time_remaining.seconds % 60
-                    message = f"Too many failed login attempts. Please try again in {minutes}m {seconds}s."
-                    return True, message, 0
-        
-        # IP is not rate limited
-        remaining = max_attempts - failed_attempts
-        return False, None, remaining
+    __table_args__ = (
+        # Covers the failed-attempts-in-window lookups per IP
+        db.Index('ix_login_attempt_ip_success_timestamp', 'ip_address', 'success', 'timestamp'),
+    )
+
+class LoginAttemptDaily(db.Model):
+    """Per-IP daily totals of login attempts that aged out of login_attempt"""
+    id = db.Column(db.Integer, primary_key=True)
+    ip_address = db.Column(db.String(45), nullable=False)
+    day = db.Column(db.Date, nullable=False)
+    attempts = db.Column(db.Integer, nullable=False, default=0)
+    failures = db.Column(db.Integer, nullable=False, default=0)
+    first_seen = db.Column(db.DateTime)
+    last_seen = db.Column(db.DateTime)
     
-    @classmethod
-    def log_attempt(cls, ip_address, username_or_email=None, success=False, user_agent=None):
-        """Log a login attempt in the database"""
-        attempt = cls(
-            ip_address=ip_address,
-            username_or_email=username_or_email,
-            success=success,
-            user_agent=user_agent
-        )
-        db.session.add(attempt)
-        db.session.commit()
-        
-    @classmethod
-    def reset_for_ip(cls, ip_address):
-        """Reset failed attempts for an IP after successful login"""
-        # This could either delete the attempts or mark them as handled
-        # Here we'll leave the record for auditing but add successful login
-        cls.log_attempt(ip_address, success=True)
+    __table_args__ = (
+        db.UniqueConstraint('ip_address', 'day', name='unique_login_attempt_day'),
+    )
+
+class LoginThrottle(db.Model):
+    """Shared login rate limit state, one token bucket per client key"""
+    key = db.Column(db.String(64), primary_key=True)
+    tokens = db.Column(db.Float, nullable=False)
+    updated_at = db.Column(db.Float, nullable=False)  # Unix time of the last refill
 
 class EmployeeProfile(db.Model):
     id = db.Column(db.Integer, primary_key=True)
@@ -256,7 +218,7 @@ class EmployeeProfile(db.Model):
 
 class LeaveRequest(db.Model):
     id = db.Column(db.Integer, primary_key=True)
-    employee_id = db.Column(db.Integer, db.ForeignKey('user.id'), nullable=False)
+    employee_id = db.Column(db.Integer, db.ForeignKey('user.id'), nullable=False, index=True)
     approver_id = db.Column(db.Integer, db.ForeignKey('user.id'), nullable=True)
     
     leave_type = db.Column(db.String(50), nullable=False)  # vacation, sick, personal, professional, sabbatical etc.
@@ -384,7 +346,7 @@ class TrainingProgram(db.Model):
 class TrainingEnrollment(db.Model):
     id = db.Column(db.Integer, primary_key=True)
     training_id = db.Column(db.Integer, db.ForeignKey('training_program.id'), nullable=False)
-    employee_id = db.Column(db.Integer, db.ForeignKey('user.id'), nullable=False)
+    employee_id = db.Column(db.Integer, db.ForeignKey('user.id'), nullable=False, index=True)
     status = db.Column(db.String(20), default='enrolled')  # enrolled, completed, dropped, failed
     enrollment_date = db.Column(db.DateTime, default=datetime.utcnow)
     completion_date = db.Column(db.DateTime)
@@ -473,7 +435,7 @@ class TeachingUnit(db.Model):
     title = db.Column(db.String(100), nullable=False)
     code = db.Column(db.String(20))
     academic_term = db.Column(db.String(50), nullable=False)
-    employee_id = db.Column(db.Integer, db.ForeignKey('user.id'), nullable=False)
+    employee_id = db.Column(db.Integer, db.ForeignKey('user.id'), nullable=False, index=True)
     start_date = db.Column(db.Date, nullable=False)
     end_date = db.Column(db.Date, nullable=False)
     hours_per_week = db.Column(db.Float, default=0)
@@ -602,7 +564,7 @@ class UnitAttendance(db.Model):
     """Attendance records for teaching units"""
     
     id = db.Column(db.Integer, primary_key=True)
-    teaching_unit_id = db.Column(db.Integer, db.ForeignKey('teaching_unit.id'), nullable=False)
+    teaching_unit_id = db.Column(db.Integer, db.ForeignKey('teaching_unit.id'), nullable=False, index=True)
     date = db.Column(db.Date, nullable=False)
     status = db.Column(db.String(20), default='present')  # present, absent, late, excused
     hours = db.Column(db.Float, default=0)  # Hours attended/taught
@@ -635,7 +597,7 @@ class UnitAttendance(db.Model):
 class Payroll(db.Model):
     """Payroll model for employee payments"""
     id = db.Column(db.Integer, primary_key=True)
-    employee_id = db.Column(db.Integer, db.ForeignKey('user.id'), nullable=False)
+    employee_id = db.Column(db.Integer, db.ForeignKey('user.id'), nullable=False, index=True)
     period_start = db.Column(db.Date, nullable=False)
     period_end = db.Column(db.Date, nullable=False)
     base_pay = db.Column(db.Float, default=0.0)
@@ -778,3 +740,97 @@ class PayrollUnit(db.Model):
     # Relationships
     payroll = db.relationship('Payroll')
     teaching_unit = db.relationship('TeachingUnit', foreign_keys=[teaching_unit_id])
+
+class ReportJob(db.Model):
+    """Background report export, built by the report job worker"""
+    id = db.Column(db.Integer, primary_key=True)
+    kind = db.Column(db.String(50), nullable=False)  # employee_demographics, time_off_analysis, training_analytics
+    params = db.Column(db.Text, nullable=False, default='{}')  # JSON-encoded export parameters
+    status = db.Column(db.String(20), nullable=False, default='pending', index=True)  # pending, running, completed, failed
+    progress = db.Column(db.Integer, default=0)  # 0-100
+    message = db.Column(db.String(255), nullable=True)
+    error = db.Column(db.Text, nullable=True)
+    
+    requested_by = db.Column(db.Integer, db.ForeignKey('user.id'), nullable=False)
+    
+    # Finished artifact, stored in the database so any instance can serve it
+    filename = db.Column(db.String(255), nullable=True)
+    mimetype = db.Column(db.String(100), nullable=True)
+    artifact = db.deferred(db.Column(db.LargeBinary, nullable=True))
+    
+    created_at = db.Column(db.DateTime, default=datetime.utcnow)
+    started_at = db.Column(db.DateTime, nullable=True)
+    finished_at = db.Column(db.DateTime, nullable=True)
+    
+    # Relationships
+    requester = db.relationship('User', backref=db.backref('report_jobs', lazy='dynamic'))
+    
+    @property
+    def is_finished(self):
+        return self.status in ('completed', 'failed')
+    
+    @property
+    def status_badge_color(self):
+        """Return Bootstrap color class based on status"""
+        if self.status == 'completed':
+            return 'bg-success'
+        elif self.status == 'failed':
+            return 'bg-danger'
+        elif self.status == 'running':
+            return 'bg-info'
+        else:  # pending
+            return 'bg-warning'
+    
+    def to_dict(self):
+        """Serialize the job status for the polling endpoint"""
+        from flask import url_for
+        return {
+            'id': self.id,
+            'kind': self.kind,
+            'status': self.status,
+            'progress': self.progress or 0,
+            'message': self.message,
+            'error': self.error,
+            'filename': self.filename,
+            'created_at': self.created_at.isoformat() if self.created_at else None,
+            'started_at': self.started_at.isoformat() if self.started_at else None,
+            'finished_at': self.finished_at.isoformat() if self.finished_at else None,
+            'status_url': url_for('reports.job_status_json', job_id=self.id),
+            'download_url': url_for('reports.job_download', job_id=self.id) if self.status == 'completed' else None
+        }
+    
+    def __repr__(self):
+        return f'<ReportJob {self.id}: {self.kind} {self.status}>'
+
+class OutboundEmail(db.Model):
+    """Queued outgoing email, sent by the mail queue worker"""
+    id = db.Column(db.Integer, primary_key=True)
+    kind = db.Column(db.String(50), nullable=True)  # reset_password, leave_processed, payroll_processed
+    recipients = db.Column(db.Text, nullable=False)  # Comma separated addresses
+    subject = db.Column(db.String(255), nullable=False)
+    body = db.Column(db.Text, nullable=False)
+    html = db.Column(db.Text, nullable=True)
+    status = db.Column(db.String(20), nullable=False, default='pending')  # pending, sending, sent, failed
+    attempts = db.Column(db.Integer, nullable=False, default=0)
+    # Earliest time of the next send; while sending, when the claim expires
+    next_attempt_at = db.Column(db.DateTime, nullable=False, default=datetime.utcnow)
+    last_error = db.Column(db.Text, nullable=True)
+    created_at = db.Column(db.DateTime, default=datetime.utcnow)
+    sent_at = db.Column(db.DateTime, nullable=True)
+    
+    __table_args__ = (
+        db.Index('ix_outbound_email_status_next_attempt_at', 'status', 'next_attempt_at'),
+    )
+    
+    def __repr__(self):
+        return f'<OutboundEmail {self.id}: {self.subject} {self.status}>'
+
+class ChatConversation(db.Model):
+    """Compacted chatbot history for one user, kept across restarts"""
+    user_id = db.Column(db.Integer, db.ForeignKey('user.id'), primary_key=True)
+    summary = db.Column(db.Text, nullable=True)  # Rolling summary of trimmed turns
+    turns = db.Column(db.Text, nullable=False, default='[]')  # JSON list of recent {role, text}
+    updated_at = db.Column(db.DateTime, default=datetime.utcnow, onupdate=datetime.utcnow)
+    
+    def __repr__(self):
+        return f'<ChatConversation {self.user_id}>'
@@ -3,7 +3,7 @@ Admin routes for the HR system.
 Handles administrator functionality.
 """
 
-from flask import Blueprint, render_template, redirect, url_for, flash, current_app
+from flask import Blueprint, render_template, redirect, url_for, flash, current_app, jsonify, request
 from flask_login import login_required, current_user
 from models import User, LoginAttempt, db
 from functools import wraps
@@ -37,6 +37,40 @@ def login_attempts():
     attempts = LoginAttempt.query.order_by(LoginAttempt.timestamp.desc()).limit(100).all()
     return render_template('admin_login_attempts.html', attempts=attempts)
 
+@admin_bp.route('/metrics')
+@login_required
+@admin_required
+def metrics():
+    """Cache, password hashing, chatbot and Gemini call counters for this worker process"""
+    from utils.cache import dashboard_cache, identity_cache, chatbot_context_cache
+    from utils.passwords import password_hashing
+    from utils.conversations import conversation_store
+    from utils.upstream import gemini_guard
+    from utils.chatbot_metrics import chatbot_metrics
+    from chatbot import chatbot
+    return jsonify({
+        'dashboard_cache': dashboard_cache.stats(),
+        'identity_cache': identity_cache.stats(),
+        'chatbot_context_cache': chatbot_context_cache.stats(),
+        'password_hashing': password_hashing.stats(),
+        'chatbot_conversations': conversation_store.stats(),
+        'chatbot_response_cache': chatbot.response_cache.stats(),
+        'gemini': gemini_guard.stats(),
+        'chatbot_messages': chatbot_metrics.stats()
+    })
+
+@admin_bp.route('/metrics/chatbot')
+@login_required
+@admin_required
+def chatbot_message_metrics():
+    """Prompt size, token and latency samples of the latest chatbot messages"""
+    from utils.chatbot_metrics import chatbot_metrics
+    limit = request.args.get('limit', 100, type=int)
+    return jsonify({
+        'stats': chatbot_metrics.stats(),
+        'samples': chatbot_metrics.recent(limit)
+    })
+
 @admin_bp.route('/fix-database')
 @login_required
 @admin_required
@@ -3,10 +3,11 @@ API routes for the HR system.
 Handles JSON responses for the chatbot and interactive elements.
 """
 
-from flask import Blueprint, jsonify, request, current_app
+from flask import Blueprint, jsonify, request, current_app, Response, stream_with_context
 from flask_login import login_required, current_user
 from models import User, LeaveRequest, TrainingEnrollment, TeachingUnit
 from chatbot import chatbot
+from routes.dashboard import DASHBOARD_WIDGETS, dashboard_widget
 import json
 
 api_bp = Blueprint('api', __name__, url_prefix='/api')
@@ -39,6 +40,46 @@ def chatbot_message():
             "message": "An error occurred processing your request"
         }), 500
 
+def _sse_event(event, data):
+    """Format one Server-Sent Events message with a JSON payload"""
+    return f"event: {event}\ndata: {json.dumps(data)}\n\n"
+
+@api_bp.route('/chatbot/stream', methods=['POST'])
+@login_required
+def chatbot_stream():
+    """Stream the chatbot's answer as Server-Sent Events"""
+    data = request.get_json(silent=True)
+    
+    # Ensure message is provided
+    if not data or 'message' not in data:
+        return jsonify({
+            "status": "error",
+            "message": "No message provided"
+        }), 400
+    
+    user_message = data['message']
+    user_id = current_user.id
+    
+    def events():
+        # 'delta' events carry text as it is generated, then one 'done' or 'error'
+        try:
+            for text in chatbot.stream_response(user_message, user_id):
+                yield _sse_event('delta', {"text": text})
+            yield _sse_event('done', {"status": "success"})
+        except Exception as e:
+            current_app.logger.error(f"Chatbot stream error: {str(e)}")
+            yield _sse_event('error', {
+                "status": "error",
+                "message": "I'm having trouble connecting to my knowledge base. Please try again later."
+            })
+    
+    return Response(
+        stream_with_context(events()),
+        mimetype='text/event-stream',
+        # Keep proxies from buffering the stream
+        headers={'Cache-Control': 'no-cache', 'X-Accel-Buffering': 'no'}
+    )
+
 @api_bp.route('/chatbot/reset', methods=['POST'])
 @login_required
 def chatbot_reset():
@@ -67,6 +108,30 @@ def chatbot_user_info(info_type):
             "message": f"An error occurred getting {info_type} information"
         }), 500
 
+# Dashboard widget endpoints
+@api_bp.route('/dashboard/<widget>', methods=['GET'])
+@login_required
+def dashboard_widget_data(widget):
+    """Get the data of one dashboard widget for the current user"""
+    if widget not in DASHBOARD_WIDGETS:
+        return jsonify({
+            "status": "error",
+            "message": f"Unknown dashboard widget: {widget}"
+        }), 404
+    
+    try:
+        return jsonify({
+            "status": "success",
+            "widget": widget,
+            "data": dashboard_widget(current_user.id, widget)
+        })
+    except Exception as e:
+        current_app.logger.error(f"Dashboard widget {widget} error: {str(e)}")
+        return jsonify({
+            "status": "error",
+            "message": f"An error occurred loading the {widget} widget"
+        }), 500
+
 @api_bp.route('/api/users/search', methods=['GET'])
 @login_required
 def search_users():
@@ -10,11 +10,8 @@ from forms import AttendanceReportForm, AttendanceForm
 from utils.decorators import hr_required, hr_or_admin_required
 import io, csv, tempfile, os
 from datetime import datetime, timedelta
-from reportlab.lib import colors
-from reportlab.lib.pagesizes import letter
-from reportlab.platypus import SimpleDocTemplate, Table, TableStyle, Paragraph, Spacer
-from reportlab.lib.styles import getSampleStyleSheet
 from sqlalchemy import func, and_, or_
+from sqlalchemy.orm import joinedload
 
 attendance_bp = Blueprint('attendance', __name__)
 
@@ -35,16 +32,29 @@ def index():
                     TeachingUnit.end_date >= cutoff_date
                 )
             )
+        ).options(
+            # Each unit shows its teacher's display name
+            joinedload(TeachingUnit.employee).joinedload(User.profile)
         ).order_by(TeachingUnit.start_date.desc()).all()
         
+        # Count records and present records for all units in one query
+        counts = {}
+        if units:
+            counts = {
+                row.teaching_unit_id: (row.total, row.present)
+                for row in db.session.query(
+                    UnitAttendance.teaching_unit_id,
+                    func.count(UnitAttendance.id).label('total'),
+                    func.coalesce(func.sum(db.case((UnitAttendance.status == 'present', 1), else_=0)), 0).label('present')
+                ).filter(
+                    UnitAttendance.teaching_unit_id.in_([unit.id for unit in units])
+                ).group_by(UnitAttendance.teaching_unit_id)
+            }
+        
         # Get attendance statistics for all units
         unit_stats = {}
         for unit in units:
-            total_records = UnitAttendance.query.filter_by(teaching_unit_id=unit.id).count()
-            present_records = UnitAttendance.query.filter_by(
-                teaching_unit_id=unit.id,
-                status='present'
-            ).count()
+            total_records, present_records = counts.get(unit.id, (0, 0))
             
             # Calculate attendance rate
             rate = (present_records / total_records * 100) if total_records > 0 else 0
@@ -150,6 +160,15 @@ def report():
         if unit_id > 0:
             query = query.filter(UnitAttendance.teaching_unit_id == unit_id)
             
+        # Typed formats download the raw attendance dataset for the same filters
+        if report_format in ('parquet', 'arrow'):
+            return redirect(url_for('reports.export_dataset', dataset='attendance',
+                                    export_format=report_format,
+                                    employee_id=employee_id,
+                                    unit_id=unit_id,
+                                    start_date=start_date.strftime('%Y-%m-%d') if start_date else '',
+                                    end_date=end_date.strftime('%Y-%m-%d') if end_date else ''))
+        
         # Get results
         attendances = query.order_by(UnitAttendance.date.desc()).all()
         
@@ -180,46 +199,7 @@ def report():
         attendance_rate = ((present_hours + late_hours + excused_hours) / total_hours * 100) if total_hours > 0 else 0
         
         # Faculty breakdown - group attendance by faculty
-        faculty_breakdown = {}
-        for attendance in attendances:
-            teacher = attendance.teaching_unit.employee
-            teacher_id = teacher.id
-            teacher_name = teacher.get_display_name()
-            
-            if teacher_id not in faculty_breakdown:
-                faculty_breakdown[teacher_id] = {
-                    'name': teacher_name,
-                    'total_hours': 0,
-                    'present_hours': 0,
-                    'late_hours': 0,
-                    'excused_hours': 0,
-                    'absent_hours': 0,
-                    'rate': 0
-                }
-            
-            # Add hours to faculty totals
-            faculty_breakdown[teacher_id]['total_hours'] += attendance.hours
-            
-            if attendance.status == 'present':
-                faculty_breakdown[teacher_id]['present_hours'] += attendance.hours
-            elif attendance.status == 'late':
-                faculty_breakdown[teacher_id]['late_hours'] += attendance.hours
-            elif attendance.status == 'excused':
-                faculty_breakdown[teacher_id]['excused_hours'] += attendance.hours
-            elif attendance.status == 'absent':
-                faculty_breakdown[teacher_id]['absent_hours'] += attendance.hours
-        
-        # Calculate attendance rate for each faculty
-        for faculty_id in faculty_breakdown:
-            faculty = faculty_breakdown[faculty_id]
-            faculty_total = faculty['total_hours']
-            if faculty_total > 0:
-                weighted_hours = (faculty['present_hours'] + 
-                                  faculty['late_hours'] * 0.75 + 
-                                  faculty['excused_hours'] * 0.5)
-                faculty['rate'] = (weighted_hours / faculty_total) * 100
-            else:
-                faculty['rate'] = 0
+        faculty_breakdown = _faculty_breakdown(attendances)
         
         summary = {
             'total_records': total_records,
@@ -260,6 +240,12 @@ def report():
             with tempfile.NamedTemporaryFile(suffix='.pdf', delete=False) as temp_file:
                 temp_path = temp_file.name
                 
+            # ReportLab is only imported by PDF exports
+            from reportlab.lib import colors
+            from reportlab.lib.pagesizes import letter
+            from reportlab.platypus import SimpleDocTemplate, Table, TableStyle, Paragraph, Spacer
+            from reportlab.lib.styles import getSampleStyleSheet
+            
             # Use ReportLab to generate PDF
             doc = SimpleDocTemplate(temp_path, pagesize=letter)
             styles = getSampleStyleSheet()
@@ -395,6 +381,59 @@ def generate_employee_report(employee_id):
         end_date=end_date
     )
 
+def _faculty_breakdown(attendances):
+    """
+    Group attendance hours and weighted attendance rate by faculty member
+    
+    Args:
+        attendances: Attendance records with teaching_unit.employee loaded
+    
+    Returns:
+        dict: Employee id -> name, hour totals per status and rate
+    """
+    faculty_breakdown = {}
+    for attendance in attendances:
+        teacher = attendance.teaching_unit.employee
+        teacher_id = teacher.id
+        teacher_name = teacher.get_display_name()
+        
+        if teacher_id not in faculty_breakdown:
+            faculty_breakdown[teacher_id] = {
+                'name': teacher_name,
+                'total_hours': 0,
+                'present_hours': 0,
+                'late_hours': 0,
+                'excused_hours': 0,
+                'absent_hours': 0,
+                'rate': 0
+            }
+        
+        # Add hours to faculty totals
+        faculty_breakdown[teacher_id]['total_hours'] += attendance.hours
+        
+        if attendance.status == 'present':
+            faculty_breakdown[teacher_id]['present_hours'] += attendance.hours
+        elif attendance.status == 'late':
+            faculty_breakdown[teacher_id]['late_hours'] += attendance.hours
+        elif attendance.status == 'excused':
+            faculty_breakdown[teacher_id]['excused_hours'] += attendance.hours
+        elif attendance.status == 'absent':
+            faculty_breakdown[teacher_id]['absent_hours'] += attendance.hours
+    
+    # Calculate attendance rate for each faculty
+    for faculty_id in faculty_breakdown:
+        faculty = faculty_breakdown[faculty_id]
+        faculty_total = faculty['total_hours']
+        if faculty_total > 0:
+            weighted_hours = (faculty['present_hours'] + 
+                              faculty['late_hours'] * 0.75 + 
+                              faculty['excused_hours'] * 0.5)
+            faculty['rate'] = (weighted_hours / faculty_total) * 100
+        else:
+            faculty['rate'] = 0
+    
+    return faculty_breakdown
+
 def calculate_attendance_stats(employee_id, start_date, end_date):
     """Calculate detailed attendance statistics for payroll and reports"""
     teaching_units = TeachingUnit.query.filter_by(employee_id=employee_id).all()
@@ -457,8 +496,14 @@ def calculate_attendance_stats(employee_id, start_date, end_date):
 
 def generate_pdf_report(employee, attendance_records, stats, start_date, end_date):
     """Generate a PDF attendance report"""
+    # ReportLab is only imported by PDF exports
+    from reportlab.lib import colors
+    from reportlab.lib.pagesizes import letter
+    from reportlab.platypus import SimpleDocTemplate, Table, TableStyle, Paragraph, Spacer
+    from reportlab.lib.styles import getSampleStyleSheet
+    
     # Create a PDF in memory
-    buffer = BytesIO()
+    buffer = io.BytesIO()
     doc = SimpleDocTemplate(buffer, pagesize=letter)
     styles = getSampleStyleSheet()
     elements = []
@@ -5,13 +5,22 @@ Handles login, logout, signup, and password reset functionality.
 
 from flask import Blueprint, render_template, redirect, url_for, flash, request, current_app
 from flask_login import login_user, logout_user, current_user, login_required
-from models import User, LoginAttempt, db
+from models import User, db
 from forms import LoginForm, SignupForm, RequestResetForm, ResetPasswordForm
 from datetime import datetime
-from flask_mail import Message
+from utils.rate_limit import get_login_rate_limiter, record_login_attempt
+from utils.passwords import PasswordHashingBusy
+from utils.mail_queue import queue_email
 
 auth_bp = Blueprint('auth', __name__)
 
+@auth_bp.errorhandler(PasswordHashingBusy)
+def password_hashing_busy(error):
+    """Ask the user to retry when every password hashing slot is taken"""
+    current_app.logger.warning(f"Password hashing busy on {request.path} from IP {request.remote_addr}")
+    flash('The server is busy right now. Please try again in a moment.', 'warning')
+    return redirect(request.url)
+
 @auth_bp.route('/login', methods=['GET', 'POST'])
 def login():
     """Handle user login"""
@@ -19,15 +28,23 @@ def login():
         return redirect(url_for('dashboard.index'))
     
     form = LoginForm()
+    limiter = get_login_rate_limiter()
     if form.validate_on_submit():
+        # Refuse locked out clients before checking the password
+        is_limited, limit_message, attempts_left = limiter.check(request.remote_addr)
+        if is_limited:
+            record_login_attempt(request.remote_addr, form.username_or_email.data, success=False, user_agent=request.user_agent.string)
+            flash(limit_message, 'danger')
+            return render_template('login.html', form=form, rate_limited=True)
+        
         # Handle login form submission
         username_or_email = form.username_or_email.data
         user = User.authenticate(username_or_email, form.password.data)
         
         if user:
-            # Successful login - reset login attempts
-            LoginAttempt.log_attempt(request.remote_addr, username_or_email, success=True, user_agent=request.user_agent.string)
-            LoginAttempt.reset_for_ip(request.remote_addr)
+            # Successful login - the client's failures are kept, so logging
+            # into one account between guesses doesn't lift the lockout
+            record_login_attempt(request.remote_addr, username_or_email, success=True, user_agent=request.user_agent.string)
             
             login_user(user, remember=form.remember.data)
             next_page = request.args.get('next')
@@ -38,10 +55,10 @@ def login():
             return redirect(next_page or url_for('dashboard.index'))
         else:
             # Failed login - record the attempt
-            LoginAttempt.log_attempt(request.remote_addr, username_or_email, success=False, user_agent=request.user_agent.string)
+            record_login_attempt(request.remote_addr, username_or_email, success=False, user_agent=request.user_agent.string)
             
             # Get updated count for display
-            is_limited, limit_message, attempts_left = LoginAttempt.is_rate_limited(request.remote_addr)
+            is_limited, limit_message, attempts_left = limiter.record_failure(request.remote_addr)
             
             if attempts_left <= 0:
                 flash('Too many failed login attempts. Your account has been temporarily locked.', 'danger')
@@ -51,7 +68,8 @@ def login():
             # Log the failed attempt
             current_app.logger.warning(f"Failed login attempt for {username_or_email} from IP {request.remote_addr}")
                 
-    return render_template('login.html', form=form, attempts=5-attempts_left if 'attempts_left' in locals() else 0)
+    return render_template('login.html', form=form, max_attempts=limiter.max_attempts,
+                           attempts=limiter.max_attempts-attempts_left if 'attempts_left' in locals() else 0)
 
 @auth_bp.route('/signup', methods=['GET', 'POST'])
 def signup():
@@ -121,16 +139,14 @@ def logout():
     return redirect(url_for('dashboard.landing'))
 
 def send_reset_email(user):
-    from flask import current_app
     token = user.get_reset_token()
-    mail = current_app.extensions['mail']
-    msg = Message('Password Reset Request',
-                  recipients=[user.email])
-    msg.body = f'''To reset your password, visit the following link:
+    body = f'''To reset your password, visit the following link:
 {url_for('auth.reset_token', token=token, _external=True)}
 If you did not make this request then simply ignore this email and no changes will be made.
 '''
-    mail.send(msg)
+    # Sent by the mail queue worker, not during the request
+    queue_email('Password Reset Request', [user.email], body, kind='reset_password')
+    db.session.commit()
 
 @auth_bp.route('/reset_password', methods=['GET', 'POST'])
 def reset_request():
@@ -3,224 +3,359 @@ Dashboard routes for the HR system.
 Handles the main dashboard view for users.
 """
 
-from flask import Blueprint, render_template, redirect, url_for
+from flask import Blueprint, render_template, redirect, url_for, current_app
 from flask_login import login_required, current_user
 from models import EmployeeProfile, TeachingUnit, UnitAttendance, LeaveRequest, TrainingEnrollment, TrainingProgram, Payroll, db
 from datetime import datetime, timedelta
+from utils.cache import dashboard_cache
 
 dashboard_bp = Blueprint('dashboard', __name__)
 
-@dashboard_bp.route('/dashboard')
-@login_required
-def index():
-    """View teaching units - employees see their own, HR/admin see all"""
-    # Get the current user's profile
-    profile = EmployeeProfile.query.filter_by(user_id=current_user.id).first()
+# Number of days shown in the attendance chart
+CHART_DAYS = 7
+
+# Number of entries in the recent activity timeline, including the login entry
+ACTIVITY_LIMIT = 5
+
+def _attendance_weight():
+    """SQL expression weighting an attendance status like TeachingUnit.attendance_rate"""
+    return db.case(
+        (UnitAttendance.status == 'present', 1.0),
+        (UnitAttendance.status == 'late', 0.75),
+        (UnitAttendance.status == 'excused', 0.5),
+        else_=0.0
+    )
+
+def _dashboard_units(user_id):
+    """
+    Get the user's active teaching units with their attendance rates
     
-    # If no profile exists yet, create a default one
-    if not profile:
-        profile = EmployeeProfile(user_id=current_user.id)
-        db.session.add(profile)
-        db.session.commit()
+    Rates are aggregated in one grouped query instead of loading every
+    unit's attendance records.
     
-    # Get attendance statistics for this user
-    teaching_units = TeachingUnit.query.filter_by(
-        employee_id=current_user.id, 
-        status='active'
-    ).all()
+    Returns:
+        list: Dicts with id, title and attendance_rate
+    """
+    rows = db.session.query(
+        TeachingUnit.id,
+        TeachingUnit.title,
+        db.func.count(UnitAttendance.id).label('records'),
+        db.func.coalesce(db.func.sum(_attendance_weight()), 0).label('weighted')
+    ).outerjoin(
+        UnitAttendance, UnitAttendance.teaching_unit_id == TeachingUnit.id
+    ).filter(
+        TeachingUnit.employee_id == user_id,
+        TeachingUnit.status == 'active'
+    ).group_by(TeachingUnit.id, TeachingUnit.title).order_by(TeachingUnit.id).all()
     
-    # Calculate attendance rate across all units
-    attendance_stats = {'rate': 0}
-    if teaching_units:
-        total_rate = sum(unit.attendance_rate for unit in teaching_units)
-        attendance_stats['rate'] = round(total_rate / len(teaching_units), 1)
+    return [{
+        'id': row.id,
+        'title': row.title,
+        'attendance_rate': (row.weighted / row.records * 100) if row.records else 0
+    } for row in rows]
+
+def _dashboard_stats(user_id):
+    """
+    Get every dashboard counter in one query
     
-    # Get leave statistics
-    leave_stats = {
-        'pending': LeaveRequest.query.filter_by(
-            employee_id=current_user.id, 
-            status='pending'
-        ).count(),
-        'approved': LeaveRequest.query.filter_by(
-            employee_id=current_user.id, 
-            status='approved'
-        ).count()
-    }
+    Each figure is a scalar subquery of a single SELECT, so the database
+    is visited once regardless of how many counters the dashboard shows.
+    
+    Returns:
+        dict: profile_id, position and leave/training counters
+    """
+    def count(query):
+        return query.scalar_subquery()
     
-    # Get training statistics
-    training_stats = {
-        'upcoming': TrainingEnrollment.query.filter_by(
-            employee_id=current_user.id, 
-            status='enrolled'
-        ).join(TrainingEnrollment.training).filter(
+    row = db.session.query(
+        db.select(EmployeeProfile.id).where(EmployeeProfile.user_id == user_id).limit(1).scalar_subquery().label('profile_id'),
+        db.select(EmployeeProfile.position).where(EmployeeProfile.user_id == user_id).limit(1).scalar_subquery().label('position'),
+        count(db.select(db.func.count(LeaveRequest.id)).where(
+            LeaveRequest.employee_id == user_id, LeaveRequest.status == 'pending'
+        )).label('pending_leaves'),
+        count(db.select(db.func.count(LeaveRequest.id)).where(
+            LeaveRequest.employee_id == user_id, LeaveRequest.status == 'approved'
+        )).label('approved_leaves'),
+        count(db.select(db.func.count(TrainingEnrollment.id)).join(
+            TrainingProgram, TrainingEnrollment.training_id == TrainingProgram.id
+        ).where(
+            TrainingEnrollment.employee_id == user_id,
+            TrainingEnrollment.status == 'enrolled',
             TrainingProgram.status == 'upcoming'
-        ).count(),
-        'active': TrainingEnrollment.query.filter_by(
-            employee_id=current_user.id
-        ).join(TrainingEnrollment.training).filter(
+        )).label('upcoming_trainings'),
+        count(db.select(db.func.count(TrainingEnrollment.id)).join(
+            TrainingProgram, TrainingEnrollment.training_id == TrainingProgram.id
+        ).where(
+            TrainingEnrollment.employee_id == user_id,
             TrainingProgram.status == 'in-progress'
-        ).count()
-    }
+        )).label('active_trainings')
+    ).one()
     
-    # Get teaching statistics
-    teaching_stats = {
-        'active': TeachingUnit.query.filter_by(
-            employee_id=current_user.id,
-            status='active'
-        ).count()
+    return {
+        'profile_id': row.profile_id,
+        'position': row.position,
+        'leave_stats': {
+            'pending': row.pending_leaves,
+            'approved': row.approved_leaves
+        },
+        'training_stats': {
+            'upcoming': row.upcoming_trainings,
+            'active': row.active_trainings
+        }
     }
+
+def _attendance_chart(user_id, today=None):
+    """
+    Get the daily attendance rates for the chart from one scan of the window
     
-    # Get recent activities - more comprehensive data collection
-    recent_activities = []
+    Returns:
+        dict: labels and attendance_rates for the last CHART_DAYS days
+    """
+    today = today or datetime.now().date()
+    days = [today - timedelta(days=offset) for offset in range(CHART_DAYS - 1, -1, -1)]
     
-    # Add login activity as the first item
-    login_activity = {
-        'title': 'Logged in successfully',
-        'description': 'Welcome to your dashboard',
-        'time': datetime.now().strftime('%b %d, %Y'),
-        'icon': 'fa-sign-in-alt',
-        'icon_class': 'bg-primary'
+    # Daily present / total attendance counts as conditional sums
+    present = UnitAttendance.status == 'present'
+    day_columns = []
+    for index, day in enumerate(days):
+        on_day = UnitAttendance.date == day
+        day_columns.append(db.func.coalesce(db.func.sum(db.case((on_day, 1), else_=0)), 0).label(f'day_{index}_total'))
+        day_columns.append(db.func.coalesce(db.func.sum(db.case((db.and_(on_day, present), 1), else_=0)), 0).label(f'day_{index}_present'))
+    
+    row = db.session.execute(
+        db.select(*day_columns).join(
+            TeachingUnit, UnitAttendance.teaching_unit_id == TeachingUnit.id
+        ).where(
+            TeachingUnit.employee_id == user_id,
+            UnitAttendance.date >= days[0],
+            UnitAttendance.date <= days[-1]
+        )
+    ).one()
+    
+    attendance_rates = []
+    for index in range(CHART_DAYS):
+        total = getattr(row, f'day_{index}_total')
+        present_count = getattr(row, f'day_{index}_present')
+        attendance_rates.append(round(present_count / total * 100, 1) if total else 0)
+    
+    return {
+        'labels': [day.strftime('%a %d') for day in days],
+        'attendance_rates': attendance_rates
     }
-    recent_activities.append(login_activity)
+
+def _activity_style(status, default_icon):
+    """Icon and badge class for an activity status"""
+    if status in ('present', 'approved', 'completed', 'paid'):
+        return 'fa-check-circle', 'bg-success'
+    elif status in ('absent', 'denied', 'dropped', 'failed', 'cancelled'):
+        return 'fa-times-circle', 'bg-danger'
+    elif status == 'late':
+        return 'fa-clock', 'bg-warning'
+    elif status == 'pending':
+        return 'fa-hourglass-half', 'bg-warning'
+    return default_icon, 'bg-info'
+
+def _activity_select(kind, ts, status, title=None, amount=None, notes=None, start_date=None, end_date=None):
+    """
+    SELECT of one activity source with the columns shared by every source
+    
+    Columns a source doesn't have are typed NULLs, so the sources can be
+    combined with UNION ALL.
+    """
+    def column(value, type_):
+        return db.type_coerce(db.null() if value is None else value, type_)
     
-    # Add recent attendance records with more details
-    recent_attendances = UnitAttendance.query.join(
+    return db.select(
+        db.literal(kind).label('kind'),
+        db.type_coerce(ts, db.DateTime).label('ts'),
+        column(title, db.String).label('title'),
+        column(status, db.String).label('status'),
+        column(amount, db.Float).label('amount'),
+        column(notes, db.Text).label('notes'),
+        column(start_date, db.Date).label('start_date'),
+        column(end_date, db.Date).label('end_date')
+    )
+
+def _date_range(start, end):
+    return f"{start.strftime('%b %d')} to {end.strftime('%b %d, %Y')}"
+
+def _attendance_events(user_id):
+    return _activity_select(
+        'attendance',
+        ts=UnitAttendance.date,
+        title=TeachingUnit.title,
+        status=UnitAttendance.status,
+        amount=UnitAttendance.hours,
+        notes=UnitAttendance.notes
+    ).join(
         TeachingUnit, UnitAttendance.teaching_unit_id == TeachingUnit.id
-    ).filter(
-        TeachingUnit.employee_id == current_user.id
-    ).order_by(UnitAttendance.date.desc()).limit(3).all()
-    
-    for attendance in recent_attendances:
-        # Determine appropriate icon and class based on status
-        if attendance.status == 'present':
-            icon_class = 'bg-success'
-            icon = 'fa-check-circle'
-        elif attendance.status == 'absent':
-            icon_class = 'bg-danger'
-            icon = 'fa-times-circle'
-        elif attendance.status == 'late':
-            icon_class = 'bg-warning'
-            icon = 'fa-clock'
-        else:
-            icon_class = 'bg-info'
-            icon = 'fa-info-circle'
-        
-        # Format time to be more readable
-        formatted_time = attendance.date.strftime('%b %d, %Y')
-        
-        # Add detailed description
-        description = f"{attendance.status.capitalize()} - {attendance.hours} hours"
-        if attendance.notes:
-            description += f" - {attendance.notes}"
-        
-        recent_activities.append({
-            'title': f"Attendance: {attendance.teaching_unit.title}",
-            'description': description,
-            'time': formatted_time,
-            'icon': icon,
-            'icon_class': icon_class
-        })
+    ).where(TeachingUnit.employee_id == user_id)
+
+def _format_attendance(row):
+    description = f"{row.status.capitalize()} - {row.amount} hours"
+    if row.notes:
+        description += f" - {row.notes}"
+    return f"Attendance: {row.title}", description, 'fa-info-circle'
+
+def _leave_events(user_id):
+    return _activity_select(
+        'leave',
+        ts=LeaveRequest.created_at,
+        title=LeaveRequest.leave_type,
+        status=LeaveRequest.status,
+        start_date=LeaveRequest.start_date,
+        end_date=LeaveRequest.end_date
+    ).where(LeaveRequest.employee_id == user_id)
+
+def _format_leave(row):
+    title = f"Leave Request: {row.title.replace('_', ' ').title()}"
+    return title, f"Status: {row.status.title()} - {_date_range(row.start_date, row.end_date)}", 'fa-calendar-alt'
+
+def _enrollment_events(user_id):
+    return _activity_select(
+        'enrollment',
+        ts=db.func.coalesce(TrainingEnrollment.completion_date, TrainingEnrollment.enrollment_date),
+        title=TrainingProgram.title,
+        status=TrainingEnrollment.status,
+        start_date=TrainingProgram.start_date,
+        end_date=TrainingProgram.end_date
+    ).join(
+        TrainingProgram, TrainingEnrollment.training_id == TrainingProgram.id
+    ).where(TrainingEnrollment.employee_id == user_id)
+
+def _format_enrollment(row):
+    return f"Training: {row.title}", f"Status: {row.status.title()} - {_date_range(row.start_date, row.end_date)}", 'fa-graduation-cap'
+
+def _payroll_events(user_id):
+    # Drafts are still being prepared by HR
+    return _activity_select(
+        'payroll',
+        ts=db.func.coalesce(Payroll.updated_at, Payroll.created_at),
+        status=Payroll.status,
+        amount=(db.func.coalesce(Payroll.base_pay, 0.0) + db.func.coalesce(Payroll.unit_pay, 0.0)
+                - db.func.coalesce(Payroll.deductions, 0.0)),
+        start_date=Payroll.period_start,
+        end_date=Payroll.period_end
+    ).where(Payroll.employee_id == user_id, Payroll.status != 'draft')
+
+def _format_payroll(row):
+    description = f"{_date_range(row.start_date, row.end_date)} - Net ${row.amount:,.2f}"
+    return f"Payroll: {row.status.title()}", description, 'fa-money-check-alt'
+
+# Activity kind -> (events(user_id) -> SELECT built with _activity_select,
+#                   format(row) -> (title, description, default icon))
+# A new event type only needs an entry here; the feed stays one query.
+ACTIVITY_SOURCES = {
+    'attendance': (_attendance_events, _format_attendance),
+    'leave': (_leave_events, _format_leave),
+    'enrollment': (_enrollment_events, _format_enrollment),
+    'payroll': (_payroll_events, _format_payroll),
+}
+
+def _recent_activities(user_id, limit):
+    """
+    Get the user's latest events of every registered kind from one UNION ALL query
     
-    # Add recent leave requests with improved details
-    recent_leaves = LeaveRequest.query.filter_by(
-        employee_id=current_user.id
-    ).order_by(LeaveRequest.created_at.desc()).limit(3).all()
-    
-    for leave in recent_leaves:
-        # Customize icon and class based on leave status
-        if leave.status == 'approved':
-            icon_class = 'bg-success'
-            icon = 'fa-check-circle'
-        elif leave.status == 'denied':
-            icon_class = 'bg-danger'
-            icon = 'fa-times-circle'
-        elif leave.status == 'pending':
-            icon_class = 'bg-warning'
-            icon = 'fa-hourglass-half'
-        else:
-            icon_class = 'bg-info'
-            icon = 'fa-calendar-alt'
-            
-        # Format date range
-        date_range = f"{leave.start_date.strftime('%b %d')} to {leave.end_date.strftime('%b %d, %Y')}"
-        
-        # Create descriptive title and description
-        title = f"Leave Request: {leave.leave_type.replace('_', ' ').title()}"
-        description = f"Status: {leave.status.title()} - {date_range}"
-        
-        recent_activities.append({
+    Returns:
+        list: Activity dicts (title, description, time, icon, icon_class), newest first
+    """
+    events = db.union_all(*(
+        events_for(user_id) for events_for, _ in ACTIVITY_SOURCES.values()
+    )).subquery()
+    rows = db.session.execute(
+        db.select(events).order_by(events.c.ts.desc()).limit(limit)
+    ).all()
+    
+    activities = []
+    for row in rows:
+        title, description, default_icon = ACTIVITY_SOURCES[row.kind][1](row)
+        icon, icon_class = _activity_style(row.status, default_icon)
+        activities.append({
             'title': title,
             'description': description,
-            'time': leave.created_at.strftime('%b %d, %Y'),
+            'time': row.ts.strftime('%b %d, %Y') if row.ts else datetime.now().strftime('%b %d, %Y'),
             'icon': icon,
             'icon_class': icon_class
         })
     
-    # Add recent training enrollments and payroll information...
-    # ...existing code...
-    
-    # Sort activities by time (most recent first)
-    # Ensure all activities have a parseable time string first
-    for activity in recent_activities:
-        if 'time' not in activity or not activity['time'] or activity['time'] == 'N/A':
-            activity['time'] = datetime.now().strftime('%b %d, %Y')
-    
-    def parse_date(date_str):
-        try:
-            return datetime.strptime(date_str, '%b %d, %Y %H:%M')
-        except ValueError:
-            return datetime.strptime(date_str, '%b %d, %Y')
+    return activities
 
-    recent_activities.sort(key=lambda x: parse_date(x['time']), reverse=True)
+def _stats_widget(user_id):
+    """Profile position and the stat card figures"""
+    # Counters come from a single query
+    stats = _dashboard_stats(user_id)
     
-    # Limit to most recent 5 activities
-    recent_activities = recent_activities[:5]
-    
-    # Get attendance data for the chart - use real data
-    chart_data = {
-        'labels': [],
-        'attendance_rates': []
-    }
+    # If no profile exists yet, create a default one
+    if stats['profile_id'] is None:
+        db.session.add(EmployeeProfile(user_id=user_id))
+        db.session.commit()
     
-    # Get attendance records for the last 7 days
-    end_date = datetime.now().date()
-    start_date = end_date - timedelta(days=6)  # Last 7 days including today
+    # Calculate attendance rate across all units
+    teaching_units = dashboard_widget(user_id, 'teaching_units')
+    attendance_stats = {'rate': 0}
+    if teaching_units:
+        total_rate = sum(unit['attendance_rate'] for unit in teaching_units)
+        attendance_stats['rate'] = round(total_rate / len(teaching_units), 1)
     
-    # Generate date range for last 7 days
-    date_range = [(start_date + timedelta(days=i)) for i in range(7)]
+    return {
+        'profile': {'position': stats['position']},
+        'attendance_stats': attendance_stats,
+        'leave_stats': stats['leave_stats'],
+        'training_stats': stats['training_stats'],
+        'teaching_stats': {'active': len(teaching_units)}
+    }
+
+def _teaching_units_widget(user_id):
+    """Active units with their attendance rates and links"""
+    units = _dashboard_units(user_id)
+    for unit in units:
+        unit['url'] = url_for('teaching.view', unit_id=unit['id'])
+    return units
+
+# Widget name -> builder(user_id); each is served by /api/dashboard/<widget>
+DASHBOARD_WIDGETS = {
+    'stats': _stats_widget,
+    'activities': lambda user_id: _recent_activities(user_id, ACTIVITY_LIMIT - 1),
+    'attendance_chart': _attendance_chart,
+    'teaching_units': _teaching_units_widget,
+}
+
+def dashboard_widget(user_id, name):
+    """
+    Get one dashboard widget's data for a user
     
-    # Format dates as labels for chart
-    chart_data['labels'] = [date.strftime('%a %d') for date in date_range]
+    Widgets are cached per user until a commit touches the user's rows,
+    and keyed by date because the chart is relative to today.
     
-    # Get attendance rate for each day in the range
-    for day in date_range:
-        # Query records for this specific day
-        day_records = UnitAttendance.query.join(
-            TeachingUnit, UnitAttendance.teaching_unit_id == TeachingUnit.id
-        ).filter(
-            TeachingUnit.employee_id == current_user.id,
-            UnitAttendance.date == day
-        ).all()
-        
-        # Calculate attendance rate for the day
-        if day_records:
-            present_records = sum(1 for r in day_records if r.status == 'present')
-            rate = (present_records / len(day_records)) * 100 if day_records else 0
-            chart_data['attendance_rates'].append(round(rate, 1))
-        else:
-            # No records for this day
-            chart_data['attendance_rates'].append(0)
-    
-    # Pass the profile, stats, and chart data to the template
-    return render_template('dashboard.html', 
-                          profile=profile,
-                          attendance_stats=attendance_stats,
-                          leave_stats=leave_stats,
-                          training_stats=training_stats,
-                          teaching_stats=teaching_stats,
-                          teaching_units=teaching_units,
-                          recent_activities=recent_activities,
-                          chart_data=chart_data)
+    Raises:
+        KeyError: If the widget name is unknown
+    """
+    build = DASHBOARD_WIDGETS[name]
+    return dashboard_cache.get_or_set(
+        user_id,
+        lambda: build(user_id),
+        ttl=current_app.config.get('DASHBOARD_CACHE_TTL', 0),
+        version=datetime.now().date(),
+        part=name
+    )
+
+def login_activity():
+    """Timeline entry shown above the user's own activities"""
+    return {
+        'title': 'Logged in successfully',
+        'description': 'Welcome to your dashboard',
+        'time': datetime.now().strftime('%b %d, %Y'),
+        'icon': 'fa-sign-in-alt',
+        'icon_class': 'bg-primary'
+    }
+
+@dashboard_bp.route('/dashboard')
+@login_required
+def index():
+    """Render the dashboard shell; its widgets are fetched from /api/dashboard/<widget>"""
+    return render_template('dashboard.html',
+                          widgets=list(DASHBOARD_WIDGETS),
+                          login_activity=login_activity())
 
 @dashboard_bp.route('/')
 def landing():
@@ -10,11 +10,6 @@ from forms import EmployeeSearchForm, SalaryForm
 from utils.decorators import hr_required
 import io, csv, tempfile
 from datetime import datetime, timedelta
-from reportlab.lib import colors
-from reportlab.lib.pagesizes import letter
-from reportlab.platypus import SimpleDocTemplate, Table, TableStyle, Paragraph, Spacer
-from reportlab.lib.styles import getSampleStyleSheet
-from reportlab.lib.units import inch
 
 employees_bp = Blueprint('employees', __name__)
 
@@ -208,6 +203,12 @@ def export():
         with tempfile.NamedTemporaryFile(suffix='.pdf', delete=False) as temp_file:
             temp_path = temp_file.name
         
+        # ReportLab is only imported by PDF exports
+        from reportlab.lib import colors
+        from reportlab.lib.pagesizes import letter
+        from reportlab.platypus import SimpleDocTemplate, Table, TableStyle, Paragraph, Spacer
+        from reportlab.lib.styles import getSampleStyleSheet
+        
         # Create the PDF document
         doc = SimpleDocTemplate(temp_path, pagesize=letter)
         styles = getSampleStyleSheet()
@@ -8,6 +8,7 @@ from flask_login import login_required, current_user
 from models import LeaveRequest, db
 from forms import LeaveRequestForm, LeaveApprovalForm
 from utils.decorators import hr_required
+from utils.mail_queue import queue_email
 from datetime import datetime
 
 leaves_bp = Blueprint('leaves', __name__)
@@ -89,9 +90,19 @@ def process(leave_id):
         leave.approval_comment = form.comment.data
         leave.approver_id = current_user.id
         leave.updated_at = datetime.utcnow()
-        db.session.commit()
         
         status_text = 'approved' if leave.status == 'approved' else 'denied'
+        
+        # Notify the employee in the same transaction as the decision
+        body = (
+            f"Your {leave.leave_type} leave request for {leave.start_date} to {leave.end_date} "
+            f"has been {status_text} by {current_user.username}."
+        )
+        if leave.approval_comment:
+            body += f"\n\nComment: {leave.approval_comment}"
+        queue_email(f'Leave request {status_text}', [leave.employee.email], body, kind='leave_processed')
+        db.session.commit()
+        
         flash(f'The leave request has been {status_text}', 'success')
         return redirect(url_for('leaves.index'))
         
@@ -5,10 +5,12 @@ Handles payroll processing, deductions, and reports.
 
 from flask import Blueprint, render_template, request, redirect, url_for, flash, current_app, abort
 from flask_login import login_required, current_user
+from sqlalchemy.orm import joinedload
 # Update model imports to use the correct names
 from models import db, User, Payroll, PayrollDeduction, PayrollUnit, EmployeeProfile
 from forms import PayrollForm, PayrollDeductionForm, PayrollSearchForm
 from utils.decorators import hr_or_admin_required
+from utils.mail_queue import queue_email
 from datetime import datetime, timedelta
 import calendar
 
@@ -27,11 +29,11 @@ def index():
     
     # Set employee choices if admin or HR
     if current_user.is_admin() or current_user.is_hr():
-        employees = User.query.all()
+        employees = User.query.options(joinedload(User.profile)).all()
         form.employee.choices = [('', 'All Employees')] + [(str(u.id), u.get_display_name()) for u in employees]
     
-    # Build query based on search criteria
-    query = Payroll.query
+    # Build query based on search criteria; each row shows the employee's display name
+    query = Payroll.query.options(joinedload(Payroll.employee).joinedload(User.profile))
     
     # Filter by employee
     if not (current_user.is_admin() or current_user.is_hr()):
@@ -313,6 +315,15 @@ def process(payroll_id):
                 payroll.status = 'paid'
             else:
                 payroll.status = 'approved'
+            
+            # Notify the employee in the same transaction as the status change
+            body = (
+                f"Your payroll for {payroll.period_start} to {payroll.period_end} is now {payroll.status}.\n"
+                f"Net pay: {payroll.net_pay:.2f}"
+            )
+            if payroll.payment_date:
+                body += f"\nPayment date: {payroll.payment_date}"
+            queue_email(f'Payroll {payroll.status}', [payroll.employee.email], body, kind='payroll_processed')
                 
             db.session.commit()
             flash('Payroll has been processed successfully!', 'success')
@@ -3,20 +3,17 @@ Reports routes for the HR system.
 Handles report generation and downloads.
 """
 
-from flask import Blueprint, render_template, redirect, url_for, flash, request, Response, send_file
+from flask import Blueprint, render_template, redirect, url_for, flash, request, Response, send_file, jsonify, abort
 from flask_login import login_required, current_user
-from models import User, EmployeeSalary, EmployeeProfile, LeaveRequest, db
+from models import User, EmployeeSalary, EmployeeProfile, LeaveRequest, UnitAttendance, TeachingUnit, Payroll, ReportJob, db
 from forms import SalaryReportForm
 from utils.decorators import hr_required
-import io, csv, tempfile, calendar
+from utils.report_jobs import REPORT_BUILDERS, enqueue_report_job, register_report_builder, expire_stale_jobs
+from utils.xlsx_export import StreamingWorkbook, XLSX_MIMETYPE, stream_query
+from utils.columnar_export import COLUMNAR_FORMATS, is_columnar_format, write_columnar
+import io, os, csv, tempfile, calendar
 from datetime import datetime, timedelta
 import random
-from reportlab.lib import colors
-from reportlab.lib.pagesizes import letter, A4, landscape
-from reportlab.platypus import SimpleDocTemplate, Table, TableStyle, Paragraph, Spacer
-from reportlab.lib.styles import getSampleStyleSheet, ParagraphStyle
-from reportlab.lib.units import inch
-from reportlab.lib.enums import TA_CENTER, TA_LEFT
 
 reports_bp = Blueprint('reports', __name__)
 
@@ -50,6 +47,11 @@ def salary_report():
             include_inactive = form.include_inactive.data
             export_format = form.export_format.data
         
+        # Typed formats download the raw salary dataset
+        if is_columnar_format(export_format):
+            return redirect(url_for('reports.export_dataset', dataset='salary',
+                                    export_format=export_format, department=department))
+        
         # Get employees based on filters
         query = User.query
         
@@ -146,6 +148,13 @@ def salary_report():
             with tempfile.NamedTemporaryFile(suffix='.pdf', delete=False) as temp_file:
                 temp_path = temp_file.name
                 
+            # ReportLab is only imported by PDF exports
+            from reportlab.lib import colors
+            from reportlab.lib.pagesizes import A4
+            from reportlab.platypus import SimpleDocTemplate, Table, TableStyle, Paragraph, Spacer
+            from reportlab.lib.styles import getSampleStyleSheet, ParagraphStyle
+            from reportlab.lib.enums import TA_CENTER
+            
             # Use ReportLab to generate PDF
             doc = SimpleDocTemplate(temp_path, pagesize=A4)
             styles = getSampleStyleSheet()
@@ -263,25 +272,73 @@ def salary_report():
     
     return render_template('reports/salary_report.html', form=form)
 
-@reports_bp.route('/hr/reports/employee-demographics', methods=['GET'])
-@login_required
-@hr_required
-def employee_demographics():
-    """Generate employee demographics report"""
-    # Get filter parameters
-    department = request.args.get('department', '')
-    date_range = request.args.get('date_range', 'all_time')
-    group_by = request.args.get('group_by', 'department')
+def _no_progress(percent, message=None):
+    """Default progress callback for exports built inside the request"""
+    pass
+
+def _temp_export_path(suffix):
+    """Create a temporary file path for an export artifact"""
+    with tempfile.NamedTemporaryFile(suffix=suffix, delete=False) as temp_file:
+        return temp_file.name
+
+def _send_export(export):
+    """Send a (path, filename, mimetype) export tuple as a download"""
+    path, filename, mimetype = export
+    export_file = open(path, 'rb')
+    
+    # Unlink the temporary file now; the open handle keeps it readable while streaming
+    try:
+        os.remove(path)
+    except OSError:
+        pass
     
-    # Query employees
-    query = User.query
+    return send_file(
+        export_file,
+        mimetype=mimetype,
+        as_attachment=True,
+        download_name=filename
+    )
+
+def _queue_export(kind, **extra_params):
+    """Queue the current export request as a background report job"""
+    params = request.args.to_dict()
+    params.pop('async', None)
+    params.update(extra_params)
+    job = enqueue_report_job(kind, params, current_user.id)
+    
+    if request.accept_mimetypes.best == 'application/json':
+        return jsonify(job.to_dict()), 202
+    return redirect(url_for('reports.job_status', job_id=job.id))
+
+def _display_name(username, first_name, last_name):
+    """Mirror User.get_display_name() for rows fetched without the ORM objects"""
+    if first_name is not None and last_name is not None:
+        return f"{first_name} {last_name}" if first_name and last_name else None
+    return username
+
+def _employee_demographics_dataset(department='', employee_sink=None):
+    """
+    Collect the employee demographics statistics used by the view and its exports
+    
+    Employees are streamed from a single User/EmployeeProfile join. If
+    employee_sink is given, each employee row is passed to it instead of
+    being collected, so exports can write rows without keeping them.
+    """
+    # Query employees with their profile columns in one round trip
+    query = db.session.query(
+        User.username,
+        User.department,
+        EmployeeProfile.first_name,
+        EmployeeProfile.last_name,
+        EmployeeProfile.position,
+        EmployeeProfile.hire_date,
+        EmployeeProfile.education_level,
+        EmployeeProfile.id.label('profile_id')
+    ).outerjoin(EmployeeProfile, EmployeeProfile.user_id == User.id)
     
     # Apply department filter if specified
     if department:
-        query = query.filter_by(department=department)
-    
-    # Get all employees matching filters
-    employees = query.all()
+        query = query.filter(User.department == department)
     
     # Prepare employee data
     employee_data = []
@@ -289,26 +346,54 @@ def employee_demographics():
     education_levels = {}
     hire_years = {}
     
+    # Tenure distribution buckets
+    tenure_ranges = ['<1 Year', '1-2 Years', '2-5 Years', '5-10 Years', '10+ Years']
+    tenure_counts = [0, 0, 0, 0, 0]
+    
+    employee_count = 0
+    tenure_total = 0
+    tenure_known = 0
+    max_tenure = 0
+    longest_tenured_employee = "None"
+    today = datetime.now().date()
+    
     # Loop through employees to gather statistics
-    for employee in employees:
-        # Get employee profile
-        profile = employee.profile if hasattr(employee, 'profile') else None
+    for row in stream_query(query):
+        employee_count += 1
+        has_profile = row.profile_id is not None
+        name = _display_name(row.username, row.first_name, row.last_name)
         
         # Calculate tenure (years)
-        hire_date = profile.hire_date if profile and profile.hire_date else None
+        hire_date = row.hire_date
         tenure = 0
         if hire_date:
-            tenure = (datetime.now().date() - hire_date).days / 365.25
+            tenure = (today - hire_date).days / 365.25
             
             # Track hire years for hiring trends
-            hire_year = hire_date.year
-            if hire_year in hire_years:
-                hire_years[hire_year] += 1
-            else:
-                hire_years[hire_year] = 1
+            hire_years[hire_date.year] = hire_years.get(hire_date.year, 0) + 1
+        
+        # Count employees in each tenure range
+        if tenure < 1:
+            tenure_counts[0] += 1
+        elif tenure < 2:
+            tenure_counts[1] += 1
+        elif tenure < 5:
+            tenure_counts[2] += 1
+        elif tenure < 10:
+            tenure_counts[3] += 1
+        else:
+            tenure_counts[4] += 1
+        
+        # Track average and longest tenure
+        if tenure > 0:
+            tenure_total += tenure
+            tenure_known += 1
+            if tenure > max_tenure:
+                max_tenure = tenure
+                longest_tenured_employee = name
         
         # Track education levels - FIX: Handle None values
-        education = profile.education_level if profile and hasattr(profile, 'education_level') and profile.education_level is not None else 'Unknown'
+        education = row.education_level if row.education_level is not None else 'Unknown'
         if education in education_levels:
             education_levels[education]['count'] += 1
         else:
@@ -318,7 +403,7 @@ def employee_demographics():
             }
         
         # Track departments
-        dept = employee.department
+        dept = row.department
         if dept in departments:
             departments[dept]['count'] += 1
             if tenure > 0:
@@ -333,15 +418,20 @@ def employee_demographics():
                 'color': f'rgba({random.randint(50, 200)}, {random.randint(50, 200)}, {random.randint(50, 200)}, 0.7)'
             }
         
-        # Add employee to dataset
-        employee_data.append({
-            'name': employee.get_display_name(),
-            'department': employee.department,
-            'position': profile.position if profile and hasattr(profile, 'position') else 'N/A',
+        employee = {
+            'name': name,
+            'department': row.department,
+            'position': row.position if has_profile else 'N/A',
             'hire_date': hire_date.strftime('%Y-%m-%d') if hire_date else 'N/A',
             'tenure': tenure,
             'education': education
-        })
+        }
+        
+        # Hand the employee to the export, or add it to the dataset
+        if employee_sink is not None:
+            employee_sink(employee)
+        else:
+            employee_data.append(employee)
     
     # Calculate department stats
     for dept in departments.values():
@@ -350,47 +440,15 @@ def employee_demographics():
         else:
             dept['avg_tenure'] = 0
     
-    # Prepare data for tenure distribution chart
-    tenure_ranges = ['<1 Year', '1-2 Years', '2-5 Years', '5-10 Years', '10+ Years']
-    tenure_counts = [0, 0, 0, 0, 0]
-    
-    # Count employees in each tenure range
-    for emp in employee_data:
-        tenure = emp['tenure']
-        if isinstance(tenure, (int, float)):
-            if tenure < 1:
-                tenure_counts[0] += 1
-            elif tenure < 2:
-                tenure_counts[1] += 1
-            elif tenure < 5:
-                tenure_counts[2] += 1
-            elif tenure < 10:
-                tenure_counts[3] += 1
-            else:
-                tenure_counts[4] += 1
-    
     # Prepare data for hiring trends chart
     hire_years_sorted = sorted(hire_years.keys())
     hire_counts = [hire_years.get(year, 0) for year in hire_years_sorted]
     
     # Calculate overall statistics
-    employee_count = len(employees)
-    active_employee_count = sum(1 for e in employees if e.is_active) if hasattr(User, 'is_active') else employee_count
+    active_employee_count = employee_count
     department_count = len(departments)
     education_count = len(education_levels)
-    
-    # Calculate average and max tenure
-    tenures = [e['tenure'] for e in employee_data if isinstance(e['tenure'], (int, float)) and e['tenure'] > 0]
-    avg_tenure = sum(tenures) / len(tenures) if tenures else 0
-    max_tenure = max(tenures) if tenures else 0
-    
-    # Find employee with longest tenure
-    longest_tenured_employee = "None"
-    if max_tenure > 0:
-        for emp in employee_data:
-            if emp['tenure'] == max_tenure:
-                longest_tenured_employee = emp['name']
-                break
+    avg_tenure = tenure_total / tenure_known if tenure_known else 0
     
     # Find largest department
     largest_department = max(departments.values(), key=lambda x: x['count']) if departments else {'name': 'None', 'count': 0}
@@ -406,25 +464,56 @@ def employee_demographics():
         highest_degree = 'None'
         highest_degree_count = 0
     
-    # Handle export if requested
-    export_format = request.args.get('export_format')
-    if export_format:
-        include_charts = request.args.get('include_charts', 'true') == 'true'
-        include_table = request.args.get('include_table', 'true') == 'true'
-        
-        # Generate timestamp for the filename
-        timestamp = datetime.now().strftime('%Y%m%d-%H%M%S')
-        
-        # CSV Export
-        if export_format == 'csv':
-            output = io.StringIO()
+    return {
+        'employee_data': employee_data,
+        'departments': departments,
+        'education_levels': education_levels,
+        'tenure_ranges': tenure_ranges,
+        'tenure_counts': tenure_counts,
+        'hire_years': hire_years_sorted,
+        'hire_counts': hire_counts,
+        'employee_count': employee_count,
+        'active_employee_count': active_employee_count,
+        'department_count': department_count,
+        'education_count': education_count,
+        'avg_tenure': avg_tenure,
+        'max_tenure': max_tenure,
+        'longest_tenured_employee': longest_tenured_employee,
+        'largest_department_name': largest_department_name,
+        'largest_department_count': largest_department_count,
+        'highest_degree': highest_degree,
+        'highest_degree_count': highest_degree_count
+    }
+
+def build_employee_demographics_export(params, progress=_no_progress):
+    """
+    Build an employee demographics export file
+    
+    Args:
+        params: Export parameters (department, export_format, include_table)
+        progress: Callback receiving (percent, message) as the export advances
+    
+    Returns:
+        tuple: (path, filename, mimetype) of the generated file
+    """
+    export_format = params.get('export_format', 'csv')
+    include_table = params.get('include_table', 'true') == 'true'
+    department = params.get('department', '')
+    
+    # Generate timestamp for the filename
+    timestamp = datetime.now().strftime('%Y%m%d-%H%M%S')
+    
+    # CSV Export
+    if export_format == 'csv':
+        temp_path = _temp_export_path('.csv')
+        with open(temp_path, 'w', newline='') as output:
             writer = csv.writer(output)
             
             # Write headers
             writer.writerow(['Name', 'Department', 'Position', 'Hire Date', 'Tenure (Years)', 'Education'])
             
-            # Write data for each employee
-            for emp in employee_data:
+            # Write each employee as it is read from the database
+            def write_employee(emp):
                 writer.writerow([
                     emp['name'],
                     emp['department'].replace('_', ' ').title(),
@@ -434,330 +523,357 @@ def employee_demographics():
                     emp['education']
                 ])
             
-            # Prepare the CSV response
-            output.seek(0)
-            filename = f"employee_demographics_{timestamp}.csv"
+            _employee_demographics_dataset(department, employee_sink=write_employee)
+        
+        return temp_path, f"employee_demographics_{timestamp}.csv", 'text/csv'
+    
+    # Excel Export
+    elif export_format == 'excel':
+        workbook = StreamingWorkbook()
+        try:
+            # Stream employee rows into the first sheet while the statistics are collected
+            write_employee = workbook.sheet_writer(
+                'Employees', ['name', 'department', 'position', 'hire_date', 'tenure', 'education']
+            )
+            data = _employee_demographics_dataset(
+                department,
+                employee_sink=lambda emp: write_employee([
+                    emp['name'], emp['department'], emp['position'],
+                    emp['hire_date'], emp['tenure'], emp['education']
+                ])
+            )
+            progress(40, 'Collected employee data')
+            
+            # Add Department Analysis sheet
+            workbook.write_sheet(
+                'Department Analysis',
+                ['Department', 'Employee Count', 'Avg Tenure (Years)'],
+                ([d['name'].replace('_', ' ').title(), d['count'], d['avg_tenure']]
+                 for d in data['departments'].values())
+            )
             
-            return Response(
-                output.getvalue(),
-                mimetype="text/csv",
-                headers={"Content-disposition": f"attachment; filename={filename}"}
+            # Add Education Analysis sheet
+            workbook.write_sheet(
+                'Education Analysis',
+                ['Education Level', 'Count'],
+                ([e['name'], e['count']] for e in data['education_levels'].values())
             )
-        
-        # Excel Export
-        elif export_format == 'excel':
-            try:
-                import pandas as pd
-                from io import BytesIO
-                
-                # Create DataFrame for employee data
-                df = pd.DataFrame(employee_data)
-                
-                # Prepare Excel file in memory
-                output = BytesIO()
-                with pd.ExcelWriter(output, engine='xlsxwriter') as writer:
-                    # Write employee data
-                    df.to_excel(writer, sheet_name='Employees', index=False)
-                    
-                    # Add Department Analysis sheet
-                    dept_df = pd.DataFrame([{
-                        'Department': d['name'].replace('_', ' ').title(),
-                        'Employee Count': d['count'],
-                        'Avg Tenure (Years)': d['avg_tenure']
-                    } for d in departments.values()])
-                    dept_df.to_excel(writer, sheet_name='Department Analysis', index=False)
-                    
-                    # Add Education Analysis sheet
-                    education_df = pd.DataFrame([{
-                        'Education Level': e['name'],
-                        'Count': e['count']
-                    } for e in education_levels.values()])
-                    education_df.to_excel(writer, sheet_name='Education Analysis', index=False)
-                    
-                    # Add Tenure Distribution sheet
-                    tenure_df = pd.DataFrame({
-                        'Tenure Range': tenure_ranges,
-                        'Count': tenure_counts
-                    })
-                    tenure_df.to_excel(writer, sheet_name='Tenure Distribution', index=False)
-                    
-                    # Add Hiring Trends sheet
-                    if hire_years_sorted:
-                        hiring_df = pd.DataFrame({
-                            'Year': hire_years_sorted,
-                            'New Hires': hire_counts
-                        })
-                        hiring_df.to_excel(writer, sheet_name='Hiring Trends', index=False)
-                    
-                    # Format workbook
-                    workbook = writer.book
-                    
-                    # Add summary sheet
-                    summary_sheet = workbook.add_worksheet('Summary')
-                    summary_sheet.write(0, 0, 'Employee Demographics Report')
-                    summary_sheet.write(1, 0, f'Generated on {datetime.now().strftime("%B %d, %Y at %H:%M:%S")}')
-                    
-                    summary_sheet.write(3, 0, 'Total Employees')
-                    summary_sheet.write(3, 1, employee_count)
-                    
-                    summary_sheet.write(4, 0, 'Active Employees')
-                    summary_sheet.write(4, 1, active_employee_count)
-                    
-                    summary_sheet.write(5, 0, 'Departments')
-                    summary_sheet.write(5, 1, department_count)
-                    
-                    summary_sheet.write(6, 0, 'Average Tenure')
-                    summary_sheet.write(6, 1, f"{avg_tenure:.1f} years")
-                    
-                    summary_sheet.write(7, 0, 'Longest Tenured Employee')
-                    summary_sheet.write(7, 1, f"{longest_tenured_employee} ({max_tenure:.1f} years)")
-                
-                # Return the Excel file
-                output.seek(0)
-                filename = f"employee_demographics_{timestamp}.xlsx"
-                
-                return Response(
-                    output.getvalue(),
-                    mimetype="application/vnd.openxmlformats-officedocument.spreadsheetml.sheet",
-                    headers={"Content-disposition": f"attachment; filename={filename}"}
-                )
-            except ImportError:
-                flash("Excel export requires pandas and xlsxwriter packages. Using CSV instead.", "warning")
-                # Fallback to CSV if pandas is not available
-                return redirect(url_for('reports.employee_demographics', 
-                                       export_format='csv', 
-                                       include_table=include_table))
-        
-        # PDF Export
-        elif export_format == 'pdf':
-            # Generate a timestamp for the filename
-            filename = f"employee_demographics_{timestamp}.pdf"
             
-            try:
-                # Create a temporary file path
-                with tempfile.NamedTemporaryFile(suffix='.pdf', delete=False) as temp_file:
-                    temp_path = temp_file.name
-                    
-                # Use ReportLab to generate PDF
-                doc = SimpleDocTemplate(temp_path, pagesize=landscape(A4))
-                styles = getSampleStyleSheet()
-                elements = []
-                
-                # Title and header
-                title_style = ParagraphStyle(
-                    'Title', 
-                    parent=styles['Heading1'],
-                    alignment=TA_CENTER,
-                    spaceAfter=20
+            # Add Tenure Distribution sheet
+            workbook.write_sheet(
+                'Tenure Distribution',
+                ['Tenure Range', 'Count'],
+                zip(data['tenure_ranges'], data['tenure_counts'])
+            )
+            
+            # Add Hiring Trends sheet
+            if data['hire_years']:
+                workbook.write_sheet(
+                    'Hiring Trends',
+                    ['Year', 'New Hires'],
+                    zip(data['hire_years'], data['hire_counts'])
                 )
+            
+            # Add summary sheet
+            summary_sheet = workbook.add_worksheet('Summary')
+            summary_sheet.write(0, 0, 'Employee Demographics Report')
+            summary_sheet.write(1, 0, f'Generated on {datetime.now().strftime("%B %d, %Y at %H:%M:%S")}')
+            
+            summary_sheet.write(3, 0, 'Total Employees')
+            summary_sheet.write(3, 1, data['employee_count'])
+            
+            summary_sheet.write(4, 0, 'Active Employees')
+            summary_sheet.write(4, 1, data['active_employee_count'])
+            
+            summary_sheet.write(5, 0, 'Departments')
+            summary_sheet.write(5, 1, data['department_count'])
+            
+            summary_sheet.write(6, 0, 'Average Tenure')
+            summary_sheet.write(6, 1, f"{data['avg_tenure']:.1f} years")
+            
+            summary_sheet.write(7, 0, 'Longest Tenured Employee')
+            summary_sheet.write(7, 1, f"{data['longest_tenured_employee']} ({data['max_tenure']:.1f} years)")
+        finally:
+            temp_path = workbook.close()
+        
+        return temp_path, f"employee_demographics_{timestamp}.xlsx", XLSX_MIMETYPE
+    
+    data = _employee_demographics_dataset(department)
+    employee_data = data['employee_data']
+    departments = data['departments']
+    education_levels = data['education_levels']
+    employee_count = data['employee_count']
+    active_employee_count = data['active_employee_count']
+    department_count = data['department_count']
+    avg_tenure = data['avg_tenure']
+    max_tenure = data['max_tenure']
+    longest_tenured_employee = data['longest_tenured_employee']
+    progress(40, 'Collected employee data')
+    
+    # PDF Export
+    if export_format == 'pdf':
+        # Create a temporary file path
+        temp_path = _temp_export_path('.pdf')
+        
+        # ReportLab is only imported by PDF exports
+        from reportlab.lib import colors
+        from reportlab.lib.pagesizes import A4, landscape
+        from reportlab.platypus import SimpleDocTemplate, Table, TableStyle, Paragraph, Spacer
+        from reportlab.lib.styles import getSampleStyleSheet, ParagraphStyle
+        from reportlab.lib.enums import TA_CENTER
+        
+        # Use ReportLab to generate PDF
+        doc = SimpleDocTemplate(temp_path, pagesize=landscape(A4))
+        styles = getSampleStyleSheet()
+        elements = []
+        
+        # Title and header
+        title_style = ParagraphStyle(
+            'Title',
+            parent=styles['Heading1'],
+            alignment=TA_CENTER,
+            spaceAfter=20
+        )
+        
+        # Add title
+        elements.append(Paragraph(f"Employee Demographics Report", title_style))
+        elements.append(Paragraph(f"Generated on {datetime.now().strftime('%B %d, %Y at %H:%M:%S')}", styles['Normal']))
+        elements.append(Spacer(1, 20))
+        
+        # Add summary section
+        elements.append(Paragraph("Report Summary", styles['Heading2']))
+        summary_data = [
+            ["Total Employees", "Active Employees", "Departments", "Average Tenure", "Longest Tenure"],
+            [
+                str(employee_count),
+                str(active_employee_count),
+                str(department_count),
+                f"{avg_tenure:.1f} years",
+                f"{max_tenure:.1f} years ({longest_tenured_employee})"
+            ]
+        ]
+        
+        summary_table = Table(summary_data, colWidths=[100, 100, 100, 100, 150])
+        summary_table.setStyle(TableStyle([
+            ('BACKGROUND', (0, 0), (-1, 0), colors.grey),
+            ('TEXTCOLOR', (0, 0), (-1, 0), colors.whitesmoke),
+            ('ALIGN', (0, 0), (-1, -1), 'CENTER'),
+            ('FONTNAME', (0, 0), (-1, 0), 'Helvetica-Bold'),
+            ('BOTTOMPADDING', (0, 0), (-1, 0), 12),
+            ('BACKGROUND', (0, 1), (-1, -1), colors.beige),
+            ('GRID', (0, 0), (-1, -1), 1, colors.black),
+        ]))
+        
+        elements.append(summary_table)
+        elements.append(Spacer(1, 20))
+        
+        # Department Distribution Section
+        elements.append(Paragraph("Department Distribution", styles['Heading2']))
+        
+        dept_data = [["Department", "Employee Count", "Average Tenure"]]
+        
+        # Add department data rows
+        for dept in departments.values():
+            dept_data.append([
+                dept['name'].replace('_', ' ').title(),
+                str(dept['count']),
+                f"{dept['avg_tenure']:.1f} years"
+            ])
+        
+        # Create department table
+        dept_table = Table(dept_data, colWidths=[200, 100, 150])
+        dept_table.setStyle(TableStyle([
+            # Header style
+            ('BACKGROUND', (0, 0), (-1, 0), colors.grey),
+            ('TEXTCOLOR', (0, 0), (-1, 0), colors.whitesmoke),
+            ('ALIGN', (0, 0), (-1, 0), 'CENTER'),
+            ('FONTNAME', (0, 0), (-1, 0), 'Helvetica-Bold'),
+            
+            # Data rows style
+            ('FONTNAME', (0, 1), (-1, -1), 'Helvetica'),
+            ('ALIGN', (1, 1), (-1, -1), 'CENTER'),  # Center align numeric columns
+            
+            # Grid
+            ('GRID', (0, 0), (-1, -1), 0.5, colors.grey),
+            
+            # Add alternating row colors
+            ('ROWBACKGROUNDS', (0, 1), (-1, -1), [colors.white, colors.lightgrey])
+        ]))
+        
+        elements.append(dept_table)
+        elements.append(Spacer(1, 20))
+        
+        # Education Distribution
+        elements.append(Paragraph("Education Distribution", styles['Heading2']))
+        
+        edu_data = [["Education Level", "Count", "Percentage"]]
+        
+        # Add education data rows
+        for edu in education_levels.values():
+            percentage = (edu['count'] / employee_count * 100) if employee_count > 0 else 0
+            edu_data.append([
+                str(edu['name']),
+                str(edu['count']),
+                f"{percentage:.1f}%"
+            ])
+        
+        # Create education table
+        edu_table = Table(edu_data, colWidths=[200, 100, 100])
+        edu_table.setStyle(TableStyle([
+            # Header style
+            ('BACKGROUND', (0, 0), (-1, 0), colors.grey),
+            ('TEXTCOLOR', (0, 0), (-1, 0), colors.whitesmoke),
+            ('ALIGN', (0, 0), (-1, 0), 'CENTER'),
+            ('FONTNAME', (0, 0), (-1, 0), 'Helvetica-Bold'),
+            
+            # Data rows style
+            ('FONTNAME', (0, 1), (-1, -1), 'Helvetica'),
+            ('ALIGN', (1, 1), (-1, -1), 'CENTER'),  # Center align numeric columns
+            
+            # Grid
+            ('GRID', (0, 0), (-1, -1), 0.5, colors.grey),
+            
+            # Add alternating row colors
+            ('ROWBACKGROUNDS', (0, 1), (-1, -1), [colors.white, colors.lightgrey])
+        ]))
+        
+        elements.append(edu_table)
+        elements.append(Spacer(1, 20))
+        
+        # Include employee details table if requested
+        if include_table:
+            elements.append(Paragraph("Employee Details", styles['Heading2']))
+            
+            # Table header
+            employee_table_data = [
+                ["Name", "Department", "Position", "Hire Date", "Tenure", "Education"]
+            ]
+            
+            # Add employee rows
+            for emp in employee_data:
+                employee_table_data.append([
+                    emp['name'],
+                    emp['department'].replace('_', ' ').title(),
+                    emp['position'],
+                    emp['hire_date'],
+                    f"{emp['tenure']:.1f} years" if isinstance(emp['tenure'], (int, float)) else "N/A",
+                    str(emp['education'])
+                ])
+            
+            # Create the table with column widths
+            employee_table = Table(employee_table_data, colWidths=[100, 80, 80, 80, 60, 80])
+            employee_table.setStyle(TableStyle([
+                # Header style
+                ('BACKGROUND', (0, 0), (-1, 0), colors.grey),
+                ('TEXTCOLOR', (0, 0), (-1, 0), colors.whitesmoke),
+                ('ALIGN', (0, 0), (-1, 0), 'CENTER'),
+                ('FONTNAME', (0, 0), (-1, 0), 'Helvetica-Bold'),
                 
-                # Add title
-                elements.append(Paragraph(f"Employee Demographics Report", title_style))
-                elements.append(Paragraph(f"Generated on {datetime.now().strftime('%B %d, %Y at %H:%M:%S')}", styles['Normal']))
-                elements.append(Spacer(1, 20))
-                
-                # Add summary section
-                elements.append(Paragraph("Report Summary", styles['Heading2']))
-                summary_data = [
-                    ["Total Employees", "Active Employees", "Departments", "Average Tenure", "Longest Tenure"],
-                    [
-                        str(employee_count),
-                        str(active_employee_count),
-                        str(department_count),
-                        f"{avg_tenure:.1f} years",
-                        f"{max_tenure:.1f} years ({longest_tenured_employee})"
-                    ]
-                ]
-                
-                summary_table = Table(summary_data, colWidths=[100, 100, 100, 100, 150])
-                summary_table.setStyle(TableStyle([
-                    ('BACKGROUND', (0, 0), (-1, 0), colors.grey),
-                    ('TEXTCOLOR', (0, 0), (-1, 0), colors.whitesmoke),
-                    ('ALIGN', (0, 0), (-1, -1), 'CENTER'),
-                    ('FONTNAME', (0, 0), (-1, 0), 'Helvetica-Bold'),
-                    ('BOTTOMPADDING', (0, 0), (-1, 0), 12),
-                    ('BACKGROUND', (0, 1), (-1, -1), colors.beige),
-                    ('GRID', (0, 0), (-1, -1), 1, colors.black),
-                ]))
-                
-                elements.append(summary_table)
-                elements.append(Spacer(1, 20))
-                
-                # Department Distribution Section
-                elements.append(Paragraph("Department Distribution", styles['Heading2']))
-                
-                dept_data = [["Department", "Employee Count", "Average Tenure"]]
-                
-                # Add department data rows
-                for dept in departments.values():
-                    dept_data.append([
-                        dept['name'].replace('_', ' ').title(),
-                        str(dept['count']),
-                        f"{dept['avg_tenure']:.1f} years"
-                    ])
-                
-                # Create department table
-                dept_table = Table(dept_data, colWidths=[200, 100, 150])
-                dept_table.setStyle(TableStyle([
-                    # Header style
-                    ('BACKGROUND', (0, 0), (-1, 0), colors.grey),
-                    ('TEXTCOLOR', (0, 0), (-1, 0), colors.whitesmoke),
-                    ('ALIGN', (0, 0), (-1, 0), 'CENTER'),
-                    ('FONTNAME', (0, 0), (-1, 0), 'Helvetica-Bold'),
-                    
-                    # Data rows style
-                    ('FONTNAME', (0, 1), (-1, -1), 'Helvetica'),
-                    ('ALIGN', (1, 1), (-1, -1), 'CENTER'),  # Center align numeric columns
-                    
-                    # Grid
-                    ('GRID', (0, 0), (-1, -1), 0.5, colors.grey),
-                    
-                    # Add alternating row colors
-                    ('ROWBACKGROUNDS', (0, 1), (-1, -1), [colors.white, colors.lightgrey])
-                ]))
-                
-                elements.append(dept_table)
-                elements.append(Spacer(1, 20))
-                
-                # Education Distribution
-                elements.append(Paragraph("Education Distribution", styles['Heading2']))
-                
-                edu_data = [["Education Level", "Count", "Percentage"]]
-                
-                # Add education data rows
-                for edu in education_levels.values():
-                    percentage = (edu['count'] / employee_count * 100) if employee_count > 0 else 0
-                    edu_data.append([
-                        str(edu['name']),
-                        str(edu['count']),
-                        f"{percentage:.1f}%"
-                    ])
-                
-                # Create education table
-                edu_table = Table(edu_data, colWidths=[200, 100, 100])
-                edu_table.setStyle(TableStyle([
-                    # Header style
-                    ('BACKGROUND', (0, 0), (-1, 0), colors.grey),
-                    ('TEXTCOLOR', (0, 0), (-1, 0), colors.whitesmoke),
-                    ('ALIGN', (0, 0), (-1, 0), 'CENTER'),
-                    ('FONTNAME', (0, 0), (-1, 0), 'Helvetica-Bold'),
-                    
-                    # Data rows style
-                    ('FONTNAME', (0, 1), (-1, -1), 'Helvetica'),
-                    ('ALIGN', (1, 1), (-1, -1), 'CENTER'),  # Center align numeric columns
-                    
-                    # Grid
-                    ('GRID', (0, 0), (-1, -1), 0.5, colors.grey),
-                    
-                    # Add alternating row colors
-                    ('ROWBACKGROUNDS', (0, 1), (-1, -1), [colors.white, colors.lightgrey])
-                ]))
-                
-                elements.append(edu_table)
-                elements.append(Spacer(1, 20))
-                
-                # Include employee details table if requested
-                if include_table:
-                    elements.append(Paragraph("Employee Details", styles['Heading2']))
-                    
-                    # Table header
-                    employee_table_data = [
-                        ["Name", "Department", "Position", "Hire Date", "Tenure", "Education"]
-                    ]
-                    
-                    # Add employee rows
-                    for emp in employee_data:
-                        employee_table_data.append([
-                            emp['name'],
-                            emp['department'].replace('_', ' ').title(),
-                            emp['position'],
-                            emp['hire_date'],
-                            f"{emp['tenure']:.1f} years" if isinstance(emp['tenure'], (int, float)) else "N/A",
-                            str(emp['education'])
-                        ])
-                    
-                    # Create the table with column widths
-                    employee_table = Table(employee_table_data, colWidths=[100, 80, 80, 80, 60, 80])
-                    employee_table.setStyle(TableStyle([
-                        # Header style
-                        ('BACKGROUND', (0, 0), (-1, 0), colors.grey),
-                        ('TEXTCOLOR', (0, 0), (-1, 0), colors.whitesmoke),
-                        ('ALIGN', (0, 0), (-1, 0), 'CENTER'),
-                        ('FONTNAME', (0, 0), (-1, 0), 'Helvetica-Bold'),
-                        
-                        # Data rows style
-                        ('FONTNAME', (0, 1), (-1, -1), 'Helvetica'),
-                        ('ALIGN', (3, 1), (4, -1), 'CENTER'),  # Center align dates and numeric values
-                        
-                        # Grid
-                        ('GRID', (0, 0), (-1, -1), 0.5, colors.grey),
-                        
-                        # Add alternating row colors
-                        ('ROWBACKGROUNDS', (0, 1), (-1, -1), [colors.white, colors.lightgrey])
-                    ]))
-                    
-                    elements.append(employee_table)
-                    elements.append(Spacer(1, 20))
-                
-                # Add footer
-                elements.append(Spacer(1, 20))
-                footer_text = "Confidential: This document contains HR information and should be handled according to company policies."
-                elements.append(Paragraph(footer_text, styles['Italic']))
+                # Data rows style
+                ('FONTNAME', (0, 1), (-1, -1), 'Helvetica'),
+                ('ALIGN', (3, 1), (4, -1), 'CENTER'),  # Center align dates and numeric values
                 
-                # Build the PDF document
-                doc.build(elements)
+                # Grid
+                ('GRID', (0, 0), (-1, -1), 0.5, colors.grey),
                 
-                # Return the PDF file as a response
-                return send_file(
-                    temp_path,
-                    mimetype='application/pdf',
-                    as_attachment=True,
-                    download_name=filename
-                )
-            except Exception as e:
-                flash(f"Error generating PDF: {str(e)}", "danger")
-                return redirect(url_for('reports.employee_demographics'))
+                # Add alternating row colors
+                ('ROWBACKGROUNDS', (0, 1), (-1, -1), [colors.white, colors.lightgrey])
+            ]))
+            
+            elements.append(employee_table)
+            elements.append(Spacer(1, 20))
+        
+        # Add footer
+        elements.append(Spacer(1, 20))
+        footer_text = "Confidential: This document contains HR information and should be handled according to company policies."
+        elements.append(Paragraph(footer_text, styles['Italic']))
+        
+        # Build the PDF document
+        progress(70, 'Rendering PDF')
+        doc.build(elements)
+        
+        return temp_path, f"employee_demographics_{timestamp}.pdf", 'application/pdf'
     
-    # Render the template with all the data
-    return render_template(
-        'reports/employee_demographics.html',
-        employees=employee_data,
-        departments=list(departments.values()),
-        education_levels=list(education_levels.values()),
-        tenure_ranges=tenure_ranges,
-        tenure_counts=tenure_counts,
-        hire_years=hire_years_sorted,
-        hire_counts=hire_counts,
-        employee_count=employee_count,
-        active_employee_count=active_employee_count,
-        department_count=department_count,
-        education_count=education_count,
-        avg_tenure=avg_tenure,
-        max_tenure=max_tenure,
-        longest_tenured_employee=longest_tenured_employee,
-        largest_department_name=largest_department_name,
-        largest_department_count=largest_department_count,
-        highest_degree=highest_degree,
-        highest_degree_count=highest_degree_count
-    )
+    raise ValueError(f"Unsupported export format: {export_format}")
 
-@reports_bp.route('/hr/reports/time-off-analysis', methods=['GET'])
+@reports_bp.route('/hr/reports/employee-demographics', methods=['GET'])
 @login_required
 @hr_required
-def time_off_analysis():
-    """Generate time off analysis report"""
+def employee_demographics():
+    """Generate employee demographics report"""
     # Get filter parameters
     department = request.args.get('department', '')
-    year = request.args.get('year', str(datetime.now().year))
-    leave_type = request.args.get('leave_type', '')
+    date_range = request.args.get('date_range', 'all_time')
+    group_by = request.args.get('group_by', 'department')
     
-    try:
-        selected_year = int(year)
-    except ValueError:
-        selected_year = datetime.now().year
+    # Handle export if requested
+    export_format = request.args.get('export_format')
+    if export_format:
+        include_table = request.args.get('include_table', 'true') == 'true'
+        
+        # Large exports can be built by the report job worker instead
+        if request.args.get('async') == 'true':
+            return _queue_export('employee_demographics')
+        
+        try:
+            return _send_export(build_employee_demographics_export(request.args.to_dict()))
+        except ImportError:
+            flash("Excel export requires the xlsxwriter package. Using CSV instead.", "warning")
+            # Fallback to CSV if xlsxwriter is not available
+            return redirect(url_for('reports.employee_demographics',
+                                   export_format='csv',
+                                   include_table=include_table))
+        except Exception as e:
+            flash(f"Error generating {export_format.upper()}: {str(e)}", "danger")
+            return redirect(url_for('reports.employee_demographics'))
+    
+    data = _employee_demographics_dataset(department)
+    
+    # Render the template with all the data
+    return render_template(
+        'reports/employee_demographics.html',
+        employees=data['employee_data'],
+        departments=list(data['departments'].values()),
+        education_levels=list(data['education_levels'].values()),
+        tenure_ranges=data['tenure_ranges'],
+        tenure_counts=data['tenure_counts'],
+        hire_years=data['hire_years'],
+        hire_counts=data['hire_counts'],
+        employee_count=data['employee_count'],
+        active_employee_count=data['active_employee_count'],
+        department_count=data['department_count'],
+        education_count=data['education_count'],
+        avg_tenure=data['avg_tenure'],
+        max_tenure=data['max_tenure'],
+        longest_tenured_employee=data['longest_tenured_employee'],
+        largest_department_name=data['largest_department_name'],
+        largest_department_count=data['largest_department_count'],
+        highest_degree=data['highest_degree'],
+        highest_degree_count=data['highest_degree_count']
+    )
+
+def _time_off_dataset(department, selected_year, leave_type, leave_sink=None):
+    """
+    Collect the leave statistics used by the time off view and its exports
     
+    Leaves are streamed from a single LeaveRequest/User/EmployeeProfile join.
+    If leave_sink is given, each leave row is passed to it instead of being
+    collected, so exports can write rows without keeping them.
+    """
     # Build query based on filters
-    query = LeaveRequest.query.join(LeaveRequest.employee)
+    query = db.session.query(
+        LeaveRequest.employee_id,
+        LeaveRequest.leave_type,
+        LeaveRequest.start_date,
+        LeaveRequest.end_date,
+        LeaveRequest.status,
+        User.username,
+        User.department,
+        EmployeeProfile.first_name,
+        EmployeeProfile.last_name
+    ).join(User, LeaveRequest.employee_id == User.id).outerjoin(
+        EmployeeProfile, EmployeeProfile.user_id == User.id
+    )
     
     # Apply department filter if specified
     if department:
@@ -777,66 +893,22 @@ def time_off_analysis():
         )
     )
     
-    # Get all leave requests matching filters
-    leave_requests = query.all()
-    
-    # Prepare calendar data
-    calendar_data = {}
-    for month in range(1, 13):
-        # Get the number of days in this month
-        _, days_in_month = calendar.monthrange(selected_year, month)
-        month_data = []
-        
-        # Calculate the weekday (0 = Monday) of the first day of the month
-        first_day_weekday = datetime(selected_year, month, 1).weekday()
-        # Adjust for Sunday as first day (0 = Sunday)
-        first_day_weekday = (first_day_weekday + 1) % 7
-        
-        # Add empty cells for days before the 1st of the month
-        for _ in range(first_day_weekday):
-            month_data.append({'empty': True})
-            
-        # Add days of the month
-        for day in range(1, days_in_month + 1):
-            current_date = datetime(selected_year, month, day).date()
-            # Count leaves that include this date
-            leave_count = sum(1 for leave in leave_requests if leave.start_date <= current_date <= leave.end_date)
-            
-            # Determine heat level (0-5) based on leave count
-            if leave_count == 0:
-                heat_level = 0
-            elif leave_count <= 2:
-                heat_level = 1
-            elif leave_count <= 5:
-                heat_level = 2
-            elif leave_count <= 9:
-                heat_level = 3
-            elif leave_count <= 15:
-                heat_level = 4
-            else:
-                heat_level = 5
-                
-            month_data.append({
-                'empty': False,
-                'day': day,
-                'count': leave_count,
-                'heat_level': heat_level
-            })
-            
-        calendar_data[month] = month_data
-    
     # Calculate leave statistics
     leave_types = {}
     departments = {}
     monthly_data = [0] * 12  # Initialize with 0 for each month
     total_leave_days = 0
+    leave_count = 0
     approved_count = 0
     pending_count = 0
     denied_count = 0
     
     # Process each leave request
     leaves_data = []
-    for leave in leave_requests:
+    leave_periods = []
+    for leave in stream_query(query):
+        leave_count += 1
+        
         # Calculate leave duration
         duration = (leave.end_date - leave.start_date).days + 1
         total_leave_days += duration
@@ -848,7 +920,7 @@ def time_off_analysis():
             pending_count += 1
         elif leave.status == 'denied':
             denied_count += 1
-            
+        
         # Aggregate by leave type
         if leave.leave_type in leave_types:
             leave_types[leave.leave_type]['count'] += 1
@@ -861,7 +933,7 @@ def time_off_analysis():
             }
             
         # Aggregate by department
-        dept = leave.employee.department
+        dept = leave.department
         if dept in departments:
             departments[dept]['count'] += 1
             departments[dept]['days'] += duration
@@ -897,19 +969,25 @@ def time_off_analysis():
                 else:
                     # Middle month - all days in month
                     days_in_this_month = calendar.monthrange(selected_year, month_idx + 1)[1]
-                    
-                monthly_data[month_idx] += days_in_this_month
                 
-        # Add leave to the detailed list
-        leaves_data.append({
-            'employee_name': leave.employee.get_display_name(),
-            'department': leave.employee.department.replace('_', ' ').title(),
+                monthly_data[month_idx] += days_in_this_month
+        
+        leave_row = {
+            'employee_name': _display_name(leave.username, leave.first_name, leave.last_name),
+            'department': leave.department.replace('_', ' ').title(),
             'leave_type': leave.leave_type.replace('_', ' ').title(),
             'start_date': leave.start_date.strftime('%Y-%m-%d'),
             'end_date': leave.end_date.strftime('%Y-%m-%d'),
             'duration': duration,
             'status': leave.status
-        })
+        }
+        
+        # Hand the leave to the export, or add it to the detailed list
+        if leave_sink is not None:
+            leave_sink(leave_row)
+        else:
+            leaves_data.append(leave_row)
+            leave_periods.append((leave.start_date, leave.end_date))
         
     # Calculate average leave days per employee for departments
     for dept_data in departments.values():
@@ -917,34 +995,116 @@ def time_off_analysis():
         dept_data['avg_days'] = dept_data['days'] / employee_count if employee_count > 0 else 0
         dept_data['employee_count'] = employee_count
     
-    # Convert to lists for the template
-    leave_types_list = list(leave_types.values())
-    departments_list = list(departments.values())
+    return {
+        'leave_periods': leave_periods,
+        'leave_count': leave_count,
+        'leaves_data': leaves_data,
+        'leave_types': leave_types,
+        'departments': departments,
+        'monthly_data': monthly_data,
+        'total_leave_days': total_leave_days,
+        'approved_count': approved_count,
+        'pending_count': pending_count,
+        'denied_count': denied_count
+    }
+
+def _selected_year(year):
+    """Parse the year filter, falling back to the current year"""
+    try:
+        return int(year)
+    except (TypeError, ValueError):
+        return datetime.now().year
+
+def _leave_calendar(selected_year, leave_periods):
+    """
+    Build the leave heat map calendar for a year
+    
+    Args:
+        selected_year: Year to lay out
+        leave_periods: List of (start_date, end_date) tuples
     
-    # Prepare month names for chart
-    month_names = ['Jan', 'Feb', 'Mar', 'Apr', 'May', 'Jun', 'Jul', 'Aug', 'Sep', 'Oct', 'Nov', 'Dec']
+    Returns:
+        dict: Month number -> list of day cells (Sunday-first, with leading empty cells)
+    """
+    calendar_data = {}
+    for month in range(1, 13):
+        # Get the number of days in this month
+        _, days_in_month = calendar.monthrange(selected_year, month)
+        month_data = []
+        
+        # Calculate the weekday (0 = Monday) of the first day of the month
+        first_day_weekday = datetime(selected_year, month, 1).weekday()
+        # Adjust for Sunday as first day (0 = Sunday)
+        first_day_weekday = (first_day_weekday + 1) % 7
+        
+        # Add empty cells for days before the 1st of the month
+        for _ in range(first_day_weekday):
+            month_data.append({'empty': True})
+        
+        # Add days of the month
+        for day in range(1, days_in_month + 1):
+            current_date = datetime(selected_year, month, day).date()
+            # Count leaves that include this date
+            leave_count = sum(1 for start, end in leave_periods if start <= current_date <= end)
+            
+            # Determine heat level (0-5) based on leave count
+            if leave_count == 0:
+                heat_level = 0
+            elif leave_count <= 2:
+                heat_level = 1
+            elif leave_count <= 5:
+                heat_level = 2
+            elif leave_count <= 9:
+                heat_level = 3
+            elif leave_count <= 15:
+                heat_level = 4
+            else:
+                heat_level = 5
+            
+            month_data.append({
+                'empty': False,
+                'day': day,
+                'count': leave_count,
+                'heat_level': heat_level
+            })
+        
+        calendar_data[month] = month_data
+    
+    return calendar_data
+
+@reports_bp.route('/hr/reports/time-off-analysis', methods=['GET'])
+@login_required
+@hr_required
+def time_off_analysis():
+    """Generate time off analysis report"""
+    # Get filter parameters
+    department = request.args.get('department', '')
+    year = request.args.get('year', str(datetime.now().year))
+    leave_type = request.args.get('leave_type', '')
+    
+    selected_year = _selected_year(year)
     
     # Export format handling
     export_format = request.args.get('export_format')
     if export_format:
-        include_charts = request.args.get('include_charts', 'true') == 'true'
-        include_calendar = request.args.get('include_calendar', 'true') == 'true'
-        include_table = request.args.get('include_table', 'true') == 'true'
-        
         # Redirect to the export endpoint with the same parameters
-        return redirect(url_for('reports.export_time_off_analysis', 
-                               year=selected_year,
-                               department=department,
-                               leave_type=leave_type,
-                               export_format=export_format,
-                               include_charts=include_charts,
-                               include_calendar=include_calendar,
-                               include_table=include_table))
+        params = request.args.to_dict()
+        params['year'] = selected_year
+        return redirect(url_for('reports.export_time_off_analysis', **params))
+    
+    data = _time_off_dataset(department, selected_year, leave_type)
+    leave_periods = data['leave_periods']
+    
+    # Prepare calendar data
+    calendar_data = _leave_calendar(selected_year, leave_periods)
+    
+    # Prepare month names for chart
+    month_names = ['Jan', 'Feb', 'Mar', 'Apr', 'May', 'Jun', 'Jul', 'Aug', 'Sep', 'Oct', 'Nov', 'Dec']
     
     # Render the template with all the data
     return render_template(
         'reports/time_off_analysis.html',
-        leaves=leaves_data,
+        leaves=data['leaves_data'],
         january_days=calendar_data[1],
         february_days=calendar_data[2],
         march_days=calendar_data[3],
@@ -959,16 +1119,377 @@ def time_off_analysis():
         december_days=calendar_data[12],
         selected_year=selected_year,
         current_year=datetime.now().year,
-        leave_types=leave_types_list,
-        departments=departments_list,
-        monthly_data=monthly_data,
+        leave_types=list(data['leave_types'].values()),
+        departments=list(data['departments'].values()),
+        monthly_data=data['monthly_data'],
         month_names=month_names,
-        approved_leave_count=approved_count,
-        pending_leave_count=pending_count,
-        denied_leave_count=denied_count,
-        total_leave_days=total_leave_days
+        approved_leave_count=data['approved_count'],
+        pending_leave_count=data['pending_count'],
+        denied_leave_count=data['denied_count'],
+        total_leave_days=data['total_leave_days']
     )
 
+def build_time_off_export(params, progress=_no_progress):
+    """
+    Build a time off analysis export file
+    
+    Args:
+        params: Export parameters (year, department, leave_type, export_format, include_table)
+        progress: Callback receiving (percent, message) as the export advances
+    
+    Returns:
+        tuple: (path, filename, mimetype) of the generated file
+    """
+    export_format = params.get('export_format', 'csv')
+    include_table = params.get('include_table', 'true') == 'true'
+    selected_year = _selected_year(params.get('year', str(datetime.now().year)))
+    department = params.get('department', '')
+    leave_type = params.get('leave_type', '')
+    
+    timestamp = datetime.now().strftime('%Y%m%d-%H%M%S')
+    
+    # CSV Export
+    if export_format == 'csv':
+        temp_path = _temp_export_path('.csv')
+        with open(temp_path, 'w', newline='') as output:
+            writer = csv.writer(output)
+            
+            # Write headers
+            writer.writerow(['Employee', 'Department', 'Leave Type', 'Start Date', 'End Date', 'Duration (Days)', 'Status'])
+            
+            # Write each leave request as it is read from the database
+            def write_leave(leave):
+                writer.writerow([
+                    leave['employee_name'],
+                    leave['department'],
+                    leave['leave_type'],
+                    leave['start_date'],
+                    leave['end_date'],
+                    leave['duration'],
+                    leave['status'].capitalize()
+                ])
+            
+            _time_off_dataset(department, selected_year, leave_type, leave_sink=write_leave)
+        
+        return temp_path, f"time_off_analysis_{selected_year}_{timestamp}.csv", 'text/csv'
+    
+    # Excel Export
+    elif export_format == 'excel':
+        workbook = StreamingWorkbook()
+        try:
+            # Stream leave rows into the first sheet while the statistics are collected
+            write_leave = workbook.sheet_writer(
+                'Leave Requests',
+                ['employee_name', 'department', 'leave_type', 'start_date', 'end_date', 'duration', 'status']
+            )
+            data = _time_off_dataset(
+                department, selected_year, leave_type,
+                leave_sink=lambda leave: write_leave([
+                    leave['employee_name'], leave['department'], leave['leave_type'],
+                    leave['start_date'], leave['end_date'], leave['duration'], leave['status']
+                ])
+            )
+            progress(40, 'Collected leave data')
+            
+            approved_count = data['approved_count']
+            pending_count = data['pending_count']
+            denied_count = data['denied_count']
+            
+            # Add Department Analysis sheet
+            workbook.write_sheet(
+                'Department Analysis',
+                ['Department', 'Leave Count', 'Total Days', 'Avg Days per Employee', 'Employee Count'],
+                ([d['name'].replace('_', ' ').title(), d['count'], d['days'], d['avg_days'], d['employee_count']]
+                 for d in data['departments'].values())
+            )
+            
+            # Add Leave Type Analysis sheet
+            workbook.write_sheet(
+                'Leave Type Analysis',
+                ['Leave Type', 'Count', 'Total Days'],
+                ([lt['name'].replace('_', ' ').title(), lt['count'], lt['days']]
+                 for lt in data['leave_types'].values())
+            )
+            
+            # Add Monthly Distribution sheet
+            month_names = ['January', 'February', 'March', 'April', 'May', 'June',
+                          'July', 'August', 'September', 'October', 'November', 'December']
+            workbook.write_sheet(
+                'Monthly Distribution',
+                ['Month', 'Leave Days'],
+                zip(month_names, data['monthly_data'])
+            )
+            
+            # Add Status Summary sheet
+            workbook.write_sheet(
+                'Status Summary',
+                ['Status', 'Count'],
+                zip(['Approved', 'Pending', 'Denied', 'Total'],
+                    [approved_count, pending_count, denied_count,
+                     approved_count + pending_count + denied_count])
+            )
+            
+            # Add summary sheet
+            summary_sheet = workbook.add_worksheet('Summary')
+            summary_sheet.write(0, 0, 'Time Off Analysis Report')
+            summary_sheet.write(1, 0, f'Year: {selected_year}')
+            summary_sheet.write(2, 0, f'Generated on {datetime.now().strftime("%B %d, %Y at %H:%M:%S")}')
+            
+            summary_sheet.write(4, 0, 'Total Leave Requests')
+            summary_sheet.write(4, 1, data['leave_count'])
+            
+            summary_sheet.write(5, 0, 'Total Leave Days')
+            summary_sheet.write(5, 1, data['total_leave_days'])
+            
+            summary_sheet.write(6, 0, 'Approved Leave Requests')
+            summary_sheet.write(6, 1, approved_count)
+            
+            summary_sheet.write(7, 0, 'Pending Leave Requests')
+            summary_sheet.write(7, 1, pending_count)
+            
+            summary_sheet.write(8, 0, 'Denied Leave Requests')
+            summary_sheet.write(8, 1, denied_count)
+        finally:
+            temp_path = workbook.close()
+        
+        return temp_path, f"time_off_analysis_{selected_year}_{timestamp}.xlsx", XLSX_MIMETYPE
+    
+    data = _time_off_dataset(department, selected_year, leave_type)
+    leaves_data = data['leaves_data']
+    leave_types = data['leave_types']
+    departments = data['departments']
+    monthly_data = data['monthly_data']
+    total_leave_days = data['total_leave_days']
+    approved_count = data['approved_count']
+    pending_count = data['pending_count']
+    denied_count = data['denied_count']
+    progress(40, 'Collected leave data')
+    
+    # PDF Export
+    if export_format == 'pdf':
+        # Create a temporary file path
+        temp_path = _temp_export_path('.pdf')
+        
+        # ReportLab is only imported by PDF exports
+        from reportlab.lib import colors
+        from reportlab.lib.pagesizes import A4, landscape
+        from reportlab.platypus import SimpleDocTemplate, Table, TableStyle, Paragraph, Spacer
+        from reportlab.lib.styles import getSampleStyleSheet, ParagraphStyle
+        from reportlab.lib.enums import TA_CENTER
+        
+        # Use ReportLab to generate PDF
+        doc = SimpleDocTemplate(temp_path, pagesize=landscape(A4))
+        styles = getSampleStyleSheet()
+        elements = []
+        
+        # Title and header
+        title_style = ParagraphStyle(
+            'Title',
+            parent=styles['Heading1'],
+            alignment=TA_CENTER,
+            spaceAfter=20
+        )
+        
+        # Add title
+        elements.append(Paragraph(f"Time Off Analysis Report - {selected_year}", title_style))
+        elements.append(Paragraph(f"Generated on {datetime.now().strftime('%B %d, %Y at %H:%M:%S')}", styles['Normal']))
+        elements.append(Spacer(1, 20))
+        
+        # Add summary section
+        elements.append(Paragraph("Report Summary", styles['Heading2']))
+        summary_data = [
+            ["Total Leave Requests", "Total Leave Days", "Approved", "Pending", "Denied"],
+            [
+                str(len(leaves_data)),
+                str(total_leave_days),
+                str(approved_count),
+                str(pending_count),
+                str(denied_count)
+            ]
+        ]
+        
+        summary_table = Table(summary_data, colWidths=[120, 100, 100, 100, 100])
+        summary_table.setStyle(TableStyle([
+            ('BACKGROUND', (0, 0), (-1, 0), colors.grey),
+            ('TEXTCOLOR', (0, 0), (-1, 0), colors.whitesmoke),
+            ('ALIGN', (0, 0), (-1, -1), 'CENTER'),
+            ('FONTNAME', (0, 0), (-1, 0), 'Helvetica-Bold'),
+            ('BOTTOMPADDING', (0, 0), (-1, 0), 12),
+            ('BACKGROUND', (0, 1), (-1, -1), colors.beige),
+            ('GRID', (0, 0), (-1, -1), 1, colors.black),
+        ]))
+        
+        elements.append(summary_table)
+        elements.append(Spacer(1, 20))
+        
+        # Leave Type Distribution Section
+        elements.append(Paragraph("Leave Type Distribution", styles['Heading2']))
+        
+        leave_type_data = [["Leave Type", "Count", "Total Days"]]
+        
+        # Add leave type data rows
+        for lt in leave_types.values():
+            leave_type_data.append([
+                lt['name'].replace('_', ' ').title(),
+                str(lt['count']),
+                str(lt['days'])
+            ])
+        
+        # Create leave type table
+        leave_type_table = Table(leave_type_data, colWidths=[200, 100, 100])
+        leave_type_table.setStyle(TableStyle([
+            # Header style
+            ('BACKGROUND', (0, 0), (-1, 0), colors.grey),
+            ('TEXTCOLOR', (0, 0), (-1, 0), colors.whitesmoke),
+            ('ALIGN', (0, 0), (-1, 0), 'CENTER'),
+            ('FONTNAME', (0, 0), (-1, 0), 'Helvetica-Bold'),
+            
+            # Data rows style
+            ('FONTNAME', (0, 1), (-1, -1), 'Helvetica'),
+            ('ALIGN', (1, 1), (-1, -1), 'CENTER'),  # Center align numeric columns
+            
+            # Grid
+            ('GRID', (0, 0), (-1, -1), 0.5, colors.grey),
+            
+            # Add alternating row colors
+            ('ROWBACKGROUNDS', (0, 1), (-1, -1), [colors.white, colors.lightgrey])
+        ]))
+        
+        elements.append(leave_type_table)
+        elements.append(Spacer(1, 20))
+        
+        # Department Analysis
+        elements.append(Paragraph("Department Analysis", styles['Heading2']))
+        
+        dept_data = [["Department", "Leave Count", "Total Days", "Avg Days per Employee"]]
+        
+        # Add department data rows
+        for dept in departments.values():
+            dept_data.append([
+                dept['name'].replace('_', ' ').title(),
+                str(dept['count']),
+                str(dept['days']),
+                f"{dept['avg_days']:.1f}"
+            ])
+        
+        # Create department table
+        dept_table = Table(dept_data, colWidths=[200, 100, 100, 150])
+        dept_table.setStyle(TableStyle([
+            # Header style
+            ('BACKGROUND', (0, 0), (-1, 0), colors.grey),
+            ('TEXTCOLOR', (0, 0), (-1, 0), colors.whitesmoke),
+            ('ALIGN', (0, 0), (-1, 0), 'CENTER'),
+            ('FONTNAME', (0, 0), (-1, 0), 'Helvetica-Bold'),
+            
+            # Data rows style
+            ('FONTNAME', (0, 1), (-1, -1), 'Helvetica'),
+            ('ALIGN', (1, 1), (-1, -1), 'CENTER'),  # Center align numeric columns
+            
+            # Grid
+            ('GRID', (0, 0), (-1, -1), 0.5, colors.grey),
+            
+            # Add alternating row colors
+            ('ROWBACKGROUNDS', (0, 1), (-1, -1), [colors.white, colors.lightgrey])
+        ]))
+        
+        elements.append(dept_table)
+        elements.append(Spacer(1, 20))
+        
+        # Monthly Distribution
+        elements.append(Paragraph("Monthly Leave Distribution", styles['Heading2']))
+        
+        month_names = ['January', 'February', 'March', 'April', 'May', 'June',
+                      'July', 'August', 'September', 'October', 'November', 'December']
+        
+        month_data = [["Month", "Leave Days"]]
+        
+        # Add month data rows
+        for i, month in enumerate(month_names):
+            month_data.append([
+                month,
+                str(monthly_data[i])
+            ])
+        
+        # Create month table
+        month_table = Table(month_data, colWidths=[200, 100])
+        month_table.setStyle(TableStyle([
+            # Header style
+            ('BACKGROUND', (0, 0), (-1, 0), colors.grey),
+            ('TEXTCOLOR', (0, 0), (-1, 0), colors.whitesmoke),
+            ('ALIGN', (0, 0), (-1, 0), 'CENTER'),
+            ('FONTNAME', (0, 0), (-1, 0), 'Helvetica-Bold'),
+            
+            # Data rows style
+            ('FONTNAME', (0, 1), (-1, -1), 'Helvetica'),
+            ('ALIGN', (1, 1), (-1, -1), 'CENTER'),  # Center align numeric columns
+            
+            # Grid
+            ('GRID', (0, 0), (-1, -1), 0.5, colors.grey),
+            
+            # Add alternating row colors
+            ('ROWBACKGROUNDS', (0, 1), (-1, -1), [colors.white, colors.lightgrey])
+        ]))
+        
+        elements.append(month_table)
+        elements.append(Spacer(1, 20))
+        
+        # Include detailed leave table if requested
+        if include_table:
+            elements.append(Paragraph("Leave Request Details", styles['Heading2']))
+            
+            # Table header
+            leave_details_data = [
+                ["Employee", "Department", "Leave Type", "Start Date", "End Date", "Duration", "Status"]
+            ]
+            
+            # Add leave rows
+            for leave in leaves_data:
+                leave_details_data.append([
+                    leave['employee_name'],
+                    leave['department'],
+                    leave['leave_type'],
+                    leave['start_date'],
+                    leave['end_date'],
+                    f"{leave['duration']} days",
+                    leave['status'].capitalize()
+                ])
+            
+            # Create the table with column widths
+            leave_details_table = Table(leave_details_data, colWidths=[100, 80, 80, 70, 70, 60, 60])
+            leave_details_table.setStyle(TableStyle([
+                # Header style
+                ('BACKGROUND', (0, 0), (-1, 0), colors.grey),
+                ('TEXTCOLOR', (0, 0), (-1, 0), colors.whitesmoke),
+                ('ALIGN', (0, 0), (-1, 0), 'CENTER'),
+                ('FONTNAME', (0, 0), (-1, 0), 'Helvetica-Bold'),
+                
+                # Data rows style
+                ('FONTNAME', (0, 1), (-1, -1), 'Helvetica'),
+                ('ALIGN', (3, 1), (5, -1), 'CENTER'),  # Center align dates and numeric values
+                
+                # Grid
+                ('GRID', (0, 0), (-1, -1), 0.5, colors.grey),
+                
+                # Add alternating row colors
+                ('ROWBACKGROUNDS', (0, 1), (-1, -1), [colors.white, colors.lightgrey])
+            ]))
+            
+            elements.append(leave_details_table)
+            elements.append(Spacer(1, 20))
+        
+        # Add footer
+        elements.append(Spacer(1, 20))
+        footer_text = "Confidential: This document contains HR information and should be handled according to company policies."
+        elements.append(Paragraph(footer_text, styles['Italic']))
+        
+        # Build the PDF document
+        progress(70, 'Rendering PDF')
+        doc.build(elements)
+        
+        return temp_path, f"time_off_analysis_{selected_year}_{timestamp}.pdf", 'application/pdf'
+    
+    raise ValueError(f"Unsupported export format: {export_format}")
+
 @reports_bp.route('/hr/reports/time-off-analysis/export', methods=['GET'])
 @login_required
 @hr_required
@@ -979,402 +1500,498 @@ def export_time_off_analysis():
     year = request.args.get('year', str(datetime.now().year))
     leave_type = request.args.get('leave_type', '')
     export_format = request.args.get('export_format', 'csv')
-    include_charts = request.args.get('include_charts', 'true') == 'true'
-    include_calendar = request.args.get('include_calendar', 'true') == 'true'
-    include_table = request.args.get('include_table', 'true') == 'true'
+    
+    selected_year = _selected_year(year)
+    
+    # Typed formats download the raw leave dataset for the same filters
+    if is_columnar_format(export_format):
+        return redirect(url_for('reports.export_dataset', dataset='leave',
+                                export_format=export_format,
+                                year=selected_year,
+                                department=department,
+                                leave_type=leave_type,
+                                **({'async': 'true'} if request.args.get('async') == 'true' else {})))
+    
+    if export_format not in ('csv', 'excel', 'pdf'):
+        # Default response if no export format is specified
+        return redirect(url_for('reports.time_off_analysis', year=selected_year))
+    
+    # Large exports can be built by the report job worker instead
+    if request.args.get('async') == 'true':
+        return _queue_export('time_off_analysis')
+    
+    params = request.args.to_dict()
+    params['export_format'] = export_format
     
     try:
-        selected_year = int(year)
-    except ValueError:
-        selected_year = datetime.now().year
+        return _send_export(build_time_off_export(params))
+    except ImportError:
+        flash("Excel export requires the xlsxwriter package. Using CSV instead.", "warning")
+        # Fallback to CSV if xlsxwriter is not available
+        return redirect(url_for('reports.export_time_off_analysis',
+                                year=selected_year,
+                                department=department,
+                                leave_type=leave_type,
+                                export_format='csv'))
+    except Exception as e:
+        flash(f"Error generating {export_format.upper()}: {str(e)}", "danger")
+        return redirect(url_for('reports.time_off_analysis', year=selected_year))
+
+def _training_filters(department='', time_period='all', category=''):
+    """
+    Build the SQL conditions shared by the training analytics queries
     
-    # Build query based on filters
-    query = LeaveRequest.query.join(LeaveRequest.employee)
+    Args:
+        department: Only count enrollments of employees in this department
+        time_period: all, current_year, last_year or last_6_months (by program start date)
+        category: Only include programs in this category
     
-    # Apply department filter if specified
+    Returns:
+        tuple: (program_conditions, enrollment_conditions)
+    """
+    from models import TrainingProgram, TrainingEnrollment
+    
+    program_conditions = []
+    enrollment_conditions = []
+    
+    # Time period is matched against the program start date
+    today = datetime.now().date()
+    if time_period == 'current_year':
+        program_conditions.append(TrainingProgram.start_date >= today.replace(month=1, day=1))
+        program_conditions.append(TrainingProgram.start_date <= today.replace(month=12, day=31))
+    elif time_period == 'last_year':
+        program_conditions.append(TrainingProgram.start_date >= today.replace(year=today.year - 1, month=1, day=1))
+        program_conditions.append(TrainingProgram.start_date <= today.replace(year=today.year - 1, month=12, day=31))
+    elif time_period == 'last_6_months':
+        program_conditions.append(TrainingProgram.start_date >= today - timedelta(days=183))
+    
+    if category:
+        program_conditions.append(TrainingProgram.category == category)
+    
+    # Department narrows enrollments, not programs
     if department:
-        query = query.filter(User.department == department)
-        
-    # Apply leave type filter if specified
-    if leave_type:
-        query = query.filter(LeaveRequest.leave_type == leave_type)
+        enrollment_conditions.append(TrainingEnrollment.employee_id.in_(
+            db.session.query(User.id).filter(User.department == department)
+        ))
     
-    # Filter leaves for the selected year
-    start_date = datetime(selected_year, 1, 1).date()
-    end_date = datetime(selected_year, 12, 31).date()
-    query = query.filter(
-        db.or_(
-            db.and_(LeaveRequest.start_date >= start_date, LeaveRequest.start_date <= end_date),
-            db.and_(LeaveRequest.end_date >= start_date, LeaveRequest.end_date <= end_date)
-        )
-    )
+    return program_conditions, enrollment_conditions
+
+def _training_analytics_dataset(department='', time_period='all', category=''):
+    """
+    Compute the training analytics summary with grouped queries
     
-    # Get all leave requests matching filters
-    leave_requests = query.all()
+    Every figure comes from a GROUP BY over programs or enrollments, so the
+    number of queries stays fixed no matter how many programs exist.
     
-    # Process and aggregate leave data
-    leave_types = {}
-    departments = {}
-    monthly_data = [0] * 12  # Initialize with 0 for each month
-    total_leave_days = 0
-    approved_count = 0
-    pending_count = 0
-    denied_count = 0
+    Returns:
+        dict: Summary values, breakdowns and chart data used by the report and exports
+    """
+    from models import TrainingProgram, TrainingEnrollment
     
-    # Process each leave request
-    leaves_data = []
-    for leave in leave_requests:
-        # Calculate leave duration
-        duration = (leave.end_date - leave.start_date).days + 1
-        total_leave_days += duration
-        
-        # Count by status
-        if leave.status == 'approved':
-            approved_count += 1
-        elif leave.status == 'pending':
-            pending_count += 1
-        elif leave.status == 'denied':
-            denied_count += 1
-            
-        # Aggregate by leave type
-        if leave.leave_type in leave_types:
-            leave_types[leave.leave_type]['count'] += 1
-            leave_types[leave.leave_type]['days'] += duration
-        else:
-            leave_types[leave.leave_type] = {
-                'name': leave.leave_type,
-                'count': 1,
-                'days': duration
-            }
-            
-        # Aggregate by department
-        dept = leave.employee.department
-        if dept in departments:
-            departments[dept]['count'] += 1
-            departments[dept]['days'] += duration
-        else:
-            departments[dept] = {
-                'name': dept,
-                'count': 1,
-                'days': duration,
-                'employees': set()
-            }
-        departments[dept]['employees'].add(leave.employee_id)
-        
-        # Add to monthly data
-        # Consider spreading the leave across multiple months if it spans months
-        start_month = leave.start_date.month - 1  # 0-based index
-        end_month = leave.end_date.month - 1  # 0-based index
-        
-        if start_month == end_month:
-            # Leave is within one month
-            monthly_data[start_month] += duration
-        else:
-            # Leave spans multiple months
-            for month_idx in range(start_month, end_month + 1):
-                # Calculate days in this specific month
-                if month_idx == start_month:
-                    # First month - days from start to end of month
-                    month_end = datetime(selected_year, month_idx + 1, calendar.monthrange(selected_year, month_idx + 1)[1]).date()
-                    days_in_this_month = (month_end - leave.start_date).days + 1
-                elif month_idx == end_month:
-                    # Last month - days from start of month to end
-                    month_start = datetime(selected_year, month_idx + 1, 1).date()
-                    days_in_this_month = (leave.end_date - month_start).days + 1
-                else:
-                    # Middle month - all days in month
-                    days_in_this_month = calendar.monthrange(selected_year, month_idx + 1)[1]
-                    
-                monthly_data[month_idx] += days_in_this_month
-                
-        # Add leave to the detailed list
-        leaves_data.append({
-            'employee_name': leave.employee.get_display_name(),
-            'department': leave.employee.department.replace('_', ' ').title(),
-            'leave_type': leave.leave_type.replace('_', ' ').title(),
-            'start_date': leave.start_date.strftime('%Y-%m-%d'),
-            'end_date': leave.end_date.strftime('%Y-%m-%d'),
-            'duration': duration,
-            'status': leave.status
-        })
-        
-    # Calculate average leave days per employee for departments
-    for dept_data in departments.values():
-        employee_count = len(dept_data['employees'])
-        dept_data['avg_days'] = dept_data['days'] / employee_count if employee_count > 0 else 0
-        dept_data['employee_count'] = employee_count
+    program_conditions, enrollment_conditions = _training_filters(department, time_period, category)
+    completed_case = db.case((TrainingEnrollment.status == 'completed', 1), else_=0)
+    
+    # Program counts and capacity by program status
+    program_status = {}
+    total_capacity = 0
+    status_rows = db.session.query(
+        TrainingProgram.status,
+        db.func.count(TrainingProgram.id),
+        db.func.coalesce(db.func.sum(TrainingProgram.max_participants), 0)
+    ).filter(*program_conditions).group_by(TrainingProgram.status)
+    
+    for status, count, capacity in status_rows:
+        program_status[status] = count
+        total_capacity += capacity or 0
+    
+    # Enrollment counts by enrollment status; capacity-limited programs are
+    # tracked separately so unlimited programs don't inflate the enrollment rate
+    enrollment_status = {}
+    capacity_enrollments = 0
+    enrollment_rows = db.session.query(
+        TrainingEnrollment.status,
+        db.func.count(TrainingEnrollment.id),
+        db.func.coalesce(db.func.sum(db.case((TrainingProgram.max_participants > 0, 1), else_=0)), 0)
+    ).join(
+        TrainingProgram, TrainingEnrollment.training_id == TrainingProgram.id
+    ).filter(*program_conditions, *enrollment_conditions).group_by(TrainingEnrollment.status)
+    
+    for status, count, limited in enrollment_rows:
+        enrollment_status[status] = count
+        capacity_enrollments += limited or 0
+    
+    total_enrollments = sum(enrollment_status.values())
+    total_completions = enrollment_status.get('completed', 0)
+    
+    # Department participation
+    department_rows = db.session.query(
+        User.department,
+        db.func.count(TrainingEnrollment.id),
+        db.func.coalesce(db.func.sum(completed_case), 0)
+    ).join(
+        TrainingProgram, TrainingEnrollment.training_id == TrainingProgram.id
+    ).join(
+        User, TrainingEnrollment.employee_id == User.id
+    ).filter(*program_conditions, *enrollment_conditions).group_by(User.department).order_by(User.department)
+    
+    departments = [{
+        'name': name or 'unassigned',
+        'enrollments': enrollments,
+        'completions': completions or 0
+    } for name, enrollments, completions in department_rows]
+    
+    # Programs and enrollments per category
+    category_rows = db.session.query(
+        TrainingProgram.category,
+        db.func.count(db.distinct(TrainingProgram.id)),
+        db.func.count(TrainingEnrollment.id)
+    ).outerjoin(
+        TrainingEnrollment,
+        db.and_(TrainingEnrollment.training_id == TrainingProgram.id, *enrollment_conditions)
+    ).filter(*program_conditions).group_by(TrainingProgram.category).order_by(TrainingProgram.category)
+    
+    categories = [{
+        'name': name,
+        'count': count,
+        'enrollments': enrollments
+    } for name, count, enrollments in category_rows]
+    
+    # Rating histogram
+    rating_distribution = {1: 0, 2: 0, 3: 0, 4: 0, 5: 0}
+    rating_rows = db.session.query(
+        TrainingEnrollment.rating,
+        db.func.count(TrainingEnrollment.id)
+    ).join(
+        TrainingProgram, TrainingEnrollment.training_id == TrainingProgram.id
+    ).filter(
+        TrainingEnrollment.rating.isnot(None), *program_conditions, *enrollment_conditions
+    ).group_by(TrainingEnrollment.rating)
+    
+    for rating, count in rating_rows:
+        if rating in rating_distribution:
+            rating_distribution[rating] = count
+    
+    rating_count = sum(rating_distribution.values())
+    avg_rating = (sum(rating * count for rating, count in rating_distribution.items()) / rating_count) if rating_count else 0
+    
+    # Enrollments by calendar month
+    monthly_enrollments = [0] * 12
+    month = db.extract('month', TrainingEnrollment.enrollment_date)
+    monthly_rows = db.session.query(
+        month,
+        db.func.count(TrainingEnrollment.id)
+    ).join(
+        TrainingProgram, TrainingEnrollment.training_id == TrainingProgram.id
+    ).filter(
+        TrainingEnrollment.enrollment_date.isnot(None), *program_conditions, *enrollment_conditions
+    ).group_by(month)
+    
+    for month_number, count in monthly_rows:
+        monthly_enrollments[int(month_number) - 1] = count
+    
+    # Categories for the filter dropdown ignore the current filters
+    available_categories = [
+        name for (name,) in db.session.query(TrainingProgram.category).distinct().order_by(TrainingProgram.category)
+    ]
+    
+    return {
+        'total_programs': sum(program_status.values()),
+        'completed_programs': program_status.get('completed', 0),
+        'active_programs': program_status.get('in-progress', 0),
+        'upcoming_programs': program_status.get('upcoming', 0),
+        'cancelled_programs': program_status.get('cancelled', 0),
+        'total_enrollments': total_enrollments,
+        'total_completions': total_completions,
+        'total_capacity': total_capacity,
+        'enrollment_status': enrollment_status,
+        'enrollment_rate': min(capacity_enrollments / total_capacity * 100, 100) if total_capacity else 0,
+        'completion_rate': (total_completions / total_enrollments * 100) if total_enrollments else 0,
+        'departments': departments,
+        'categories': categories,
+        'rating_distribution': rating_distribution,
+        'avg_rating': avg_rating,
+        'monthly_enrollments': monthly_enrollments,
+        'available_categories': available_categories
+    }
+
+@reports_bp.route('/hr/reports/training-analytics', methods=['GET'])
+@login_required
+@hr_required
+def training_analytics():
+    """Generate training program analytics report"""
+    # Get filter parameters
+    department = request.args.get('department', '')
+    time_period = request.args.get('time_period', 'all')
+    category = request.args.get('category', '')
+    
+    analytics = _training_analytics_dataset(department, time_period, category)
+    
+    return render_template(
+        'reports/training_analytics.html',
+        training_programs=list(_training_program_rows(department, time_period, category)),
+        month_names=['Jan', 'Feb', 'Mar', 'Apr', 'May', 'Jun', 'Jul', 'Aug', 'Sep', 'Oct', 'Nov', 'Dec'],
+        **analytics
+    )
+
+def _training_program_rows(department='', time_period='all', category=''):
+    """Stream training programs with their enrollment statistics from one grouped query"""
+    from models import TrainingProgram, TrainingEnrollment
+    
+    program_conditions, enrollment_conditions = _training_filters(department, time_period, category)
+    
+    query = db.session.query(
+        TrainingProgram.title,
+        TrainingProgram.category,
+        TrainingProgram.instructor,
+        TrainingProgram.status,
+        TrainingProgram.start_date,
+        TrainingProgram.end_date,
+        TrainingProgram.max_participants,
+        db.func.count(TrainingEnrollment.id).label('enrolled_count'),
+        db.func.coalesce(db.func.sum(db.case((TrainingEnrollment.status == 'completed', 1), else_=0)), 0).label('completed_count'),
+        db.func.avg(TrainingEnrollment.rating).label('avg_rating'),
+        db.func.count(TrainingEnrollment.rating).label('rating_count')
+    ).outerjoin(
+        TrainingEnrollment,
+        db.and_(TrainingEnrollment.training_id == TrainingProgram.id, *enrollment_conditions)
+    ).filter(*program_conditions).group_by(TrainingProgram.id).order_by(TrainingProgram.start_date)
+    
+    for row in stream_query(query):
+        yield {
+            'title': row.title,
+            'category': row.category,
+            'instructor': row.instructor,
+            'status': row.status,
+            'start_date': row.start_date,
+            'end_date': row.end_date,
+            'max_participants': row.max_participants or 0,
+            'enrolled_count': row.enrolled_count,
+            'completed_count': row.completed_count,
+            'completion_rate': (row.completed_count / row.enrolled_count * 100) if row.enrolled_count else 0,
+            'avg_rating': float(row.avg_rating) if row.avg_rating is not None else 0,
+            'rating_count': row.rating_count
+        }
+
+def build_training_analytics_export(params, progress=_no_progress):
+    """
+    Build a training analytics export file
+    
+    Args:
+        params: Export parameters (department, time_period, category, export_format, include_details)
+        progress: Callback receiving (percent, message) as the export advances
+    
+    Returns:
+        tuple: (path, filename, mimetype) of the generated file
+    """
+    export_format = params.get('export_format', 'csv')
+    include_details = params.get('include_details', 'true') == 'true'
+    filters = (params.get('department', ''), params.get('time_period', 'all'), params.get('category', ''))
+    
+    analytics = _training_analytics_dataset(*filters)
+    total_programs = analytics['total_programs']
+    completed_programs = analytics['completed_programs']
+    active_programs = analytics['active_programs']
+    upcoming_programs = analytics['upcoming_programs']
+    total_enrollments = analytics['total_enrollments']
+    departments = analytics['departments']
+    categories = analytics['categories']
+    rating_distribution = analytics['rating_distribution']
+    avg_rating = analytics['avg_rating']
+    progress(40, 'Collected training data')
+    
+    timestamp = datetime.now().strftime('%Y%m%d-%H%M%S')
     
     # CSV Export
     if export_format == 'csv':
-        output = io.StringIO()
-        writer = csv.writer(output)
-        
-        # Write headers
-        writer.writerow(['Employee', 'Department', 'Leave Type', 'Start Date', 'End Date', 'Duration (Days)', 'Status'])
-        
-        # Write data for each leave request
-        for leave in leaves_data:
-            writer.writerow([
-                leave['employee_name'],
-                leave['department'],
-                leave['leave_type'],
-                leave['start_date'],
-                leave['end_date'],
-                leave['duration'],
-                leave['status'].capitalize()
-            ])
-        
-        # Prepare CSV response
-        output.seek(0)
-        timestamp = datetime.now().strftime('%Y%m%d-%H%M%S')
-        filename = f"time_off_analysis_{selected_year}_{timestamp}.csv"
+        temp_path = _temp_export_path('.csv')
+        with open(temp_path, 'w', newline='') as output:
+            writer = csv.writer(output)
+            
+            # Write headers
+            writer.writerow(['Title', 'Category', 'Instructor', 'Status', 'Start Date', 'End Date',
+                             'Enrolled', 'Max Participants', 'Completion Rate', 'Avg Rating'])
+            
+            # Write data for each training program
+            for program in _training_program_rows(*filters):
+                writer.writerow([
+                    program['title'],
+                    program['category'].replace('_', ' ').title(),
+                    program['instructor'],
+                    program['status'].replace('-', ' ').title(),
+                    program['start_date'].strftime('%Y-%m-%d'),
+                    program['end_date'].strftime('%Y-%m-%d'),
+                    program['enrolled_count'],
+                    program['max_participants'],
+                    f"{program['completion_rate']:.1f}%",
+                    f"{program['avg_rating']:.1f}" if program['avg_rating'] else "N/A"
+                ])
         
-        return Response(
-            output.getvalue(),
-            mimetype="text/csv",
-            headers={"Content-disposition": f"attachment; filename={filename}"}
-        )
+        return temp_path, f"training_analytics_{timestamp}.csv", 'text/csv'
     
     # Excel Export
     elif export_format == 'excel':
+        workbook = StreamingWorkbook()
         try:
-            import pandas as pd
-            from io import BytesIO
-            
-            # Create DataFrame for leave data
-            df = pd.DataFrame(leaves_data)
-            
-            # Prepare Excel file in memory
-            output = BytesIO()
-            with pd.ExcelWriter(output, engine='xlsxwriter') as writer:
-                # Write leave data
-                df.to_excel(writer, sheet_name='Leave Requests', index=False)
-                
-                # Add Department Analysis sheet
-                dept_df = pd.DataFrame([{
-                    'Department': d['name'].replace('_', ' ').title(),
-                    'Leave Count': d['count'],
-                    'Total Days': d['days'],
-                    'Avg Days per Employee': d['avg_days'],
-                    'Employee Count': d['employee_count']
-                } for d in departments.values()])
-                dept_df.to_excel(writer, sheet_name='Department Analysis', index=False)
-                
-                # Add Leave Type Analysis sheet
-                leave_type_df = pd.DataFrame([{
-                    'Leave Type': lt['name'].replace('_', ' ').title(),
-                    'Count': lt['count'],
-                    'Total Days': lt['days']
-                } for lt in leave_types.values()])
-                leave_type_df.to_excel(writer, sheet_name='Leave Type Analysis', index=False)
-                
-                # Add Monthly Distribution sheet
-                month_names = ['January', 'February', 'March', 'April', 'May', 'June', 
-                              'July', 'August', 'September', 'October', 'November', 'December']
-                monthly_df = pd.DataFrame({
-                    'Month': month_names,
-                    'Leave Days': monthly_data
-                })
-                monthly_df.to_excel(writer, sheet_name='Monthly Distribution', index=False)
-                
-                # Add Status Summary sheet
-                status_df = pd.DataFrame({
-                    'Status': ['Approved', 'Pending', 'Denied', 'Total'],
-                    'Count': [approved_count, pending_count, denied_count, 
-                             approved_count + pending_count + denied_count]
-                })
-                status_df.to_excel(writer, sheet_name='Status Summary', index=False)
-                
-                # Format workbook
-                workbook = writer.book
-                
-                # Add summary sheet
-                summary_sheet = workbook.add_worksheet('Summary')
-                summary_sheet.write(0, 0, 'Time Off Analysis Report')
-                summary_sheet.write(1, 0, f'Year: {selected_year}')
-                summary_sheet.write(2, 0, f'Generated on {datetime.now().strftime("%B %d, %Y at %H:%M:%S")}')
-                
-                summary_sheet.write(4, 0, 'Total Leave Requests')
-                summary_sheet.write(4, 1, len(leaves_data))
-                
-                summary_sheet.write(5, 0, 'Total Leave Days')
-                summary_sheet.write(5, 1, total_leave_days)
-                
-                summary_sheet.write(6, 0, 'Approved Leave Requests')
-                summary_sheet.write(6, 1, approved_count)
-                
-                summary_sheet.write(7, 0, 'Pending Leave Requests')
-                summary_sheet.write(7, 1, pending_count)
-                
-                summary_sheet.write(8, 0, 'Denied Leave Requests')
-                summary_sheet.write(8, 1, denied_count)
-            
-            # Return the Excel file
-            output.seek(0)
-            timestamp = datetime.now().strftime('%Y%m%d-%H%M%S')
-            filename = f"time_off_analysis_{selected_year}_{timestamp}.xlsx"
-            
-            return Response(
-                output.getvalue(),
-                mimetype="application/vnd.openxmlformats-officedocument.spreadsheetml.sheet",
-                headers={"Content-disposition": f"attachment; filename={filename}"}
+            # Stream program rows straight into the first sheet
+            workbook.write_sheet(
+                'Training Programs',
+                ['Title', 'Category', 'Instructor', 'Status', 'Start Date', 'End Date',
+                 'Enrolled', 'Max Participants', 'Completion Rate', 'Avg Rating'],
+                ([
+                    program['title'],
+                    program['category'].replace('_', ' ').title(),
+                    program['instructor'],
+                    program['status'].replace('-', ' ').title(),
+                    program['start_date'],
+                    program['end_date'],
+                    program['enrolled_count'],
+                    program['max_participants'],
+                    f"{program['completion_rate']:.1f}%",
+                    program['avg_rating'] if program['avg_rating'] else "N/A"
+                ] for program in _training_program_rows(*filters))
             )
-        except ImportError:
-            flash("Excel export requires pandas and xlsxwriter packages. Using CSV instead.", "warning")
-            # Fallback to CSV if pandas is not available
-            return redirect(url_for('reports.export_time_off_analysis', 
-                                    year=selected_year,
-                                    department=department,
-                                    leave_type=leave_type,
-                                    export_format='csv'))
-    
-    # PDF Export
-    elif export_format == 'pdf':
-        # Generate a timestamp for the filename
-        timestamp = datetime.now().strftime('%Y%m%d-%H%M%S')
-        filename = f"time_off_analysis_{selected_year}_{timestamp}.pdf"
-        
-        try:
-            # Create a temporary file path
-            with tempfile.NamedTemporaryFile(suffix='.pdf', delete=False) as temp_file:
-                temp_path = temp_file.name
-                
-            # Use ReportLab to generate PDF
-            doc = SimpleDocTemplate(temp_path, pagesize=landscape(A4))
-            styles = getSampleStyleSheet()
-            elements = []
             
-            # Title and header
-            title_style = ParagraphStyle(
-                'Title', 
-                parent=styles['Heading1'],
-                alignment=TA_CENTER,
-                spaceAfter=20
-            )
-            
-            # Add title
-            elements.append(Paragraph(f"Time Off Analysis Report - {selected_year}", title_style))
-            elements.append(Paragraph(f"Generated on {datetime.now().strftime('%B %d, %Y at %H:%M:%S')}", styles['Normal']))
-            elements.append(Spacer(1, 20))
-            
-            # Add summary section
-            elements.append(Paragraph("Report Summary", styles['Heading2']))
-            summary_data = [
-                ["Total Leave Requests", "Total Leave Days", "Approved", "Pending", "Denied"],
-                [
-                    str(len(leaves_data)),
-                    str(total_leave_days),
-                    str(approved_count),
-                    str(pending_count),
-                    str(denied_count)
-                ]
-            ]
-            
-            summary_table = Table(summary_data, colWidths=[120, 100, 100, 100, 100])
-            summary_table.setStyle(TableStyle([
-                ('BACKGROUND', (0, 0), (-1, 0), colors.grey),
-                ('TEXTCOLOR', (0, 0), (-1, 0), colors.whitesmoke),
-                ('ALIGN', (0, 0), (-1, -1), 'CENTER'),
-                ('FONTNAME', (0, 0), (-1, 0), 'Helvetica-Bold'),
-                ('BOTTOMPADDING', (0, 0), (-1, 0), 12),
-                ('BACKGROUND', (0, 1), (-1, -1), colors.beige),
-                ('GRID', (0, 0), (-1, -1), 1, colors.black),
-            ]))
-            
-            elements.append(summary_table)
-            elements.append(Spacer(1, 20))
-            
-            # Leave Type Distribution Section
-            elements.append(Paragraph("Leave Type Distribution", styles['Heading2']))
-            
-            leave_type_data = [["Leave Type", "Count", "Total Days"]]
-            
-            # Add leave type data rows
-            for lt in leave_types.values():
-                leave_type_data.append([
-                    lt['name'].replace('_', ' ').title(),
-                    str(lt['count']),
-                    str(lt['days'])
-                ])
+            # Add Department Analysis sheet if we have department data
+            if departments:
+                workbook.write_sheet(
+                    'Department Analysis',
+                    ['Department', 'Enrollments', 'Completions', 'Completion Rate'],
+                    ([
+                        d['name'].replace('_', ' ').title(),
+                        d.get('enrollments', 0),
+                        d.get('completions', 0),
+                        f"{(d.get('completions', 0) / d.get('enrollments', 1) * 100):.1f}%" if d.get('enrollments', 0) > 0 else "0%"
+                    ] for d in departments)
+                )
             
-            # Create leave type table
-            leave_type_table = Table(leave_type_data, colWidths=[200, 100, 100])
-            leave_type_table.setStyle(TableStyle([
-                # Header style
-                ('BACKGROUND', (0, 0), (-1, 0), colors.grey),
-                ('TEXTCOLOR', (0, 0), (-1, 0), colors.whitesmoke),
-                ('ALIGN', (0, 0), (-1, 0), 'CENTER'),
-                ('FONTNAME', (0, 0), (-1, 0), 'Helvetica-Bold'),
-                
-                # Data rows style
-                ('FONTNAME', (0, 1), (-1, -1), 'Helvetica'),
-                ('ALIGN', (1, 1), (-1, -1), 'CENTER'),  # Center align numeric columns
-                
-                # Grid
-                ('GRID', (0, 0), (-1, -1), 0.5, colors.grey),
-                
-                # Add alternating row colors
-                ('ROWBACKGROUNDS', (0, 1), (-1, -1), [colors.white, colors.lightgrey])
-            ]))
+            # Add Category Analysis sheet
+            if categories:
+                workbook.write_sheet(
+                    'Category Analysis',
+                    ['Category', 'Count', 'Enrollments'],
+                    ([c['name'].replace('_', ' ').title(), c.get('count', 0), c.get('enrollments', 0)]
+                     for c in categories)
+                )
             
-            elements.append(leave_type_table)
-            elements.append(Spacer(1, 20))
+            # Add Ratings Distribution sheet
+            if sum(rating_distribution.values()) > 0:
+                workbook.write_sheet(
+                    'Rating Distribution',
+                    ['Rating', 'Count'],
+                    rating_distribution.items()
+                )
             
-            # Department Analysis
-            elements.append(Paragraph("Department Analysis", styles['Heading2']))
+            # Add summary sheet
+            summary_sheet = workbook.add_worksheet('Summary')
+            summary_sheet.write(0, 0, 'Training Analytics Report')
+            summary_sheet.write(1, 0, f'Generated on {datetime.now().strftime("%B %d, %Y at %H:%M:%S")}')
             
-            dept_data = [["Department", "Leave Count", "Total Days", "Avg Days per Employee"]]
+            summary_sheet.write(3, 0, 'Total Programs')
+            summary_sheet.write(3, 1, total_programs)
             
-            # Add department data rows
-            for dept in departments.values():
-                dept_data.append([
-                    dept['name'].replace('_', ' ').title(),
-                    str(dept['count']),
-                    str(dept['days']),
-                    f"{dept['avg_days']:.1f}"
-                ])
+            summary_sheet.write(4, 0, 'Completed Programs')
+            summary_sheet.write(4, 1, completed_programs)
             
-            # Create department table
-            dept_table = Table(dept_data, colWidths=[200, 100, 100, 150])
-            dept_table.setStyle(TableStyle([
-                # Header style
-                ('BACKGROUND', (0, 0), (-1, 0), colors.grey),
-                ('TEXTCOLOR', (0, 0), (-1, 0), colors.whitesmoke),
-                ('ALIGN', (0, 0), (-1, 0), 'CENTER'),
-                ('FONTNAME', (0, 0), (-1, 0), 'Helvetica-Bold'),
-                
-                # Data rows style
-                ('FONTNAME', (0, 1), (-1, -1), 'Helvetica'),
-                ('ALIGN', (1, 1), (-1, -1), 'CENTER'),  # Center align numeric columns
-                
-                # Grid
-                ('GRID', (0, 0), (-1, -1), 0.5, colors.grey),
-                
-                # Add alternating row colors
-                ('ROWBACKGROUNDS', (0, 1), (-1, -1), [colors.white, colors.lightgrey])
-            ]))
+            summary_sheet.write(5, 0, 'Active Programs')
+            summary_sheet.write(5, 1, active_programs)
             
-            elements.append(dept_table)
-            elements.append(Spacer(1, 20))
+            summary_sheet.write(6, 0, 'Upcoming Programs')
+            summary_sheet.write(6, 1, upcoming_programs)
             
-            # Monthly Distribution
-            elements.append(Paragraph("Monthly Leave Distribution", styles['Heading2']))
+            summary_sheet.write(8, 0, 'Total Enrollments')
+            summary_sheet.write(8, 1, total_enrollments)
             
-            month_names = ['January', 'February', 'March', 'April', 'May', 'June', 
-                          'July', 'August', 'September', 'October', 'November', 'December']
+            summary_sheet.write(9, 0, 'Average Rating')
+            summary_sheet.write(9, 1, f"{avg_rating:.1f}")
+        finally:
+            temp_path = workbook.close()
+        
+        return temp_path, f"training_analytics_{timestamp}.xlsx", XLSX_MIMETYPE
+    
+    # PDF Export
+    elif export_format == 'pdf':
+        # Create a temporary file path
+        temp_path = _temp_export_path('.pdf')
+        
+        # ReportLab is only imported by PDF exports
+        from reportlab.lib import colors
+        from reportlab.lib.pagesizes import A4, landscape
+        from reportlab.platypus import SimpleDocTemplate, Table, TableStyle, Paragraph, Spacer
+        from reportlab.lib.styles import getSampleStyleSheet, ParagraphStyle
+        from reportlab.lib.enums import TA_CENTER
+        
+        # Use ReportLab to generate PDF
+        doc = SimpleDocTemplate(temp_path, pagesize=landscape(A4))
+        styles = getSampleStyleSheet()
+        elements = []
+        
+        # Title and header
+        title_style = ParagraphStyle(
+            'Title',
+            parent=styles['Heading1'],
+            alignment=TA_CENTER,
+            spaceAfter=20
+        )
+        
+        # Add title
+        elements.append(Paragraph(f"Training Analytics Report", title_style))
+        elements.append(Paragraph(f"Generated on {datetime.now().strftime('%B %d, %Y at %H:%M:%S')}", styles['Normal']))
+        elements.append(Spacer(1, 20))
+        
+        # Add summary section
+        elements.append(Paragraph("Report Summary", styles['Heading2']))
+        summary_data = [
+            ["Total Programs", "Completed", "Active", "Upcoming", "Total Enrollments", "Avg Rating"],
+            [
+                str(total_programs),
+                str(completed_programs),
+                str(active_programs),
+                str(upcoming_programs),
+                str(total_enrollments),
+                f"{avg_rating:.1f}"
+            ]
+        ]
+        
+        summary_table = Table(summary_data, colWidths=[100, 80, 80, 80, 100, 80])
+        summary_table.setStyle(TableStyle([
+            ('BACKGROUND', (0, 0), (-1, 0), colors.grey),
+            ('TEXTCOLOR', (0, 0), (-1, 0), colors.whitesmoke),
+            ('ALIGN', (0, 0), (-1, -1), 'CENTER'),
+            ('FONTNAME', (0, 0), (-1, 0), 'Helvetica-Bold'),
+            ('BOTTOMPADDING', (0, 0), (-1, 0), 12),
+            ('BACKGROUND', (0, 1), (-1, -1), colors.beige),
+            ('GRID', (0, 0), (-1, -1), 1, colors.black),
+        ]))
+        
+        elements.append(summary_table)
+        elements.append(Spacer(1, 20))
+        
+        # Include detailed training programs table if requested
+        if include_details:
+            elements.append(Paragraph("Training Programs", styles['Heading2']))
             
-            month_data = [["Month", "Leave Days"]]
+            # Table header
+            program_table_data = [
+                ["Title", "Category", "Instructor", "Status", "Start Date", "End Date", "Enrolled", "Completion"]
+            ]
             
-            # Add month data rows
-            for i, month in enumerate(month_names):
-                month_data.append([
-                    month,
-                    str(monthly_data[i])
+            # Add program rows
+            for program in _training_program_rows(*filters):
+                program_table_data.append([
+                    program['title'],
+                    program['category'].replace('_', ' ').title(),
+                    program['instructor'],
+                    program['status'].replace('-', ' ').title(),
+                    program['start_date'].strftime('%Y-%m-%d'),
+                    program['end_date'].strftime('%Y-%m-%d'),
+                    f"{program['enrolled_count']}"
+                    + (f"/{program['max_participants']}" if program['max_participants'] > 0 else ""),
+                    f"{program['completion_rate']:.1f}%"
                 ])
             
-            # Create month table
-            month_table = Table(month_data, colWidths=[200, 100])
-            month_table.setStyle(TableStyle([
+            # Create the table with column widths
+            program_table = Table(program_table_data, colWidths=[120, 80, 80, 70, 70, 70, 60, 60])
+            program_table.setStyle(TableStyle([
                 # Header style
                 ('BACKGROUND', (0, 0), (-1, 0), colors.grey),
                 ('TEXTCOLOR', (0, 0), (-1, 0), colors.whitesmoke),
@@ -1383,7 +2000,7 @@ def export_time_off_analysis():
                 
                 # Data rows style
                 ('FONTNAME', (0, 1), (-1, -1), 'Helvetica'),
-                ('ALIGN', (1, 1), (-1, -1), 'CENTER'),  # Center align numeric columns
+                ('ALIGN', (3, 1), (7, -1), 'CENTER'),  # Center align dates and numeric values
                 
                 # Grid
                 ('GRID', (0, 0), (-1, -1), 0.5, colors.grey),
@@ -1392,436 +2009,419 @@ def export_time_off_analysis():
                 ('ROWBACKGROUNDS', (0, 1), (-1, -1), [colors.white, colors.lightgrey])
             ]))
             
-            elements.append(month_table)
+            elements.append(program_table)
             elements.append(Spacer(1, 20))
-            
-            # Include detailed leave table if requested
-            if include_table:
-                elements.append(Paragraph("Leave Request Details", styles['Heading2']))
-                
-                # Table header
-                leave_details_data = [
-                    ["Employee", "Department", "Leave Type", "Start Date", "End Date", "Duration", "Status"]
-                ]
-                
-                # Add leave rows
-                for leave in leaves_data:
-                    leave_details_data.append([
-                        leave['employee_name'],
-                        leave['department'],
-                        leave['leave_type'],
-                        leave['start_date'],
-                        leave['end_date'],
-                        f"{leave['duration']} days",
-                        leave['status'].capitalize()
-                    ])
-                
-                # Create the table with column widths
-                leave_details_table = Table(leave_details_data, colWidths=[100, 80, 80, 70, 70, 60, 60])
-                leave_details_table.setStyle(TableStyle([
-                    # Header style
-                    ('BACKGROUND', (0, 0), (-1, 0), colors.grey),
-                    ('TEXTCOLOR', (0, 0), (-1, 0), colors.whitesmoke),
-                    ('ALIGN', (0, 0), (-1, 0), 'CENTER'),
-                    ('FONTNAME', (0, 0), (-1, 0), 'Helvetica-Bold'),
-                    
-                    # Data rows style
-                    ('FONTNAME', (0, 1), (-1, -1), 'Helvetica'),
-                    ('ALIGN', (3, 1), (5, -1), 'CENTER'),  # Center align dates and numeric values
-                    
-                    # Grid
-                    ('GRID', (0, 0), (-1, -1), 0.5, colors.grey),
-                    
-                    # Add alternating row colors
-                    ('ROWBACKGROUNDS', (0, 1), (-1, -1), [colors.white, colors.lightgrey])
-                ]))
-                
-                elements.append(leave_details_table)
-                elements.append(Spacer(1, 20))
-            
-            # Add footer
-            elements.append(Spacer(1, 20))
-            footer_text = "Confidential: This document contains HR information and should be handled according to company policies."
-            elements.append(Paragraph(footer_text, styles['Italic']))
-            
-            # Build the PDF document
-            doc.build(elements)
-            
-            # Return the PDF file as a response
-            return send_file(
-                temp_path,
-                mimetype='application/pdf',
-                as_attachment=True,
-                download_name=filename
-            )
-        except Exception as e:
-            flash(f"Error generating PDF: {str(e)}", "danger")
-            return redirect(url_for('reports.time_off_analysis', year=selected_year))
+        
+        # Add footer
+        elements.append(Spacer(1, 20))
+        footer_text = "Confidential: This document contains HR information and should be handled according to company policies."
+        elements.append(Paragraph(footer_text, styles['Italic']))
+        
+        # Build the PDF document
+        progress(70, 'Rendering PDF')
+        doc.build(elements)
+        
+        return temp_path, f"training_analytics_{timestamp}.pdf", 'application/pdf'
     
-    # Default response if no export format is specified
-    return redirect(url_for('reports.time_off_analysis', year=selected_year))
+    raise ValueError(f"Unsupported export format: {export_format}")
 
-@reports_bp.route('/hr/reports/training-analytics', methods=['GET'])
+@reports_bp.route('/hr/reports/training-analytics/export', methods=['GET'])
 @login_required
 @hr_required
-def training_analytics():
-    """Generate training program analytics report"""
-    # Get filter parameters
-    department = request.args.get('department', '')
-    time_period = request.args.get('time_period', 'all')
-    category = request.args.get('category', '')
+def export_training_analytics():
+    """Export training analytics report in various formats"""
+    export_format = request.args.get('export_format', 'csv')
     
-    # Placeholder implementation - this should be expanded with actual data
-    from models import TrainingProgram, TrainingEnrollment, User
+    if export_format not in ('csv', 'excel', 'pdf'):
+        # Default response if no export format is specified
+        return redirect(url_for('reports.training_analytics'))
     
-    # Base query for training programs
-    training_programs = TrainingProgram.query.all()
+    # Large exports can be built by the report job worker instead
+    if request.args.get('async') == 'true':
+        return _queue_export('training_analytics')
     
-    # Default empty data structures for template
-    total_programs = len(training_programs)
-    completed_programs = 0
-    active_programs = 0
-    upcoming_programs = 0
+    params = request.args.to_dict()
+    params['export_format'] = export_format
     
-    total_enrollments = 0
-    total_completions = 0
-    total_capacity = 0
+    try:
+        return _send_export(build_training_analytics_export(params))
+    except ImportError:
+        flash("Excel export requires the xlsxwriter package. Using CSV instead.", "warning")
+        # Fallback to CSV if xlsxwriter is not available
+        return redirect(url_for('reports.export_training_analytics',
+                               **dict(params, export_format='csv')))
+    except Exception as e:
+        flash(f"Error generating {export_format.upper()}: {str(e)}", "danger")
+        return redirect(url_for('reports.training_analytics'))
+
+def _parse_date_param(value):
+    """Parse an optional YYYY-MM-DD request parameter"""
+    if not value:
+        return None
+    try:
+        return datetime.strptime(value, '%Y-%m-%d').date()
+    except ValueError:
+        return None
+
+def _dataset_date_window(params):
+    """Resolve start/end dates for a dataset export, accepting a year shortcut"""
+    start_date = _parse_date_param(params.get('start_date'))
+    end_date = _parse_date_param(params.get('end_date'))
     
-    departments = {}
-    categories = {}
-    rating_distribution = {1: 0, 2: 0, 3: 0, 4: 0, 5: 0}
-    monthly_enrollments = [0] * 12  # For tracking enrollments by month
+    if params.get('year') and not (start_date or end_date):
+        selected_year = _selected_year(params.get('year'))
+        start_date = datetime(selected_year, 1, 1).date()
+        end_date = datetime(selected_year, 12, 31).date()
     
-    # Basic values for the template
-    enrollment_rate = 0
-    completion_rate = 0
-    avg_rating = 0
+    return start_date, end_date
+
+def _attendance_columnar_dataset(params):
+    """Teaching unit attendance records, one row per session"""
+    columns = [
+        ('attendance_id', 'int'),
+        ('date', 'date'),
+        ('employee_id', 'int'),
+        ('username', 'string'),
+        ('department', 'string'),
+        ('teaching_unit_id', 'int'),
+        ('unit_title', 'string'),
+        ('unit_code', 'string'),
+        ('status', 'string'),
+        ('hours', 'float'),
+        ('attendance_factor', 'float'),
+        ('notes', 'string'),
+        ('recorded_at', 'timestamp'),
+    ]
     
-    # Get available categories for filter dropdown
-    available_categories = []
+    query = db.session.query(
+        UnitAttendance.id,
+        UnitAttendance.date,
+        TeachingUnit.employee_id,
+        User.username,
+        User.department,
+        UnitAttendance.teaching_unit_id,
+        TeachingUnit.title,
+        TeachingUnit.code,
+        UnitAttendance.status,
+        UnitAttendance.hours,
+        db.case(
+            (UnitAttendance.status == 'present', 1.0),
+            (UnitAttendance.status == 'late', 0.75),
+            (UnitAttendance.status == 'excused', 0.5),
+            else_=0.0
+        ),
+        UnitAttendance.notes,
+        UnitAttendance.created_at
+    ).join(
+        TeachingUnit, UnitAttendance.teaching_unit_id == TeachingUnit.id
+    ).join(User, TeachingUnit.employee_id == User.id)
     
-    # Handle export if requested
-    export_format = request.args.get('export_format')
-    if export_format:
-        # Export handling code would go here
-        pass
+    # Apply filters
+    start_date, end_date = _dataset_date_window(params)
+    if start_date:
+        query = query.filter(UnitAttendance.date >= start_date)
+    if end_date:
+        query = query.filter(UnitAttendance.date <= end_date)
+    if params.get('department'):
+        query = query.filter(User.department == params['department'])
+    if params.get('employee_id', '0') not in ('', '0'):
+        query = query.filter(TeachingUnit.employee_id == int(params['employee_id']))
+    if params.get('unit_id', '0') not in ('', '0'):
+        query = query.filter(UnitAttendance.teaching_unit_id == int(params['unit_id']))
     
-    # Render the template with placeholders
-    return render_template(
-        'reports/training_analytics.html',
-        training_programs=training_programs,
-        total_programs=total_programs,
-        completed_programs=completed_programs,
-        active_programs=active_programs,
-        upcoming_programs=upcoming_programs,
-        total_enrollments=total_enrollments,
-        total_completions=total_completions,
-        total_capacity=total_capacity,
-        enrollment_rate=enrollment_rate,
-        completion_rate=completion_rate,
-        departments=list(departments.values()),
-        categories=list(categories.values()),
-        rating_distribution=rating_distribution,
-        avg_rating=avg_rating,
-        monthly_enrollments=monthly_enrollments,
-        month_names=['Jan', 'Feb', 'Mar', 'Apr', 'May', 'Jun', 'Jul', 'Aug', 'Sep', 'Oct', 'Nov', 'Dec'],
-        available_categories=available_categories
+    return columns, stream_query(query.order_by(UnitAttendance.date, UnitAttendance.id))
+
+def _leave_columnar_dataset(params):
+    """Leave requests with their duration in days"""
+    columns = [
+        ('leave_id', 'int'),
+        ('employee_id', 'int'),
+        ('username', 'string'),
+        ('department', 'string'),
+        ('leave_type', 'string'),
+        ('start_date', 'date'),
+        ('end_date', 'date'),
+        ('duration_days', 'int'),
+        ('status', 'string'),
+        ('approver_id', 'int'),
+        ('created_at', 'timestamp'),
+        ('updated_at', 'timestamp'),
+    ]
+    
+    query = db.session.query(
+        LeaveRequest.id,
+        LeaveRequest.employee_id,
+        User.username,
+        User.department,
+        LeaveRequest.leave_type,
+        LeaveRequest.start_date,
+        LeaveRequest.end_date,
+        LeaveRequest.status,
+        LeaveRequest.approver_id,
+        LeaveRequest.created_at,
+        LeaveRequest.updated_at
+    ).join(User, LeaveRequest.employee_id == User.id)
+    
+    # Apply filters - leaves overlapping the window
+    start_date, end_date = _dataset_date_window(params)
+    if start_date:
+        query = query.filter(LeaveRequest.end_date >= start_date)
+    if end_date:
+        query = query.filter(LeaveRequest.start_date <= end_date)
+    if params.get('department'):
+        query = query.filter(User.department == params['department'])
+    if params.get('leave_type'):
+        query = query.filter(LeaveRequest.leave_type == params['leave_type'])
+    
+    rows = (
+        (row.id, row.employee_id, row.username, row.department, row.leave_type,
+         row.start_date, row.end_date, (row.end_date - row.start_date).days + 1,
+         row.status, row.approver_id, row.created_at, row.updated_at)
+        for row in stream_query(query.order_by(LeaveRequest.start_date, LeaveRequest.id))
     )
+    return columns, rows
 
-@reports_bp.route('/hr/reports/training-analytics/export', methods=['GET'])
-@login_required
-@hr_required
-def export_training_analytics():
-    """Export training analytics report in various formats"""
-    # Get filter parameters
-    department = request.args.get('department', '')
-    time_period = request.args.get('time_period', 'all')
-    category = request.args.get('category', '')
-    export_format = request.args.get('export_format', 'csv')
-    include_charts = request.args.get('include_charts', 'true') == 'true'
-    include_details = request.args.get('include_details', 'true') == 'true'
+def _salary_columnar_dataset(params):
+    """Salary history, one row per salary record"""
+    columns = [
+        ('salary_id', 'int'),
+        ('employee_id', 'int'),
+        ('username', 'string'),
+        ('department', 'string'),
+        ('amount', 'float'),
+        ('currency', 'string'),
+        ('salary_type', 'string'),
+        ('contract_type', 'string'),
+        ('academic_year', 'string'),
+        ('effective_date', 'date'),
+        ('end_date', 'date'),
+    ]
     
-    # Placeholder implementation - this should be expanded with actual data
-    from models import TrainingProgram, TrainingEnrollment, User
+    query = db.session.query(
+        EmployeeSalary.id,
+        EmployeeSalary.employee_id,
+        User.username,
+        User.department,
+        EmployeeSalary.amount,
+        EmployeeSalary.currency,
+        EmployeeSalary.salary_type,
+        EmployeeSalary.contract_type,
+        EmployeeSalary.academic_year,
+        EmployeeSalary.effective_date,
+        EmployeeSalary.end_date
+    ).join(User, EmployeeSalary.employee_id == User.id)
     
-    # Base query for training programs
-    training_programs = TrainingProgram.query.all()
+    # Apply filters
+    start_date, end_date = _dataset_date_window(params)
+    if start_date:
+        query = query.filter(EmployeeSalary.effective_date >= start_date)
+    if end_date:
+        query = query.filter(EmployeeSalary.effective_date <= end_date)
+    if params.get('department'):
+        query = query.filter(User.department == params['department'])
     
-    # Default empty data structures for template
-    total_programs = len(training_programs)
-    completed_programs = 0
-    active_programs = 0
-    upcoming_programs = 0
+    return columns, stream_query(query.order_by(EmployeeSalary.employee_id, EmployeeSalary.effective_date))
+
+def _payroll_columnar_dataset(params):
+    """Payroll records with gross and net pay"""
+    columns = [
+        ('payroll_id', 'int'),
+        ('employee_id', 'int'),
+        ('username', 'string'),
+        ('department', 'string'),
+        ('period_start', 'date'),
+        ('period_end', 'date'),
+        ('base_pay', 'float'),
+        ('unit_pay', 'float'),
+        ('deductions', 'float'),
+        ('total_pay', 'float'),
+        ('net_pay', 'float'),
+        ('status', 'string'),
+        ('payment_date', 'date'),
+        ('payment_method', 'string'),
+        ('created_at', 'timestamp'),
+    ]
     
-    total_enrollments = 0
-    total_completions = 0
-    total_capacity = 0
+    base_pay = db.func.coalesce(Payroll.base_pay, 0.0)
+    unit_pay = db.func.coalesce(Payroll.unit_pay, 0.0)
+    deductions = db.func.coalesce(Payroll.deductions, 0.0)
     
-    departments = {}
-    categories = {}
-    rating_distribution = {1: 0, 2: 0, 3: 0, 4: 0, 5: 0}
-    monthly_enrollments = [0] * 12  # For tracking enrollments by month
+    query = db.session.query(
+        Payroll.id,
+        Payroll.employee_id,
+        User.username,
+        User.department,
+        Payroll.period_start,
+        Payroll.period_end,
+        base_pay,
+        unit_pay,
+        deductions,
+        base_pay + unit_pay,
+        base_pay + unit_pay - deductions,
+        Payroll.status,
+        Payroll.payment_date,
+        Payroll.payment_method,
+        Payroll.created_at
+    ).join(User, Payroll.employee_id == User.id)
     
-    # Basic values for the template
-    enrollment_rate = 0
-    completion_rate = 0
-    avg_rating = 0
+    # Apply filters
+    start_date, end_date = _dataset_date_window(params)
+    if start_date:
+        query = query.filter(Payroll.period_start >= start_date)
+    if end_date:
+        query = query.filter(Payroll.period_start <= end_date)
+    if params.get('department'):
+        query = query.filter(User.department == params['department'])
+    if params.get('status'):
+        query = query.filter(Payroll.status == params['status'])
+    
+    return columns, stream_query(query.order_by(Payroll.period_start, Payroll.id))
+
+# Typed datasets available for Parquet / Arrow / CSV download
+COLUMNAR_DATASETS = {
+    'attendance': _attendance_columnar_dataset,
+    'leave': _leave_columnar_dataset,
+    'salary': _salary_columnar_dataset,
+    'payroll': _payroll_columnar_dataset,
+}
+
+def build_dataset_export(params, progress=_no_progress):
+    """
+    Build a raw dataset export in a typed columnar format (or CSV)
+
+    Args:
+        params: Export parameters (dataset, export_format and dataset filters)
+        progress: Callback receiving (percent, message) as the export advances
+
+    Returns:
+        tuple: (path, filename, mimetype) of the generated file
+    """
+    dataset = params.get('dataset')
+    export_format = params.get('export_format', 'parquet')
+    
+    if dataset not in COLUMNAR_DATASETS:
+        raise ValueError(f"Unknown dataset: {dataset}")
+    
+    columns, rows = COLUMNAR_DATASETS[dataset](params)
+    timestamp = datetime.now().strftime('%Y%m%d-%H%M%S')
     
     # CSV Export
     if export_format == 'csv':
-        output = io.StringIO()
-        writer = csv.writer(output)
-        
-        # Write headers
-        writer.writerow(['Title', 'Category', 'Instructor', 'Status', 'Start Date', 'End Date', 
-                         'Enrolled', 'Max Participants', 'Completion Rate', 'Avg Rating'])
-        
-        # Write data for each training program
-        for program in training_programs:
-            writer.writerow([
-                program.title,
-                program.category.replace('_', ' ').title(),
-                program.instructor,
-                program.status.replace('-', ' ').title(),
-                program.start_date.strftime('%Y-%m-%d'),
-                program.end_date.strftime('%Y-%m-%d'),
-                program.enrolled_count if hasattr(program, 'enrolled_count') else 0,
-                program.max_participants,
-                f"{program.completion_rate:.1f}%" if hasattr(program, 'completion_rate') else "N/A",
-                f"{program.avg_rating:.1f}" if hasattr(program, 'avg_rating') and program.avg_rating else "N/A"
-            ])
-        
-        # Prepare CSV response
-        output.seek(0)
-        timestamp = datetime.now().strftime('%Y%m%d-%H%M%S')
-        filename = f"training_analytics_{timestamp}.csv"
+        temp_path = _temp_export_path('.csv')
+        with open(temp_path, 'w', newline='') as output:
+            writer = csv.writer(output)
+            writer.writerow([name for name, _ in columns])
+            writer.writerows(rows)
         
-        return Response(
-            output.getvalue(),
-            mimetype="text/csv",
-            headers={"Content-disposition": f"attachment; filename={filename}"}
+        return temp_path, f"{dataset}_{timestamp}.csv", 'text/csv'
+    
+    # Parquet / Arrow IPC Export
+    elif is_columnar_format(export_format):
+        temp_path, row_count = write_columnar(
+            rows, columns, export_format,
+            progress=lambda written: progress(50, f'{written} rows written')
         )
+        progress(80, f'{row_count} rows written')
+        
+        options = COLUMNAR_FORMATS[export_format]
+        return temp_path, f"{dataset}_{timestamp}{options['suffix']}", options['mimetype']
     
-    # Excel Export
-    elif export_format == 'excel':
-        try:
-            import pandas as pd
-            from io import BytesIO
-            
-            # Create DataFrame for training data
-            program_data = []
-            for program in training_programs:
-                program_data.append({
-                    'Title': program.title,
-                    'Category': program.category.replace('_', ' ').title(),
-                    'Instructor': program.instructor,
-                    'Status': program.status.replace('-', ' ').title(),
-                    'Start Date': program.start_date,
-                    'End Date': program.end_date,
-                    'Enrolled': program.enrolled_count if hasattr(program, 'enrolled_count') else 0,
-                    'Max Participants': program.max_participants,
-                    'Completion Rate': f"{program.completion_rate:.1f}%" if hasattr(program, 'completion_rate') else "N/A",
-                    'Avg Rating': program.avg_rating if hasattr(program, 'avg_rating') and program.avg_rating else "N/A"
-                })
-            
-            df = pd.DataFrame(program_data)
-            
-            # Prepare Excel file in memory
-            output = BytesIO()
-            with pd.ExcelWriter(output, engine='xlsxwriter') as writer:
-                # Write program data
-                df.to_excel(writer, sheet_name='Training Programs', index=False)
-                
-                # Add Department Analysis sheet if we have department data
-                if departments:
-                    dept_df = pd.DataFrame([{
-                        'Department': d['name'].replace('_', ' ').title(),
-                        'Enrollments': d.get('enrollments', 0),
-                        'Completions': d.get('completions', 0),
-                        'Completion Rate': f"{(d.get('completions', 0) / d.get('enrollments', 1) * 100):.1f}%" if d.get('enrollments', 0) > 0 else "0%"
-                    } for d in departments.values()])
-                    dept_df.to_excel(writer, sheet_name='Department Analysis', index=False)
-                
-                # Add Category Analysis sheet
-                if categories:
-                    cat_df = pd.DataFrame([{
-                        'Category': c['name'].replace('_', ' ').title(),
-                        'Count': c.get('count', 0),
-                        'Enrollments': c.get('enrollments', 0)
-                    } for c in categories.values()])
-                    cat_df.to_excel(writer, sheet_name='Category Analysis', index=False)
-                
-                # Add Ratings Distribution sheet
-                if sum(rating_distribution.values()) > 0:
-                    rating_df = pd.DataFrame({
-                        'Rating': list(rating_distribution.keys()),
-                        'Count': list(rating_distribution.values())
-                    })
-                    rating_df.to_excel(writer, sheet_name='Rating Distribution', index=False)
-                
-                # Format workbook
-                workbook = writer.book
-                
-                # Add summary sheet
-                summary_sheet = workbook.add_worksheet('Summary')
-                summary_sheet.write(0, 0, 'Training Analytics Report')
-                summary_sheet.write(1, 0, f'Generated on {datetime.now().strftime("%B %d, %Y at %H:%M:%S")}')
-                
-                summary_sheet.write(3, 0, 'Total Programs')
-                summary_sheet.write(3, 1, total_programs)
-                
-                summary_sheet.write(4, 0, 'Completed Programs')
-                summary_sheet.write(4, 1, completed_programs)
-                
-                summary_sheet.write(5, 0, 'Active Programs')
-                summary_sheet.write(5, 1, active_programs)
-                
-                summary_sheet.write(6, 0, 'Upcoming Programs')
-                summary_sheet.write(6, 1, upcoming_programs)
-                
-                summary_sheet.write(8, 0, 'Total Enrollments')
-                summary_sheet.write(8, 1, total_enrollments)
-                
-                summary_sheet.write(9, 0, 'Average Rating')
-                summary_sheet.write(9, 1, f"{avg_rating:.1f}")
-            
-            # Return the Excel file
-            output.seek(0)
-            timestamp = datetime.now().strftime('%Y%m%d-%H%M%S')
-            filename = f"training_analytics_{timestamp}.xlsx"
-            
-            return Response(
-                output.getvalue(),
-                mimetype="application/vnd.openxmlformats-officedocument.spreadsheetml.sheet",
-                headers={"Content-disposition": f"attachment; filename={filename}"}
-            )
-        except ImportError:
-            flash("Excel export requires pandas and xlsxwriter packages. Using CSV instead.", "warning")
-            # Fallback to CSV if pandas is not available
-            return redirect(url_for('reports.export_training_analytics', 
-                                   export_format='csv'))
+    raise ValueError(f"Unsupported export format: {export_format}")
+
+@reports_bp.route('/hr/reports/datasets/<dataset>/export', methods=['GET'])
+@login_required
+@hr_required
+def export_dataset(dataset):
+    """Download a raw HR dataset as Parquet, Arrow or CSV"""
+    if dataset not in COLUMNAR_DATASETS:
+        abort(404)
     
-    # PDF Export
-    elif export_format == 'pdf':
-        # Generate a timestamp for the filename
-        timestamp = datetime.now().strftime('%Y%m%d-%H%M%S')
-        filename = f"training_analytics_{timestamp}.pdf"
-        
-        try:
-            # Create a temporary file path
-            with tempfile.NamedTemporaryFile(suffix='.pdf', delete=False) as temp_file:
-                temp_path = temp_file.name
-                
-            # Use ReportLab to generate PDF
-            doc = SimpleDocTemplate(temp_path, pagesize=landscape(A4))
-            styles = getSampleStyleSheet()
-            elements = []
-            
-            # Title and header
-            title_style = ParagraphStyle(
-                'Title', 
-                parent=styles['Heading1'],
-                alignment=TA_CENTER,
-                spaceAfter=20
-            )
-            
-            # Add title
-            elements.append(Paragraph(f"Training Analytics Report", title_style))
-            elements.append(Paragraph(f"Generated on {datetime.now().strftime('%B %d, %Y at %H:%M:%S')}", styles['Normal']))
-            elements.append(Spacer(1, 20))
-            
-            # Add summary section
-            elements.append(Paragraph("Report Summary", styles['Heading2']))
-            summary_data = [
-                ["Total Programs", "Completed", "Active", "Upcoming", "Total Enrollments", "Avg Rating"],
-                [
-                    str(total_programs),
-                    str(completed_programs),
-                    str(active_programs),
-                    str(upcoming_programs),
-                    str(total_enrollments),
-                    f"{avg_rating:.1f}"
-                ]
-            ]
-            
-            summary_table = Table(summary_data, colWidths=[100, 80, 80, 80, 100, 80])
-            summary_table.setStyle(TableStyle([
-                ('BACKGROUND', (0, 0), (-1, 0), colors.grey),
-                ('TEXTCOLOR', (0, 0), (-1, 0), colors.whitesmoke),
-                ('ALIGN', (0, 0), (-1, -1), 'CENTER'),
-                ('FONTNAME', (0, 0), (-1, 0), 'Helvetica-Bold'),
-                ('BOTTOMPADDING', (0, 0), (-1, 0), 12),
-                ('BACKGROUND', (0, 1), (-1, -1), colors.beige),
-                ('GRID', (0, 0), (-1, -1), 1, colors.black),
-            ]))
-            
-            elements.append(summary_table)
-            elements.append(Spacer(1, 20))
-            
-            # Include detailed training programs table if requested
-            if include_details:
-                elements.append(Paragraph("Training Programs", styles['Heading2']))
-                
-                # Table header
-                program_table_data = [
-                    ["Title", "Category", "Instructor", "Status", "Start Date", "End Date", "Enrolled", "Completion"]
-                ]
-                
-                # Add program rows
-                for program in training_programs:
-                    program_table_data.append([
-                        program.title,
-                        program.category.replace('_', ' ').title(),
-                        program.instructor,
-                        program.status.replace('-', ' ').title(),
-                        program.start_date.strftime('%Y-%m-%d'),
-                        program.end_date.strftime('%Y-%m-%d'),
-                        f"{program.enrolled_count if hasattr(program, 'enrolled_count') else 0}"
-                        + (f"/{program.max_participants}" if program.max_participants > 0 else ""),
-                        f"{program.completion_rate:.1f}%" if hasattr(program, 'completion_rate') else "N/A"
-                    ])
-                
-                # Create the table with column widths
-                program_table = Table(program_table_data, colWidths=[120, 80, 80, 70, 70, 70, 60, 60])
-                program_table.setStyle(TableStyle([
-                    # Header style
-                    ('BACKGROUND', (0, 0), (-1, 0), colors.grey),
-                    ('TEXTCOLOR', (0, 0), (-1, 0), colors.whitesmoke),
-                    ('ALIGN', (0, 0), (-1, 0), 'CENTER'),
-                    ('FONTNAME', (0, 0), (-1, 0), 'Helvetica-Bold'),
-                    
-                    # Data rows style
-                    ('FONTNAME', (0, 1), (-1, -1), 'Helvetica'),
-                    ('ALIGN', (3, 1), (7, -1), 'CENTER'),  # Center align dates and numeric values
-                    
-                    # Grid
-                    ('GRID', (0, 0), (-1, -1), 0.5, colors.grey),
-                    
-                    # Add alternating row colors
-                    ('ROWBACKGROUNDS', (0, 1), (-1, -1), [colors.white, colors.lightgrey])
-                ]))
-                
-                elements.append(program_table)
-                elements.append(Spacer(1, 20))
-            
-            # Add footer
-            elements.append(Spacer(1, 20))
-            footer_text = "Confidential: This document contains HR information and should be handled according to company policies."
-            elements.append(Paragraph(footer_text, styles['Italic']))
-            
-            # Build the PDF document
-            doc.build(elements)
-            
-            # Return the PDF file as a response
-            return send_file(
-                temp_path,
-                mimetype='application/pdf',
-                as_attachment=True,
-                download_name=filename
-            )
-        except Exception as e:
-            flash(f"Error generating PDF: {str(e)}", "danger")
-            return redirect(url_for('reports.training_analytics'))
+    export_format = request.args.get('export_format', 'parquet')
+    
+    # Large exports can be built by the report job worker instead
+    if request.args.get('async') == 'true':
+        return _queue_export('dataset', dataset=dataset)
+    
+    params = request.args.to_dict()
+    params['dataset'] = dataset
+    params['export_format'] = export_format
+    
+    try:
+        return _send_export(build_dataset_export(params))
+    except ImportError:
+        flash("Parquet and Arrow exports require the pyarrow package. Using CSV instead.", "warning")
+        # Fallback to CSV if pyarrow is not available
+        params['export_format'] = 'csv'
+        params.pop('dataset')
+        return redirect(url_for('reports.export_dataset', dataset=dataset, **params))
+    except Exception as e:
+        flash(f"Error generating {export_format.upper()}: {str(e)}", "danger")
+        return redirect(url_for('reports.index'))
+
+# Register export builders with the background report job worker
+register_report_builder('employee_demographics', build_employee_demographics_export)
+register_report_builder('time_off_analysis', build_time_off_export)
+register_report_builder('training_analytics', build_training_analytics_export)
+register_report_builder('dataset', build_dataset_export)
+
+@reports_bp.route('/hr/reports/jobs', methods=['POST'])
+@login_required
+@hr_required
+def create_job():
+    """Queue a report export job from a JSON request"""
+    data = request.get_json(silent=True) or {}
+    kind = data.get('kind')
     
-    # Default response if no export format is specified
-    return redirect(url_for('reports.training_analytics'))
+    if kind not in REPORT_BUILDERS:
+        return jsonify({
+            "status": "error",
+            "message": f"Unknown report type: {kind}"
+        }), 400
+    
+    params = {key: str(value) for key, value in (data.get('params') or {}).items()}
+    job = enqueue_report_job(kind, params, current_user.id)
+    return jsonify(job.to_dict()), 202
+
+@reports_bp.route('/hr/reports/jobs/<int:job_id>')
+@login_required
+@hr_required
+def job_status(job_id):
+    """Display the progress page for a background report export"""
+    job = ReportJob.query.get_or_404(job_id)
+    if job.requested_by != current_user.id and not current_user.is_admin():
+        abort(403)
+    return render_template('reports/job_status.html', job=job)
+
+@reports_bp.route('/hr/reports/jobs/<int:job_id>/status')
+@login_required
+@hr_required
+def job_status_json(job_id):
+    """Return the status and progress of a background report export"""
+    job = ReportJob.query.get_or_404(job_id)
+    if job.requested_by != current_user.id and not current_user.is_admin():
+        abort(403)
+    
+    # Stop the page polling a job whose worker died
+    if job.status == 'running' and expire_stale_jobs(job_id=job.id):
+        db.session.refresh(job)
+    return jsonify(job.to_dict())
+
+@reports_bp.route('/hr/reports/jobs/<int:job_id>/download')
+@login_required
+@hr_required
+def job_download(job_id):
+    """Download the artifact produced by a completed report export"""
+    job = ReportJob.query.get_or_404(job_id)
+    if job.requested_by != current_user.id and not current_user.is_admin():
+        abort(403)
+    
+    if job.status != 'completed' or job.artifact is None:
+        flash('This export is not ready yet.', 'warning')
+        return redirect(url_for('reports.job_status', job_id=job.id))
+    
+    return send_file(
+        io.BytesIO(job.artifact),
+        mimetype=job.mimetype,
+        as_attachment=True,
+        download_name=job.filename
+    )
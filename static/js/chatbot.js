@@ -230,10 +230,34 @@
         }
     }
     
+    /**
+     * Convert the markdown-like formatting of bot messages to HTML
+     * @param {string} message - The message text
+     * @returns {string} HTML for the message content
+     */
+    function formatBotMessage(message) {
+        // Convert ** for bold
+        message = message.replace(/\*\*(.*?)\*\*/g, '<strong>$1</strong>');
+        
+        // Convert * for italic
+        message = message.replace(/\*(.*?)\*/g, '<em>$1</em>');
+        
+        // Convert bullet points
+        message = message.replace(/- (.*?)(\n|$)/g, '<li>$1</li>');
+        if (message.includes('<li>')) {
+            message = '<ul>' + message + '</ul>';
+        }
+        
+        // Handle paragraphs
+        message = message.replace(/\n\n/g, '</p><p>');
+        return '<p>' + message + '</p>';
+    }
+    
     /**
      * Add a new message to the chat window
      * @param {string} message - The message text
      * @param {string} sender - 'user' or 'bot'
+     * @returns {HTMLElement} The message content element
      */
     function addMessage(message, sender) {
         const messageElement = document.createElement('div');
@@ -254,27 +278,7 @@
         contentElement.classList.add('hr-chatbot-message-content');
         
         // Parse markdown-like formatting for bot messages
-        if (sender === 'bot') {
-            // Convert ** for bold
-            message = message.replace(/\*\*(.*?)\*\*/g, '<strong>$1</strong>');
-            
-            // Convert * for italic
-            message = message.replace(/\*(.*?)\*/g, '<em>$1</em>');
-            
-            // Convert bullet points
-            message = message.replace(/- (.*?)(\n|$)/g, '<li>$1</li>');
-            if (message.includes('<li>')) {
-                message = '<ul>' + message + '</ul>';
-            }
-            
-            // Handle paragraphs
-            message = message.replace(/\n\n/g, '</p><p>');
-            message = '<p>' + message + '</p>';
-        } else {
-            message = '<p>' + message + '</p>';
-        }
-        
-        contentElement.innerHTML = message;
+        contentElement.innerHTML = sender === 'bot' ? formatBotMessage(message) : '<p>' + message + '</p>';
         
         // Assemble and add the message
         messageElement.appendChild(avatarElement);
@@ -283,6 +287,8 @@
         
         // Scroll to bottom
         chatbotMessages.scrollTop = chatbotMessages.scrollHeight;
+        
+        return contentElement;
     }
     
     /**
@@ -340,6 +346,86 @@
         }
     }
     
+    /**
+     * Read Server-Sent Events from a fetch response
+     * @param {Response} response - Response with a text/event-stream body
+     * @param {function} onEvent - Called with (event name, parsed data) per event
+     */
+    async function readEventStream(response, onEvent) {
+        const reader = response.body.getReader();
+        const decoder = new TextDecoder();
+        let buffer = '';
+        
+        while (true) {
+            const { value, done } = await reader.read();
+            if (done) break;
+            buffer += decoder.decode(value, { stream: true });
+            
+            // Events are separated by a blank line
+            let boundary;
+            while ((boundary = buffer.indexOf('\n\n')) !== -1) {
+                const block = buffer.slice(0, boundary);
+                buffer = buffer.slice(boundary + 2);
+                
+                let event = 'message';
+                let data = '';
+                block.split('\n').forEach(line => {
+                    if (line.startsWith('event:')) event = line.slice(6).trim();
+                    else if (line.startsWith('data:')) data += line.slice(5).trim();
+                });
+                if (data) onEvent(event, JSON.parse(data));
+            }
+        }
+    }
+    
+    /**
+     * Stream the bot's answer into a new message as it is generated
+     * @param {string} message - The message to send
+     * @param {string} csrfToken - CSRF token for the request
+     */
+    async function streamMessage(message, csrfToken) {
+        const response = await fetch('/api/chatbot/stream', {
+            method: 'POST',
+            headers: {
+                'Content-Type': 'application/json',
+                'Accept': 'text/event-stream',
+                'X-CSRFToken': csrfToken || '', // Add CSRF token if available
+            },
+            body: JSON.stringify({ message }),
+            credentials: 'same-origin' // Include cookies
+        });
+        
+        if (!response.ok) {
+            throw new Error(`HTTP error! status: ${response.status}`);
+        }
+        
+        let text = '';
+        let contentElement = null;
+        let failed = false;
+        
+        await readEventStream(response, (event, data) => {
+            if (event === 'delta') {
+                // Replace the loading dots with the answer on the first chunk
+                if (!contentElement) {
+                    removeLoadingIndicator();
+                    contentElement = addMessage('', 'bot');
+                    // Still busy until the stream ends
+                    isLoading = true;
+                }
+                text += data.text;
+                contentElement.innerHTML = formatBotMessage(text);
+                chatbotMessages.scrollTop = chatbotMessages.scrollHeight;
+            } else if (event === 'error') {
+                failed = true;
+            }
+        });
+        
+        removeLoadingIndicator();
+        if (failed || !contentElement) {
+            addMessage("I'm having trouble understanding your request. Could you please try again?", 'bot');
+        }
+    }
+    
     /**
      * Send a message to the chatbot API
      * @param {string} message - The message to send
@@ -372,6 +458,12 @@
             // Get CSRF token from meta tag
             const csrfToken = document.querySelector('meta[name="csrf-token"]')?.getAttribute('content');
             
+            // Stream the answer where the browser can read response bodies incrementally
+            if (window.ReadableStream && window.TextDecoder) {
+                await streamMessage(message, csrfToken);
+                return;
+            }
+            
             // Regular message handling
             const response = await fetch('/api/chatbot/message', {
                 method: 'POST',
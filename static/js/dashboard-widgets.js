@@ -0,0 +1,212 @@
+/**
+ * Dashboard Widgets
+ * Fetches the dashboard widgets from /api/dashboard/<widget> in parallel
+ * and fills in the server-rendered shell as each one arrives
+ */
+
+document.addEventListener('DOMContentLoaded', function() {
+    const config = window.dashboardWidgets;
+    if (!config) {
+        return;
+    }
+
+    const renderers = {
+        stats: renderStats,
+        activities: renderActivities,
+        attendance_chart: renderAttendanceChart,
+        teaching_units: renderTeachingUnits
+    };
+
+    // Each widget renders independently, so a slow one doesn't block the rest
+    config.names.forEach(name => {
+        fetch(config.url.replace('__widget__', name), {
+            credentials: 'same-origin',
+            headers: { 'Accept': 'application/json' }
+        })
+            .then(response => response.json())
+            .then(payload => {
+                if (payload.status !== 'success') {
+                    throw new Error(payload.message);
+                }
+                renderers[name](payload.data);
+            })
+            .catch(error => {
+                console.error(`Dashboard widget ${name} failed:`, error);
+                renderUnavailable(name);
+            });
+    });
+});
+
+/**
+ * Read a dotted path such as "leave_stats.pending" from an object
+ */
+function getField(data, path) {
+    return path.split('.').reduce((value, key) => (value == null ? undefined : value[key]), data);
+}
+
+/**
+ * Replace a placeholder element's content with text
+ */
+function fillPlaceholder(element, text) {
+    element.classList.remove('placeholder', 'col-3', 'col-4', 'col-6', 'col-8', 'col-10');
+    element.textContent = text;
+}
+
+/**
+ * Fill the profile position and stat card counters
+ */
+function renderStats(data) {
+    document.querySelectorAll('[data-dashboard-field]').forEach(element => {
+        const value = getField(data, element.dataset.dashboardField);
+        if (value === undefined || value === null || value === '') {
+            fillPlaceholder(element, element.dataset.empty || '0');
+        } else {
+            fillPlaceholder(element, `${value}${element.dataset.suffix || ''}`);
+        }
+    });
+}
+
+/**
+ * Append the recent activities after the login entry
+ */
+function renderActivities(activities) {
+    const timeline = document.getElementById('dashboardActivities');
+    removePlaceholders(timeline);
+
+    activities.forEach(activity => {
+        const item = document.createElement('div');
+        item.className = 'timeline-item';
+        item.innerHTML = `
+            <i class="fas fa-circle text-primary"></i>
+            <div class="ms-3">
+                <div class="d-flex w-100 justify-content-between">
+                    <h6 class="mb-1"></h6>
+                    <small class="text-body-secondary"></small>
+                </div>
+                <p class="mb-1 text-body-secondary"></p>
+            </div>`;
+        item.querySelector('h6').textContent = activity.title;
+        item.querySelector('small').textContent = activity.time;
+        item.querySelector('p').textContent = activity.description;
+        timeline.appendChild(item);
+    });
+}
+
+/**
+ * Draw the weekly attendance trend
+ */
+function renderAttendanceChart(chartData) {
+    if (typeof Chart === 'undefined') {
+        return;
+    }
+    const ctx = document.getElementById('attendanceChart').getContext('2d');
+
+    new Chart(ctx, {
+        type: 'line',
+        data: {
+            labels: chartData.labels,
+            datasets: [{
+                label: 'Attendance Rate (%)',
+                data: chartData.attendance_rates,
+                backgroundColor: 'rgba(54, 162, 235, 0.2)',
+                borderColor: 'rgba(54, 162, 235, 1)',
+                borderWidth: 2,
+                tension: 0.3,
+                fill: true
+            }]
+        },
+        options: {
+            responsive: true,
+            maintainAspectRatio: false,
+            scales: {
+                y: {
+                    beginAtZero: true,
+                    max: 100,
+                    title: {
+                        display: true,
+                        text: 'Attendance Rate (%)'
+                    }
+                }
+            },
+            plugins: {
+                tooltip: {
+                    callbacks: {
+                        label: function(context) {
+                            return `Rate: ${context.raw}%`;
+                        }
+                    }
+                },
+                title: {
+                    display: true,
+                    text: 'Weekly Attendance Trend'
+                }
+            }
+        }
+    });
+}
+
+/**
+ * List the first three teaching units with their attendance rates
+ */
+function renderTeachingUnits(units) {
+    const list = document.getElementById('dashboardUnits');
+    list.classList.remove('placeholder-glow');
+    list.innerHTML = '';
+
+    if (!units.length) {
+        const empty = document.createElement('p');
+        empty.className = 'text-muted mb-0';
+        empty.textContent = 'No teaching units assigned.';
+        list.appendChild(empty);
+        return;
+    }
+
+    units.slice(0, 3).forEach(unit => {
+        const badgeClass = unit.attendance_rate >= 80 ? 'bg-success' : 'bg-warning';
+        const link = document.createElement('a');
+        link.href = unit.url;
+        link.className = 'list-group-item list-group-item-action px-0';
+        link.innerHTML = `
+            <div class="d-flex w-100 justify-content-between">
+                <h6 class="mb-1"></h6>
+                <span class="badge ${badgeClass}"></span>
+            </div>
+            <div class="progress" style="height: 5px">
+                <div class="progress-bar ${badgeClass}" role="progressbar"></div>
+            </div>`;
+        link.querySelector('h6').textContent = unit.title;
+        link.querySelector('.badge').textContent = `${unit.attendance_rate.toFixed(1)}%`;
+        link.querySelector('.progress-bar').style.width = `${unit.attendance_rate}%`;
+        list.appendChild(link);
+    });
+
+    if (units.length > 3) {
+        const more = document.createElement('a');
+        more.href = list.dataset.allUrl;
+        more.className = 'list-group-item list-group-item-action px-0 text-center text-primary';
+        more.textContent = `View all ${units.length} units`;
+        list.appendChild(more);
+    }
+}
+
+/**
+ * Remove loading placeholders inside a container
+ */
+function removePlaceholders(container) {
+    container.querySelectorAll('[data-widget-placeholder]').forEach(element => element.remove());
+}
+
+/**
+ * Show a widget as unavailable instead of leaving it loading
+ */
+function renderUnavailable(name) {
+    if (name === 'stats') {
+        document.querySelectorAll('[data-dashboard-field]').forEach(element => fillPlaceholder(element, '-'));
+    } else if (name === 'activities') {
+        removePlaceholders(document.getElementById('dashboardActivities'));
+    } else if (name === 'teaching_units') {
+        const list = document.getElementById('dashboardUnits');
+        list.classList.remove('placeholder-glow');
+        list.innerHTML = '<p class="text-muted mb-0">Teaching units are unavailable right now.</p>';
+    }
+}
@@ -1,23 +1,43 @@
 import os
-from supabase import create_client, Client
+import threading
 from dotenv import load_dotenv
+from werkzeug.local import LocalProxy
 
 # Ensure environment variables are loaded
 load_dotenv()
 
-# Get Supabase credentials from environment variables
-url: str = os.environ.get("SUPABASE_URL")
-# Try to get SUPABASE_KEY first, fall back to NEXT_PUBLIC_SUPABASE_ANON_KEY if not found
-key: str = os.environ.get("SUPABASE_KEY") or os.environ.get("NEXT_PUBLIC_SUPABASE_ANON_KEY")
+_supabase = None
+_supabase_lock = threading.Lock()
 
-# Validate credentials
-if not url:
-    raise ValueError("SUPABASE_URL environment variable is required")
-if not key:
-    raise ValueError("Either SUPABASE_KEY or NEXT_PUBLIC_SUPABASE_ANON_KEY environment variable is required")
+def get_supabase():
+    """
+    Get the Supabase client, creating it on first use
+    
+    The supabase SDK is only imported here, so processes that never touch
+    Supabase storage don't pay for it at startup.
+    """
+    global _supabase
+    if _supabase is None:
+        with _supabase_lock:
+            if _supabase is None:
+                from supabase import create_client
+                
+                # Get Supabase credentials from environment variables
+                url = os.environ.get("SUPABASE_URL")
+                # Try to get SUPABASE_KEY first, fall back to NEXT_PUBLIC_SUPABASE_ANON_KEY if not found
+                key = os.environ.get("SUPABASE_KEY") or os.environ.get("NEXT_PUBLIC_SUPABASE_ANON_KEY")
+                
+                # Validate credentials
+                if not url:
+                    raise ValueError("SUPABASE_URL environment variable is required")
+                if not key:
+                    raise ValueError("Either SUPABASE_KEY or NEXT_PUBLIC_SUPABASE_ANON_KEY environment variable is required")
+                
+                _supabase = create_client(url, key)
+    return _supabase
 
-# Create Supabase client
-supabase: Client = create_client(url, key)
+# Supabase client, created the first time it is used
+supabase = LocalProxy(get_supabase)
 
 # Function to get PostgreSQL connection string for SQLAlchemy
 def get_db_url():
@@ -0,0 +1,74 @@
+"""
+Test fixtures for the HR System.
+Builds the app against a temporary SQLite database; the Supabase and
+Gemini clients are created lazily and never called by the tests.
+"""
+
+import os
+import sys
+import tempfile
+
+import pytest
+
+ROOT = os.path.dirname(os.path.dirname(os.path.abspath(__file__)))
+sys.path.insert(0, ROOT)
+
+from benchmarks import configure_environment
+
+configure_environment(f"sqlite:///{os.path.join(tempfile.mkdtemp(prefix='hr_tests_'), 'test.db')}")
+# Write login audit rows inside the request instead of from a background thread
+os.environ['LOGIN_AUDIT_WRITER'] = 'sync'
+
+
+@pytest.fixture
+def app():
+    """
+    App with empty tables
+
+    No app context is left pushed: requests would reuse it, and with it
+    the logged-in user cached on g. Tests set up rows inside their own
+    `with app.app_context():` block.
+    """
+    from app import create_app
+    from models import db
+
+    app = create_app()
+    app.config.update(TESTING=True, WTF_CSRF_ENABLED=False)
+    with app.app_context():
+        db.create_all()
+    yield app
+    with app.app_context():
+        db.session.remove()
+        db.drop_all()
+
+
+@pytest.fixture
+def make_user(app):
+    """Create a user with the password 'password'; the returned object is detached"""
+    from models import db, User
+
+    def make_user(username, role='employee', department='science'):
+        with app.app_context():
+            user = User(username=username, email=f"{username}@example.com", department=department, role=role)
+            user.set_password('password')
+            db.session.add(user)
+            db.session.commit()
+            db.session.refresh(user)
+            db.session.expunge(user)
+        return user
+
+    return make_user
+
+
+@pytest.fixture
+def login_as(app):
+    """Test client logged in as a user, without going through the login form"""
+
+    def login_as(user):
+        client = app.test_client()
+        with client.session_transaction() as session:
+            session['_user_id'] = str(user.id)
+            session['_fresh'] = True
+        return client
+
+    return login_as
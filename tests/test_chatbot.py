@@ -0,0 +1,75 @@
+from datetime import date, timedelta
+
+import pytest
+
+
+def test_upcoming_trainings_answer_matches_the_prompt_count(app, make_user):
+    from models import db, TrainingProgram, TrainingEnrollment
+    from chatbot import HRChatbot
+
+    hr = make_user('hr', role='hr')
+    teacher = make_user('teacher')
+    today = date.today()
+    with app.app_context():
+        enrollments = [
+            ('Classroom Tech', 'upcoming', 'enrolled'),
+            ('Curriculum Design', 'in-progress', 'enrolled'),
+            ('First Aid', 'completed', 'enrolled'),
+            ('Safeguarding', 'upcoming', 'completed'),
+            ('Assessment Basics', 'in-progress', 'dropped'),
+        ]
+        for title, program_status, enrollment_status in enrollments:
+            program = TrainingProgram(
+                title=title, start_date=today + timedelta(days=7), end_date=today + timedelta(days=8),
+                category='technical', status=program_status, created_by=hr.id
+            )
+            db.session.add(program)
+            db.session.flush()
+            db.session.add(TrainingEnrollment(training_id=program.id, employee_id=teacher.id, status=enrollment_status))
+        db.session.commit()
+
+    chatbot = HRChatbot(genai_client=object())
+    with app.test_request_context():
+        context = chatbot.get_user_context(teacher.id)
+        answer = chatbot.answer_locally('show my upcoming trainings', teacher.id)
+
+    assert context['upcoming_trainings'] == 2
+    assert answer.startswith('You have 2 upcoming training programs')
+    assert 'Classroom Tech' in answer and 'Curriculum Design' in answer
+    for title in ('First Aid', 'Safeguarding', 'Assessment Basics'):
+        assert title not in answer
+
+
+@pytest.mark.parametrize('cached, asked', [
+    ('What documents are required to request maternity leave for teachers?',
+     'What documents are required to request paternity leave for teachers?'),
+    ('Are part time teachers eligible for health insurance benefits?',
+     'Are full time teachers eligible for health insurance benefits?'),
+    ('Is unused sick leave paid out when a teacher retires?',
+     'Is unused sick leave not paid out when a teacher retires?'),
+    ('Are substitute teachers eligible for paid holidays?',
+     "Aren't substitute teachers eligible for paid holidays?"),
+    ('How many sick days do teachers get after 10 years?',
+     'How many sick days do teachers get after 12 years?'),
+])
+def test_response_cache_misses_different_questions(cached, asked):
+    from chatbot import ResponseCache
+
+    cache = ResponseCache()
+    cache.set(cached, 'cached answer', ttl=60)
+
+    assert cache.get(asked) is None
+
+
+@pytest.mark.parametrize('cached, asked', [
+    ('How many sick days do teachers get?', 'how many sick days does a teacher get'),
+    ('What is the policy for jury duty?', 'What is the jury duty policy?'),
+    ("Isn't overtime paid for weekend events?", 'is overtime not paid for weekend events'),
+])
+def test_response_cache_hits_rewordings(cached, asked):
+    from chatbot import ResponseCache
+
+    cache = ResponseCache()
+    cache.set(cached, 'cached answer', ttl=60)
+
+    assert cache.get(asked) == 'cached answer'
@@ -0,0 +1,25 @@
+from utils.conversations import ConversationStore
+
+
+def test_database_store_persists_conversations(app):
+    with app.app_context():
+        ConversationStore(persist=True).append(1, 'How do I apply for leave?', 'Use the Leave page.')
+
+        summary, history = ConversationStore(persist=True).contents(1)
+
+    assert [turn['parts'][0]['text'] for turn in history] == ['How do I apply for leave?', 'Use the Leave page.']
+
+
+def test_database_store_falls_back_to_memory_without_its_table(app):
+    from models import db, ChatConversation
+
+    store = ConversationStore(persist=True)
+    with app.app_context():
+        ChatConversation.__table__.drop(db.engine)
+
+        store.append(1, 'How do I apply for leave?', 'Use the Leave page.')
+        summary, history = store.contents(1)
+        store.reset(2)
+
+    assert len(history) == 2
+    assert store.stats()['store'] == 'memory'
@@ -0,0 +1,23 @@
+from datetime import date
+
+
+def test_activities_feed_with_null_payroll_amounts(app, make_user, login_as):
+    from models import db, Payroll
+
+    hr = make_user('hr', role='hr')
+    employee = make_user('teacher')
+    with app.app_context():
+        db.session.add(Payroll(
+            employee_id=employee.id, period_start=date(2025, 1, 1), period_end=date(2025, 1, 31),
+            base_pay=1000.0, deductions=50.0, status='approved', created_by=hr.id
+        ))
+        db.session.commit()
+        # The column default would replace None on insert; older rows can still hold NULL
+        db.session.execute(Payroll.__table__.update().values(unit_pay=None))
+        db.session.commit()
+
+    response = login_as(employee).get('/api/dashboard/activities')
+
+    assert response.status_code == 200
+    descriptions = [activity['description'] for activity in response.get_json()['data']]
+    assert any('Net $950.00' in description for description in descriptions)
@@ -0,0 +1,110 @@
+from contextlib import contextmanager
+from datetime import datetime, timedelta
+
+import pytest
+
+
+@pytest.fixture
+def smtp(app, monkeypatch):
+    """Replace the SMTP connection; messages to bounce@ addresses are refused"""
+    app.config.update(
+        MAIL_QUEUE_RUNNER='external', MAIL_QUEUE_MAX_ATTEMPTS=3,
+        MAIL_QUEUE_RETRY_BACKOFF=30, MAIL_QUEUE_MAX_BACKOFF=3600
+    )
+
+    class Connection:
+        def __init__(self):
+            self.sent = []
+            self.down = False
+
+        def send(self, message):
+            if any(address.startswith('bounce@') for address in message.recipients):
+                raise OSError('550 mailbox unavailable')
+            self.sent.append(message.recipients)
+
+    connection = Connection()
+
+    @contextmanager
+    def connect():
+        if connection.down:
+            raise ConnectionRefusedError('SMTP server unreachable')
+        yield connection
+
+    monkeypatch.setattr(app.extensions['mail'], 'connect', connect)
+    return connection
+
+
+def _queue(app, *recipients):
+    from models import db
+    from utils.mail_queue import queue_email
+
+    with app.app_context():
+        emails = [queue_email('Leave approved', recipient, 'Your leave was approved.') for recipient in recipients]
+        db.session.commit()
+        return [email.id for email in emails]
+
+
+def _email(app, email_id):
+    from models import db, OutboundEmail
+
+    with app.app_context():
+        email = db.session.get(OutboundEmail, email_id)
+        db.session.expunge(email)
+        return email
+
+
+def _make_due(app, email_id):
+    from models import db, OutboundEmail
+
+    with app.app_context():
+        db.session.execute(
+            OutboundEmail.__table__.update().where(OutboundEmail.id == email_id)
+            .values(next_attempt_at=datetime.utcnow() - timedelta(seconds=1))
+        )
+        db.session.commit()
+
+
+def test_refused_message_backs_off_then_gives_up(app, smtp):
+    from utils.mail_queue import send_queued_mail
+
+    bounced_id, delivered_id = _queue(app, 'bounce@example.com', 'teacher@example.com')
+
+    assert send_queued_mail(app) == (1, 1)
+    assert smtp.sent == [['teacher@example.com']]
+    assert _email(app, delivered_id).status == 'sent'
+
+    for attempts, backoff in ((1, 30), (2, 60)):
+        email = _email(app, bounced_id)
+        assert (email.status, email.attempts) == ('pending', attempts)
+        assert email.last_error == '550 mailbox unavailable'
+        delay = (email.next_attempt_at - datetime.utcnow()).total_seconds()
+        assert backoff - 5 < delay <= backoff
+        # Not due again until the backoff has passed
+        assert send_queued_mail(app) == (0, 0)
+
+        _make_due(app, bounced_id)
+        assert send_queued_mail(app) == (0, 1)
+
+    email = _email(app, bounced_id)
+    assert (email.status, email.attempts) == ('failed', 3)
+    _make_due(app, bounced_id)
+    assert send_queued_mail(app) == (0, 0)
+
+
+def test_connection_failure_retries_the_whole_batch(app, smtp):
+    from utils.mail_queue import send_queued_mail
+
+    email_ids = _queue(app, 'hr@example.com', 'teacher@example.com')
+    smtp.down = True
+
+    assert send_queued_mail(app) == (0, 2)
+    for email_id in email_ids:
+        email = _email(app, email_id)
+        assert (email.status, email.attempts) == ('pending', 1)
+        assert email.last_error == 'SMTP server unreachable'
+
+    smtp.down = False
+    for email_id in email_ids:
+        _make_due(app, email_id)
+    assert send_queued_mail(app) == (2, 0)
+    assert smtp.sent == [['hr@example.com'], ['teacher@example.com']]
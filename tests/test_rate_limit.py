@@ -0,0 +1,34 @@
+from utils.rate_limit import MemoryRateLimitBackend
+
+
+def _login(app, username, password):
+    return app.test_client().post('/login', data={'username_or_email': username, 'password': password})
+
+
+def test_successful_logins_do_not_lift_the_lockout(app, make_user):
+    make_user('attacker')
+    make_user('victim')
+
+    # Log into the attacker's own account between wrong guesses
+    for _ in range(app.config['LOGIN_RATE_LIMIT_ATTEMPTS'] - 1):
+        assert _login(app, 'victim', 'wrong-guess').status_code == 200
+        assert _login(app, 'attacker', 'password').status_code == 302
+    assert _login(app, 'victim', 'wrong-guess').status_code == 200
+
+    response = _login(app, 'victim', 'password')
+    assert response.status_code == 200
+    assert b'Too many failed login attempts' in response.data
+    assert _login(app, 'attacker', 'password').status_code == 200
+
+
+def test_memory_backend_locks_for_a_window_after_the_latest_failure():
+    backend = MemoryRateLimitBackend(max_attempts=3, window_seconds=60)
+    for now in (0, 30, 50):
+        backend.consume('client', now)
+
+    # Still locked after the oldest failure leaves the window
+    remaining, retry_after = backend.peek('client', 70)
+    assert retry_after == 40
+
+    remaining, retry_after = backend.peek('client', 110)
+    assert (remaining, retry_after) == (3, 0)
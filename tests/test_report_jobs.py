@@ -0,0 +1,82 @@
+import os
+import tempfile
+from datetime import datetime, timedelta
+
+import pytest
+
+
+@pytest.fixture
+def queue_job(app, make_user, monkeypatch):
+    """Queue a job for the 'csv' kind, built by the given function; nothing runs it"""
+    from utils import report_jobs
+
+    app.config['REPORT_JOB_RUNNER'] = 'external'
+    user = make_user('hr', role='hr')
+
+    def queue_job(build):
+        def builder(params, progress):
+            handle, path = tempfile.mkstemp(suffix='.csv')
+            with os.fdopen(handle, 'w') as export:
+                export.write(build(params))
+            return path, 'export.csv', 'text/csv'
+
+        monkeypatch.setitem(report_jobs.REPORT_BUILDERS, 'csv', builder)
+        with app.test_request_context():
+            return report_jobs.enqueue_report_job('csv', {'year': 2025}, user.id).id
+
+    return queue_job
+
+
+def _job(app, job_id):
+    from models import db, ReportJob
+
+    with app.app_context():
+        job = db.session.get(ReportJob, job_id)
+        return job.status, job.message, job.error, job.artifact
+
+
+def test_pending_job_is_built_once(app, queue_job):
+    from utils.report_jobs import run_pending_jobs, run_report_job
+
+    job_id = queue_job(lambda params: f"year\n{params['year']}\n")
+
+    assert run_pending_jobs(app) == (1, 0)
+    assert _job(app, job_id) == ('completed', 'Export ready', None, b'year\n2025\n')
+    # A second worker finds the job already claimed
+    assert run_report_job(app, job_id) is None
+
+
+def test_builder_error_fails_the_job(app, queue_job):
+    from utils.report_jobs import run_pending_jobs
+
+    def build(params):
+        raise RuntimeError('no data for 2025')
+
+    job_id = queue_job(build)
+
+    assert run_pending_jobs(app) == (0, 1)
+    assert _job(app, job_id) == ('failed', 'Export failed', 'no data for 2025', None)
+
+
+def test_running_jobs_expire_after_the_timeout(app, queue_job):
+    from models import db, ReportJob
+    from utils.report_jobs import _claim_job, expire_stale_jobs
+
+    stale_id = queue_job(lambda params: '')
+    running_id = queue_job(lambda params: '')
+    with app.app_context():
+        assert _claim_job(stale_id) and _claim_job(running_id)
+        # The worker that claimed this job died ten minutes ago
+        db.session.execute(
+            ReportJob.__table__.update().where(ReportJob.id == stale_id)
+            .values(started_at=datetime.utcnow() - timedelta(minutes=10))
+        )
+        db.session.commit()
+
+        assert expire_stale_jobs(timeout=300) == 1
+        assert expire_stale_jobs(timeout=300) == 0
+
+    assert _job(app, stale_id) == (
+        'failed', 'Export timed out', 'The export did not finish within 300 seconds', None
+    )
+    assert _job(app, running_id)[0] == 'running'
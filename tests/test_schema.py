@@ -0,0 +1,18 @@
+def test_create_tables_adds_tables_missing_from_an_existing_database(app):
+    from models import db, OutboundEmail, ChatConversation
+
+    with app.app_context():
+        OutboundEmail.__table__.drop(db.engine)
+        ChatConversation.__table__.drop(db.engine)
+
+    result = app.test_cli_runner().invoke(args=['create-tables'])
+
+    assert result.exit_code == 0
+    assert 'Created 2 tables' in result.output
+    with app.app_context():
+        inspector = db.inspect(db.engine)
+        assert inspector.has_table('outbound_email') and inspector.has_table('chat_conversation')
+        assert {index['name'] for index in inspector.get_indexes('outbound_email')} == {
+            index.name for index in OutboundEmail.__table__.indexes
+        }
+    assert 'Created 0 tables' in app.test_cli_runner().invoke(args=['create-tables']).output
@@ -0,0 +1,80 @@
+import threading
+import time
+
+import pytest
+
+from utils.upstream import CircuitBreaker, CircuitOpen, UpstreamBusy, UpstreamGuard
+
+
+def _fail(timeout):
+    raise ConnectionError('503 from upstream')
+
+
+def test_breaker_opens_probes_and_closes():
+    guard = UpstreamGuard('test', failure_threshold=2, reset_timeout=0.05)
+    calls = []
+
+    for _ in range(2):
+        with pytest.raises(ConnectionError):
+            guard.call(_fail)
+    assert guard.breaker.state == CircuitBreaker.OPEN
+    with pytest.raises(CircuitOpen):
+        guard.call(calls.append)
+    assert calls == []
+
+    # After reset_timeout one probe goes through; its failure reopens the breaker
+    time.sleep(0.06)
+    with pytest.raises(ConnectionError):
+        guard.call(_fail)
+    assert guard.breaker.state == CircuitBreaker.OPEN
+
+    time.sleep(0.06)
+    assert guard.call(lambda timeout: 'ok') == 'ok'
+    stats = guard.stats()
+    assert stats['breaker']['state'] == CircuitBreaker.CLOSED
+    assert stats['breaker']['consecutive_failures'] == 0
+    assert stats['breaker']['times_opened'] == 2
+    assert stats['rejected_open'] == 1
+
+
+def test_half_open_breaker_lets_one_probe_through():
+    breaker = CircuitBreaker(failure_threshold=1, reset_timeout=0.05)
+    breaker.record_failure()
+    assert not breaker.allow()
+
+    time.sleep(0.06)
+    assert breaker.allow()
+    assert breaker.state == CircuitBreaker.HALF_OPEN
+    assert not breaker.allow()
+
+    breaker.record_success()
+    assert breaker.allow() and breaker.allow()
+
+
+def test_call_is_refused_when_no_slot_frees_in_time():
+    guard = UpstreamGuard('test', max_concurrency=1, queue_timeout=0.05)
+    started, finish = threading.Event(), threading.Event()
+
+    def slow(timeout):
+        started.set()
+        finish.wait(5)
+        return 'slow'
+
+    worker = threading.Thread(target=guard.call, args=(slow,))
+    worker.start()
+    started.wait(5)
+    try:
+        waited = time.monotonic()
+        with pytest.raises(UpstreamBusy):
+            guard.call(lambda timeout: 'fast')
+        assert 0.04 < time.monotonic() - waited < 1
+    finally:
+        finish.set()
+        worker.join(5)
+
+    assert guard.call(lambda timeout: 'fast') == 'fast'
+    stats = guard.stats()
+    assert stats['rejected_busy'] == 1
+    assert stats['peak_in_flight'] == 1
+    # Waiting for a slot is not an upstream failure
+    assert stats['breaker']['consecutive_failures'] == 0
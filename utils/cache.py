@@ -0,0 +1,287 @@
+"""
+In-process caches for the HR System.
+Keeps computed per-user data (the dashboard widgets, the logged-in user's
+identity and the chatbot's user context) in memory and drops a user's entries when a committed change
+touches rows they were built from.
+
+Entries also expire after a TTL. Each worker process has its own cache, so
+the TTL bounds how stale a page can be after a change committed by another
+process, or by a bulk UPDATE that bypasses the ORM unit of work.
+"""
+
+import time
+import logging
+from collections import OrderedDict
+from threading import Lock
+from sqlalchemy import event, inspect
+from sqlalchemy.orm import Session, make_transient_to_detached
+from sqlalchemy.orm.attributes import set_committed_value
+from models import (
+    db, User, EmployeeProfile, LeaveRequest, TeachingUnit, UnitAttendance,
+    TrainingEnrollment, TrainingProgram, Payroll
+)
+
+logger = logging.getLogger(__name__)
+
+class UserCache:
+    """
+    Bounded least-recently-used cache of per-user values, with hit/miss counters
+
+    A user can have several entries under different `part` names (e.g. one
+    per dashboard widget); invalidating the user drops all of them.
+    """
+
+    def __init__(self, name, max_entries=8192):
+        self.name = name
+        self.max_entries = max_entries
+        self._entries = OrderedDict()
+        self._parts = {}
+        self._lock = Lock()
+        # Bumped on every invalidation so a value computed before a
+        # concurrent commit is not stored afterwards
+        self._epoch = 0
+        self.hits = 0
+        self.misses = 0
+        self.invalidations = 0
+
+    def _remove(self, key):
+        del self._entries[key]
+        user_id, part = key
+        parts = self._parts.get(user_id)
+        if parts is not None:
+            parts.discard(part)
+            if not parts:
+                del self._parts[user_id]
+
+    def get(self, user_id, version=None, part=None):
+        """Return a cached value, or None when missing, expired or for another version"""
+        key = (user_id, part)
+        with self._lock:
+            entry = self._entries.get(key)
+            if entry is not None:
+                value, entry_version, expires_at = entry
+                if entry_version == version and expires_at > time.monotonic():
+                    self._entries.move_to_end(key)
+                    self.hits += 1
+                    return value
+                self._remove(key)
+            self.misses += 1
+            return None
+
+    def set(self, user_id, value, ttl, version=None, part=None, epoch=None):
+        """Store a value; skipped when an invalidation happened since `epoch` was read"""
+        if ttl <= 0:
+            return
+        key = (user_id, part)
+        with self._lock:
+            if epoch is not None and epoch != self._epoch:
+                return
+            self._entries[key] = (value, version, time.monotonic() + ttl)
+            self._entries.move_to_end(key)
+            self._parts.setdefault(user_id, set()).add(part)
+            while len(self._entries) > self.max_entries:
+                self._remove(next(iter(self._entries)))
+
+    def get_or_set(self, user_id, build, ttl, version=None, part=None):
+        """
+        Return a cached value, building and storing it on a miss
+
+        Args:
+            user_id: Owner of the entry
+            build: Callable computing the value
+            ttl: Seconds the value stays valid; 0 disables caching
+            version: Extra validity key, e.g. the current date for date-relative values
+            part: Name of the entry when a user has several
+        """
+        if ttl <= 0:
+            return build()
+        value = self.get(user_id, version, part)
+        if value is None:
+            epoch = self._epoch
+            value = build()
+            self.set(user_id, value, ttl, version=version, part=part, epoch=epoch)
+        return value
+
+    def invalidate(self, user_ids):
+        """Drop every entry of the given users"""
+        with self._lock:
+            self._epoch += 1
+            for user_id in user_ids:
+                for part in self._parts.pop(user_id, ()):
+                    if self._entries.pop((user_id, part), None) is not None:
+                        self.invalidations += 1
+
+    def clear(self):
+        """Drop every entry"""
+        with self._lock:
+            self._epoch += 1
+            self.invalidations += len(self._entries)
+            self._entries.clear()
+            self._parts.clear()
+
+    def stats(self):
+        """Current size and hit/miss counters"""
+        with self._lock:
+            lookups = self.hits + self.misses
+            return {
+                'name': self.name,
+                'entries': len(self._entries),
+                'users': len(self._parts),
+                'hits': self.hits,
+                'misses': self.misses,
+                'invalidations': self.invalidations,
+                'hit_rate': round(self.hits / lookups, 3) if lookups else None
+            }
+
+dashboard_cache = UserCache('dashboard')
+
+# Logged-in user and profile snapshots for the Flask-Login user loader
+identity_cache = UserCache('identity')
+
+# User details, leave and training summary put into the chatbot's system prompt
+chatbot_context_cache = UserCache('chatbot_context')
+
+# Marker for changes that can affect every user's entries
+ALL_USERS = object()
+
+def _column_values(obj, attribute):
+    """Current and previous values of a column, so a reassigned row invalidates both owners"""
+    history = inspect(obj).attrs[attribute].history
+    values = set(history.added) | set(history.unchanged) | set(history.deleted)
+    if not values:
+        value = getattr(obj, attribute, None)
+        values = {value}
+    return {value for value in values if value is not None}
+
+def _attendance_owners(session, obj):
+    owners = set()
+    for unit_id in _column_values(obj, 'teaching_unit_id'):
+        unit = session.get(TeachingUnit, unit_id)
+        if unit is not None:
+            owners.add(unit.employee_id)
+    return owners
+
+# Model -> callable(session, instance) returning the users whose dashboard the row feeds
+DASHBOARD_DEPENDENCIES = {
+    EmployeeProfile: lambda session, obj: _column_values(obj, 'user_id'),
+    LeaveRequest: lambda session, obj: _column_values(obj, 'employee_id'),
+    TeachingUnit: lambda session, obj: _column_values(obj, 'employee_id'),
+    TrainingEnrollment: lambda session, obj: _column_values(obj, 'employee_id'),
+    Payroll: lambda session, obj: _column_values(obj, 'employee_id'),
+    UnitAttendance: _attendance_owners,
+    # Program status drives the training counters of every enrolled user
+    TrainingProgram: lambda session, obj: ALL_USERS,
+}
+
+# Model -> callable(session, instance) returning the users whose identity snapshot the row is part of
+IDENTITY_DEPENDENCIES = {
+    User: lambda session, obj: _column_values(obj, 'id'),
+    EmployeeProfile: lambda session, obj: _column_values(obj, 'user_id'),
+}
+
+# Model -> callable(session, instance) returning the users whose chatbot context the row is part of
+CHATBOT_CONTEXT_DEPENDENCIES = {
+    User: lambda session, obj: _column_values(obj, 'id'),
+    EmployeeProfile: lambda session, obj: _column_values(obj, 'user_id'),
+    LeaveRequest: lambda session, obj: _column_values(obj, 'employee_id'),
+    TrainingEnrollment: lambda session, obj: _column_values(obj, 'employee_id'),
+    # Program status decides which enrollments count as upcoming
+    TrainingProgram: lambda session, obj: ALL_USERS,
+}
+
+# Each cache with the rows its entries are built from
+CACHE_DEPENDENCIES = [
+    (dashboard_cache, DASHBOARD_DEPENDENCIES),
+    (identity_cache, IDENTITY_DEPENDENCIES),
+    (chatbot_context_cache, CHATBOT_CONTEXT_DEPENDENCIES),
+]
+
+_PENDING_KEY = 'user_cache_pending'
+
+def _collect_changes(session, flush_context, instances):
+    """Record the users affected by the rows about to be flushed, per cache"""
+    pending = session.info.setdefault(_PENDING_KEY, {})
+    changed = [obj for obj in session.new] + [obj for obj in session.deleted] + [
+        obj for obj in session.dirty if session.is_modified(obj)
+    ]
+    for cache, dependencies in CACHE_DEPENDENCIES:
+        for obj in changed:
+            resolve = dependencies.get(type(obj))
+            if resolve is None:
+                continue
+            owners = resolve(session, obj)
+            if owners is ALL_USERS:
+                pending.setdefault(cache.name, set()).add(ALL_USERS)
+            else:
+                pending.setdefault(cache.name, set()).update(owners)
+
+def _apply_invalidations(session):
+    """Drop cached entries once the changes are committed"""
+    pending = session.info.pop(_PENDING_KEY, None)
+    if not pending:
+        return
+    for cache, _ in CACHE_DEPENDENCIES:
+        users = pending.get(cache.name)
+        if not users:
+            continue
+        if ALL_USERS in users:
+            cache.clear()
+        else:
+            cache.invalidate(users)
+        logger.debug("Invalidated %s cache for %s", cache.name, 'all users' if ALL_USERS in users else sorted(users))
+
+def _discard_invalidations(session):
+    """Rolled back changes leave the cache valid"""
+    session.info.pop(_PENDING_KEY, None)
+
+def register_cache_invalidation():
+    """Listen for ORM commits so cached entries follow the data"""
+    if event.contains(Session, 'before_flush', _collect_changes):
+        return
+    event.listen(Session, 'before_flush', _collect_changes)
+    event.listen(Session, 'after_commit', _apply_invalidations)
+    event.listen(Session, 'after_rollback', _discard_invalidations)
+
+def _snapshot(obj):
+    """Column values of a loaded row"""
+    return {attr.key: getattr(obj, attr.key) for attr in inspect(type(obj)).column_attrs}
+
+def _restore(model, values):
+    """Attach a row rebuilt from a snapshot to the current session without a query"""
+    obj = inspect(model).class_manager.new_instance()
+    for key, value in values.items():
+        set_committed_value(obj, key, value)
+    make_transient_to_detached(obj)
+    return db.session.merge(obj, load=False)
+
+def _load_identity(user_id):
+    user = db.session.query(User).options(db.joinedload(User.profile)).filter(User.id == user_id).first()
+    if user is None:
+        return None
+    return {
+        'user': _snapshot(user),
+        'profile': _snapshot(user.profile) if user.profile is not None else None
+    }
+
+def load_cached_user(user_id, ttl):
+    """
+    Load the logged-in user with their profile, from the identity cache when possible
+
+    On a hit the user and profile are rebuilt from column values and merged
+    into the request's session, so no query runs and both behave like
+    normally loaded rows, including lazy loads of other relationships.
+
+    Returns:
+        User: The user, or None if it doesn't exist
+    """
+    if ttl <= 0:
+        return db.session.get(User, user_id)
+
+    identity = identity_cache.get_or_set(user_id, lambda: _load_identity(user_id), ttl)
+    if identity is None:
+        return None
+
+    user = _restore(User, identity['user'])
+    profile = _restore(EmployeeProfile, identity['profile']) if identity['profile'] else None
+    set_committed_value(user, 'profile', profile)
+    return user
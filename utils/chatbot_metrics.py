@@ -0,0 +1,182 @@
+"""
+Chatbot call metrics for the HR System.
+Records one sample per chatbot message - where the answer came from, how
+big the prompt sent to Gemini was (system prompt and user context, history
+turns), how big the answer was and how long the upstream call took - in a
+ring buffer of the most recent messages. The samples and their aggregates
+are served as JSON to admins, to size the history trimming and the
+context added to the prompt from real traffic.
+
+Token counts are the ones Gemini reports in usage_metadata when present,
+otherwise estimated from the text length.
+"""
+
+import time
+import threading
+from collections import deque, Counter
+from datetime import datetime
+from utils.conversations import estimate_tokens
+
+# Answer sources
+LOCAL = 'local'    # Answered from the database by the intent router
+CACHE = 'cache'    # Shared answer from the response cache
+MODEL = 'model'    # Gemini call
+
+def _text_chars(content):
+    return sum(len(part.get('text') or '') for part in content.get('parts', []))
+
+def prompt_size(contents):
+    """
+    Size of the Gemini contents built for one message
+
+    Args:
+        contents: System prompt, history turns and the new message, as
+            returned by HRChatbot.build_contents()
+
+    Returns:
+        dict: system_chars, history_turns, history_chars, message_chars
+        and prompt_chars
+    """
+    system, history, message = contents[0], contents[1:-1], contents[-1]
+    size = {
+        'system_chars': _text_chars(system),
+        'history_turns': len(history),
+        'history_chars': sum(_text_chars(turn) for turn in history),
+        'message_chars': _text_chars(message)
+    }
+    size['prompt_chars'] = size['system_chars'] + size['history_chars'] + size['message_chars']
+    return size
+
+def usage_tokens(response):
+    """Token counts Gemini reported for a response (or the last chunk of a stream), if any"""
+    usage = getattr(response, 'usage_metadata', None)
+    prompt_tokens = getattr(usage, 'prompt_token_count', None)
+    response_tokens = getattr(usage, 'candidates_token_count', None)
+    tokens = {}
+    if isinstance(prompt_tokens, int):
+        tokens['prompt_tokens'] = prompt_tokens
+    if isinstance(response_tokens, int):
+        tokens['response_tokens'] = response_tokens
+    return tokens
+
+def _percentile(values, fraction):
+    return values[min(int(len(values) * fraction), len(values) - 1)]
+
+class ChatbotMetrics:
+    """Ring buffer of per-message chatbot samples"""
+
+    # Numeric sample fields summarised by stats()
+    SUMMARY_FIELDS = (
+        'prompt_chars', 'prompt_tokens', 'system_chars', 'history_turns', 'history_chars',
+        'response_chars', 'response_tokens', 'first_chunk_ms', 'upstream_ms', 'total_ms'
+    )
+
+    def __init__(self, max_samples=500):
+        self._lock = threading.Lock()
+        self._samples = deque(maxlen=max_samples)
+        self.configure(max_samples)
+        self.reset()
+
+    def configure(self, max_samples=500):
+        """Resize the buffer, keeping the newest samples"""
+        with self._lock:
+            self.max_samples = max_samples
+            self._samples = deque(self._samples, maxlen=max_samples)
+
+    def reset(self):
+        with self._lock:
+            self._samples.clear()
+            self.recorded = 0
+
+    def record(self, source, started, stream=False, response_text=None, error=None, **fields):
+        """
+        Add the sample for one message
+
+        Args:
+            source: LOCAL, CACHE or MODEL
+            started: time.perf_counter() when the message arrived
+            stream: True for messages answered over the streaming endpoint
+            response_text: The answer, None when the message failed
+            error: Exception class name, or 'aborted' for a stream the
+                client stopped reading
+            fields: Prompt size, token counts and upstream timings
+        """
+        sample = {
+            'at': datetime.utcnow().isoformat(timespec='seconds'),
+            'source': source,
+            'stream': stream,
+            'status': 'error' if error else 'success',
+            'error': error
+        }
+        sample.update(fields)
+        if response_text is not None:
+            sample['response_chars'] = len(response_text)
+        if source == MODEL:
+            # Fall back to estimates where Gemini reported no usage
+            sample['tokens_estimated'] = 'prompt_tokens' not in sample
+            if 'prompt_chars' in sample:
+                sample.setdefault('prompt_tokens', sample['prompt_chars'] // 4 + 1)
+            if response_text is not None:
+                sample.setdefault('response_tokens', estimate_tokens(response_text))
+        sample['total_ms'] = round((time.perf_counter() - started) * 1000, 1)
+
+        with self._lock:
+            self._samples.append(sample)
+            self.recorded += 1
+
+    def recent(self, limit=None):
+        """The newest samples first"""
+        with self._lock:
+            samples = list(self._samples)
+        samples.reverse()
+        return samples[:limit] if limit else samples
+
+    def stats(self):
+        """
+        Aggregates over the samples in the buffer
+
+        Returns:
+            dict: Message counts by source and status, the response cache
+            hit rate among messages that needed an answer from Gemini or
+            the cache, and count/mean/p50/p95/max of each SUMMARY_FIELDS
+            value per source
+        """
+        samples = self.recent()
+        sources = Counter(sample['source'] for sample in samples)
+        hit_candidates = sources[CACHE] + sources[MODEL]
+
+        by_source = {}
+        for source in (LOCAL, CACHE, MODEL):
+            fields = {}
+            for field in self.SUMMARY_FIELDS:
+                values = sorted(
+                    sample[field] for sample in samples
+                    if sample['source'] == source and sample.get(field) is not None
+                )
+                if values:
+                    fields[field] = {
+                        'count': len(values),
+                        'mean': round(sum(values) / len(values), 1),
+                        'p50': _percentile(values, 0.5),
+                        'p95': _percentile(values, 0.95),
+                        'max': values[-1]
+                    }
+            by_source[source] = fields
+
+        return {
+            'max_samples': self.max_samples,
+            'samples': len(samples),
+            'recorded': self.recorded,
+            'by_source': dict(sources),
+            'errors': sum(1 for sample in samples if sample['status'] == 'error'),
+            'streamed': sum(1 for sample in samples if sample['stream']),
+            'response_cache_hit_rate': round(sources[CACHE] / hit_candidates, 3) if hit_candidates else None,
+            'summary': by_source
+        }
+
+# Shared by every request; reconfigured from the app config at startup
+chatbot_metrics = ChatbotMetrics()
+
+def init_chatbot_metrics(app):
+    """Apply the CHATBOT_METRICS_SAMPLES buffer size"""
+    chatbot_metrics.configure(max_samples=app.config['CHATBOT_METRICS_SAMPLES'])
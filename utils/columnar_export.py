@@ -0,0 +1,106 @@
+"""
+Columnar (Parquet / Arrow IPC) export helpers for the HR System.
+Converts streamed query rows into typed Arrow record batches and writes
+one row group per batch, so dates, floats and integers keep their types
+and memory stays bounded by the batch size.
+
+pyarrow is optional: it is imported on first use and callers fall back to
+CSV when it is not installed.
+"""
+
+import tempfile
+
+COLUMNAR_FORMATS = {
+    'parquet': {'suffix': '.parquet', 'mimetype': 'application/vnd.apache.parquet'},
+    'arrow': {'suffix': '.arrow', 'mimetype': 'application/vnd.apache.arrow.file'},
+}
+
+# Rows per Arrow record batch / Parquet row group
+DEFAULT_BATCH_SIZE = 10000
+
+
+def is_columnar_format(export_format):
+    """Check whether an export format is handled by this module"""
+    return export_format in COLUMNAR_FORMATS
+
+
+def _arrow_schema(pa, columns):
+    """Build an Arrow schema from (name, type) column definitions"""
+    types = {
+        'int': pa.int64(),
+        'float': pa.float64(),
+        'string': pa.string(),
+        'bool': pa.bool_(),
+        'date': pa.date32(),
+        'timestamp': pa.timestamp('us'),
+    }
+    return pa.schema([(name, types[column_type]) for name, column_type in columns])
+
+
+def write_columnar(rows, columns, export_format='parquet', batch_size=DEFAULT_BATCH_SIZE, progress=None):
+    """
+    Write rows to a temporary Parquet or Arrow IPC file
+
+    Args:
+        rows: Iterable of tuples in the same order as columns
+        columns: List of (name, type) pairs; type is one of
+                 int, float, string, bool, date, timestamp
+        export_format: 'parquet' or 'arrow'
+        batch_size: Rows per record batch / row group
+        progress: Optional callback receiving the number of rows written
+
+    Returns:
+        tuple: (path, row_count)
+    """
+    # Imported here so the app starts without pyarrow installed
+    import pyarrow as pa
+
+    schema = _arrow_schema(pa, columns)
+    options = COLUMNAR_FORMATS[export_format]
+
+    with tempfile.NamedTemporaryFile(suffix=options['suffix'], delete=False) as temp_file:
+        path = temp_file.name
+
+    if export_format == 'parquet':
+        import pyarrow.parquet as pq
+        writer = pq.ParquetWriter(path, schema, compression='snappy')
+    else:
+        writer = pa.ipc.new_file(path, schema)
+
+    row_count = 0
+    column_count = len(columns)
+
+    def flush(buffers):
+        batch = pa.record_batch(
+            [pa.array(values, type=field.type) for values, field in zip(buffers, schema)],
+            schema=schema
+        )
+        if export_format == 'parquet':
+            writer.write_table(pa.Table.from_batches([batch]), row_group_size=batch_size)
+        else:
+            writer.write_batch(batch)
+
+    try:
+        buffers = [[] for _ in range(column_count)]
+        buffered = 0
+
+        for row in rows:
+            for index in range(column_count):
+                buffers[index].append(row[index])
+            buffered += 1
+
+            if buffered >= batch_size:
+                flush(buffers)
+                row_count += buffered
+                buffers = [[] for _ in range(column_count)]
+                buffered = 0
+                if progress:
+                    progress(row_count)
+
+        if buffered or row_count == 0:
+            flush(buffers)
+            row_count += buffered
+    finally:
+        writer.close()
+
+    return path, row_count
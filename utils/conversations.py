@@ -0,0 +1,233 @@
+"""
+Chatbot conversation store for the HR System.
+Keeps each user's recent chatbot turns within a turn and token budget,
+folding older turns into a short rolling summary so the history sent to
+Gemini on every message stays bounded. Only the most recently active
+conversations are held in memory.
+
+With the 'database' store the compacted history (summary plus recent
+turns) is also written to the chat_conversation table, so conversations
+survive restarts and serverless cold starts. Until that table has been
+created (`flask create-tables`) the store keeps conversations in memory.
+"""
+
+import json
+import logging
+import threading
+from collections import OrderedDict
+from datetime import datetime
+from sqlalchemy.exc import IntegrityError
+from models import db, ChatConversation
+
+logger = logging.getLogger(__name__)
+
+# Longest excerpt of one trimmed message kept in the summary
+SUMMARY_EXCERPT_CHARS = 200
+
+def estimate_tokens(text):
+    """Rough token count (about four characters per token)"""
+    return len(text) // 4 + 1 if text else 0
+
+class Conversation:
+    """Recent turns as {'role', 'text'} dicts plus a summary of older ones"""
+
+    __slots__ = ('turns', 'summary')
+
+    def __init__(self, turns=None, summary=None):
+        self.turns = list(turns or [])
+        self.summary = summary or ''
+
+    def tokens(self):
+        return sum(estimate_tokens(turn['text']) for turn in self.turns) + estimate_tokens(self.summary)
+
+class ConversationStore:
+    """
+    Bounded per-user chatbot history
+
+    Each conversation keeps at most max_turns exchanges (a user message and
+    its reply) and token_budget tokens of turns; older exchanges are folded
+    into a summary capped at summary_tokens. At most max_conversations
+    conversations stay in memory, least recently used first out.
+    """
+
+    def __init__(self, max_conversations=1000, max_turns=6, token_budget=1500, summary_tokens=300, persist=False):
+        self._lock = threading.Lock()
+        self._conversations = OrderedDict()
+        self.configure(max_conversations, max_turns, token_budget, summary_tokens, persist)
+        self.evictions = 0
+        self.trimmed_turns = 0
+
+    def configure(self, max_conversations=1000, max_turns=6, token_budget=1500, summary_tokens=300, persist=False):
+        """Replace the limits; conversations already held are trimmed on their next turn"""
+        self.max_conversations = max_conversations
+        self.max_turns = max_turns
+        self.token_budget = token_budget
+        self.summary_tokens = summary_tokens
+        self.persist = persist
+        self._table_checked = False
+
+    def _persisting(self):
+        """
+        True if conversations are written to the database
+
+        Falls back to memory for the life of the process when the
+        chat_conversation table doesn't exist, so a deployment that hasn't
+        created it yet keeps answering.
+        """
+        if self.persist and not self._table_checked:
+            self._table_checked = True
+            if not db.inspect(db.engine).has_table(ChatConversation.__tablename__):
+                logger.warning("The chat_conversation table is missing; keeping chatbot history in memory. "
+                               "Run `flask create-tables` to create it.")
+                self.persist = False
+        return self.persist
+
+    def _load(self, user_id):
+        """Persisted conversation for a user, or None"""
+        if not self._persisting():
+            return None
+        row = db.session.get(ChatConversation, user_id)
+        if row is None:
+            return None
+        try:
+            turns = json.loads(row.turns or '[]')
+        except ValueError:
+            turns = []
+        return Conversation(turns, row.summary)
+
+    def _save(self, user_id, conversation):
+        """Write the compacted conversation outside the request's session"""
+        if not self._persisting():
+            return
+        table = ChatConversation.__table__
+        values = {
+            'summary': conversation.summary or None,
+            'turns': json.dumps(conversation.turns),
+            'updated_at': datetime.utcnow()
+        }
+        try:
+            # Retry once as an update if another instance inserted the row first
+            for _ in range(2):
+                try:
+                    with db.engine.begin() as connection:
+                        updated = connection.execute(
+                            table.update().where(table.c.user_id == user_id).values(**values)
+                        ).rowcount
+                        if not updated:
+                            connection.execute(table.insert().values(user_id=user_id, **values))
+                    return
+                except IntegrityError:
+                    continue
+        except Exception:
+            logger.exception("Failed to save chatbot conversation for user %s", user_id)
+
+    def get(self, user_id):
+        """The user's conversation, loading it from the database on a miss"""
+        with self._lock:
+            conversation = self._conversations.get(user_id)
+            if conversation is not None:
+                self._conversations.move_to_end(user_id)
+                return conversation
+
+        conversation = self._load(user_id) or Conversation()
+        with self._lock:
+            # Keep whichever copy another request stored meanwhile
+            conversation = self._conversations.setdefault(user_id, conversation)
+            self._conversations.move_to_end(user_id)
+            while len(self._conversations) > self.max_conversations:
+                self._conversations.popitem(last=False)
+                self.evictions += 1
+        return conversation
+
+    def contents(self, user_id):
+        """
+        History for the next request
+
+        Returns:
+            tuple: (summary text, list of Gemini content dicts)
+        """
+        conversation = self.get(user_id)
+        with self._lock:
+            turns = list(conversation.turns)
+            summary = conversation.summary
+        return summary, [{"role": turn['role'], "parts": [{"text": turn['text']}]} for turn in turns]
+
+    def append(self, user_id, user_text, model_text):
+        """Add one exchange, trim the conversation to its budget and persist it"""
+        conversation = self.get(user_id)
+        with self._lock:
+            conversation.turns.append({'role': 'user', 'text': user_text})
+            conversation.turns.append({'role': 'model', 'text': model_text})
+            self._trim(conversation)
+            snapshot = Conversation(conversation.turns, conversation.summary)
+        self._save(user_id, snapshot)
+
+    def _trim(self, conversation):
+        """Fold the oldest exchanges into the summary until the turns fit"""
+        dropped = []
+        turns = conversation.turns
+        # Always keep the latest exchange, even if it alone is over budget
+        while len(turns) > 2 and (
+            len(turns) > self.max_turns * 2
+            or sum(estimate_tokens(turn['text']) for turn in turns) > self.token_budget
+        ):
+            dropped.extend(turns[:2])
+            del turns[:2]
+        if dropped:
+            self.trimmed_turns += len(dropped)
+            conversation.summary = self._summarize(conversation.summary, dropped)
+
+    def _summarize(self, summary, dropped):
+        """Append excerpts of the dropped turns, keeping the newest summary_tokens"""
+        lines = [summary] if summary else []
+        for turn in dropped:
+            speaker = 'User' if turn['role'] == 'user' else 'Assistant'
+            text = ' '.join(turn['text'].split())
+            if len(text) > SUMMARY_EXCERPT_CHARS:
+                text = text[:SUMMARY_EXCERPT_CHARS].rsplit(' ', 1)[0] + '...'
+            lines.append(f"{speaker}: {text}")
+        summary = '\n'.join(lines)
+
+        max_chars = self.summary_tokens * 4
+        if len(summary) > max_chars:
+            summary = summary[-max_chars:]
+            # Start on a whole line
+            summary = summary.split('\n', 1)[1] if '\n' in summary else summary
+        return summary
+
+    def reset(self, user_id):
+        """Forget a user's conversation in memory and in the database"""
+        with self._lock:
+            self._conversations.pop(user_id, None)
+        if self._persisting():
+            table = ChatConversation.__table__
+            with db.engine.begin() as connection:
+                connection.execute(table.delete().where(table.c.user_id == user_id))
+
+    def stats(self):
+        """Memory use and trimming counters"""
+        with self._lock:
+            return {
+                'store': 'database' if self.persist else 'memory',
+                'conversations': len(self._conversations),
+                'max_conversations': self.max_conversations,
+                'max_turns': self.max_turns,
+                'token_budget': self.token_budget,
+                'summary_tokens': self.summary_tokens,
+                'held_tokens': sum(conversation.tokens() for conversation in self._conversations.values()),
+                'evictions': self.evictions,
+                'trimmed_turns': self.trimmed_turns
+            }
+
+# Shared by every request; reconfigured from the app config at startup
+conversation_store = ConversationStore()
+
+def init_conversation_store(app):
+    """Apply the CHATBOT_HISTORY_* settings"""
+    conversation_store.configure(
+        max_conversations=app.config['CHATBOT_HISTORY_CONVERSATIONS'],
+        max_turns=app.config['CHATBOT_HISTORY_TURNS'],
+        token_budget=app.config['CHATBOT_HISTORY_TOKENS'],
+        summary_tokens=app.config['CHATBOT_SUMMARY_TOKENS'],
+        persist=app.config['CHATBOT_HISTORY_STORE'] == 'database'
+    )
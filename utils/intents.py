@@ -0,0 +1,146 @@
+"""
+Chatbot intent routing for the HR System.
+Recognises questions about the user's own HR data ("how many pending leaves
+do I have") so the chatbot can answer them from the database instead of
+calling Gemini. Messages are matched against example phrasings by word and
+word-pair overlap (an F-score) after normalising plurals and common synonyms; each
+intent also needs its topic words and a reference to the user. Anything
+below the score threshold, or asking how or why, falls through to the model.
+"""
+
+import re
+
+# Words that carry no intent on their own
+STOPWORDS = {
+    'a', 'an', 'the', 'i', 'me', 'my', 'mine', 'am', 'is', 'are', 'was', 'were', 'be', 'do', 'does', 'did',
+    'have', 'has', 'had', 'any', 'of', 'in', 'on', 'for', 'to', 'what', 'which', 'how', 'please', 'can',
+    'you', 'show', 'tell', 'list', 'give', 'see', 'about', 'currently', 'right', 'now', 'there', 'all',
+    'get', 'got', 'still', 'yet'
+}
+
+# Word -> canonical form, so paraphrases share n-grams
+SYNONYMS = {
+    'vacation': 'leave', 'holiday': 'leave', 'absence': 'leave', 'timeoff': 'leave',
+    'course': 'training', 'workshop': 'training', 'development': 'training',
+    'enroll': 'enrolled', 'registered': 'enrolled', 'signed': 'enrolled',
+    'awaiting': 'pending', 'waiting': 'pending', 'outstanding': 'pending', 'open': 'pending',
+    'approve': 'approved', 'accepted': 'approved', 'rejected': 'denied', 'declined': 'denied',
+    'history': 'recent', 'past': 'recent', 'latest': 'recent', 'count': 'many', 'number': 'many'
+}
+
+# The message must refer to the user for a personal data answer
+PERSONAL = re.compile(r"\b(i|i'm|me|my|mine)\b")
+
+# Questions about procedures or policy go to the model even when they mention a topic
+OPEN_QUESTION = re.compile(r"\b(how (do|can|should|would|to)|why|policy|policies|process for|apply|submit|cancel)\b")
+
+# intent -> (topic pattern the message must match, example phrasings)
+INTENTS = {
+    'pending_leaves': (
+        re.compile(r"\b(leaves?|vacations?|holidays?|time off)\b.*\b(pending|awaiting|waiting|outstanding|open)\b"
+                   r"|\b(pending|awaiting|waiting|outstanding|open)\b.*\b(leaves?|vacations?|holidays?|time off)\b"),
+        [
+            "how many pending leaves do I have",
+            "show my pending leave requests",
+            "do I have any pending leave requests",
+            "which of my leave requests are still pending",
+            "leave requests awaiting approval",
+        ]
+    ),
+    'upcoming_trainings': (
+        re.compile(r"\b(train\w*|courses?|workshops?|professional development)\b"),
+        [
+            "what trainings am I enrolled in",
+            "show my upcoming trainings",
+            "my trainings",
+            "my training programs",
+            "which courses am I registered for",
+            "what professional development am I signed up for",
+            "when is my next training session",
+        ]
+    ),
+    'leave_details': (
+        re.compile(r"\b(leaves?|vacations?|holidays?|time off)\b"),
+        [
+            "show my leave details",
+            "what is the status of my leave requests",
+            "was my leave approved",
+            "was my leave request denied",
+            "show my recent leave requests",
+            "my leave history",
+        ]
+    ),
+}
+
+def singular(word):
+    """Crude singular form ("policies" -> "policy", "days" -> "day")"""
+    if len(word) > 4 and word.endswith('ies'):
+        return word[:-3] + 'y'
+    if len(word) > 3 and word.endswith('s') and not word.endswith('ss'):
+        return word[:-1]
+    return word
+
+def _normalize(word):
+    word = singular(word.replace("'", ''))
+    return SYNONYMS.get(word, word)
+
+def _features(text):
+    """Content words and adjacent word pairs of a message"""
+    text = text.lower().replace('time off', 'timeoff')
+    words = [_normalize(word) for word in re.findall(r"[a-z']+", text)]
+    words = [word for word in words if word not in STOPWORDS]
+    return set(words) | {f"{first} {second}" for first, second in zip(words, words[1:])}
+
+def _similarity(message_features, example_features):
+    """
+    F-score of the features shared by a message and an example, word pairs counting double
+
+    Balances how much of the example the message covers against how much
+    of the message the example explains, so a short example doesn't match
+    every long message that happens to contain its one word.
+    """
+    weight = lambda features: sum(2 if ' ' in feature else 1 for feature in features)
+    shared = weight(example_features & message_features)
+    if not shared:
+        return 0.0
+    recall = shared / weight(example_features)
+    precision = shared / weight(message_features)
+    return 2 * precision * recall / (precision + recall)
+
+class IntentRouter:
+    """Scores messages against the INTENTS examples"""
+
+    def __init__(self, intents=INTENTS, threshold=0.5):
+        self.threshold = threshold
+        self.intents = {
+            name: (pattern, [_features(example) for example in examples])
+            for name, (pattern, examples) in intents.items()
+        }
+
+    def score(self, message):
+        """
+        Score every intent whose topic the message mentions
+
+        Returns:
+            dict: {intent: best example similarity between 0 and 1}
+        """
+        text = message.lower()
+        features = _features(message)
+        return {
+            name: max(_similarity(features, example) for example in examples)
+            for name, (pattern, examples) in self.intents.items()
+            if pattern.search(text)
+        }
+
+    def classify(self, message):
+        """The best matching intent name, or None to leave the message to the model"""
+        text = message.lower()
+        if len(text) > 200 or not PERSONAL.search(text) or OPEN_QUESTION.search(text):
+            return None
+        scores = self.score(message)
+        if not scores:
+            return None
+        name = max(scores, key=scores.get)
+        return name if scores[name] >= self.threshold else None
+
+intent_router = IntentRouter()
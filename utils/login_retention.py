@@ -0,0 +1,99 @@
+"""
+Login attempt retention for the HR System.
+Rolls login_attempt rows older than the retention period into per-IP daily
+totals in login_attempt_daily and deletes the raw rows in batches, so the
+table read by the admin page and the rate limit lookups stays small.
+"""
+
+import logging
+from datetime import datetime, timedelta
+from models import db, LoginAttempt, LoginAttemptDaily
+
+logger = logging.getLogger(__name__)
+
+def _summarize(rows):
+    """Group raw attempts into {(ip_address, day): totals}"""
+    totals = {}
+    for row in rows:
+        key = (row.ip_address, row.timestamp.date())
+        total = totals.get(key)
+        if total is None:
+            total = totals[key] = {
+                'attempts': 0, 'failures': 0,
+                'first_seen': row.timestamp, 'last_seen': row.timestamp
+            }
+        total['attempts'] += 1
+        if not row.success:
+            total['failures'] += 1
+        total['first_seen'] = min(total['first_seen'], row.timestamp)
+        total['last_seen'] = max(total['last_seen'], row.timestamp)
+    return totals
+
+def _merge_summaries(totals):
+    """Add batch totals to the existing daily rows, creating missing ones"""
+    days = {day for _, day in totals}
+    ips = {ip_address for ip_address, _ in totals}
+    existing = {
+        (summary.ip_address, summary.day): summary
+        for summary in LoginAttemptDaily.query.filter(
+            LoginAttemptDaily.day.in_(days),
+            LoginAttemptDaily.ip_address.in_(ips)
+        )
+    }
+    for key, total in totals.items():
+        summary = existing.get(key)
+        if summary is None:
+            db.session.add(LoginAttemptDaily(ip_address=key[0], day=key[1], **total))
+            continue
+        summary.attempts += total['attempts']
+        summary.failures += total['failures']
+        summary.first_seen = min(summary.first_seen or total['first_seen'], total['first_seen'])
+        summary.last_seen = max(summary.last_seen or total['last_seen'], total['last_seen'])
+
+def compact_login_attempts(older_than_days=90, batch_size=5000, max_batches=None):
+    """
+    Summarize and delete login attempts older than the retention period
+
+    Each batch is summarized, merged and deleted in its own transaction, so
+    the job can be stopped and resumed without double counting.
+
+    Args:
+        older_than_days: Keep raw attempts from this many days back
+        batch_size: Raw rows handled per transaction
+        max_batches: Stop after this many batches (None for all)
+
+    Returns:
+        tuple: (rows_deleted, batches)
+    """
+    # Cut on a day boundary so a day's totals are never split across runs
+    cutoff = datetime.combine(datetime.utcnow().date() - timedelta(days=older_than_days), datetime.min.time())
+
+    deleted = 0
+    batches = 0
+    while max_batches is None or batches < max_batches:
+        rows = db.session.query(
+            LoginAttempt.id,
+            LoginAttempt.ip_address,
+            LoginAttempt.success,
+            LoginAttempt.timestamp
+        ).filter(
+            LoginAttempt.timestamp < cutoff
+        ).order_by(LoginAttempt.timestamp).limit(batch_size).all()
+        if not rows:
+            break
+
+        try:
+            _merge_summaries(_summarize(rows))
+            LoginAttempt.query.filter(
+                LoginAttempt.id.in_([row.id for row in rows])
+            ).delete(synchronize_session=False)
+            db.session.commit()
+        except Exception:
+            db.session.rollback()
+            logger.exception("Login attempt compaction failed after %d rows", deleted)
+            raise
+
+        deleted += len(rows)
+        batches += 1
+
+    return deleted, batches
@@ -0,0 +1,231 @@
+"""
+Outbound mail queue for the HR System.
+Requests add rows to the outbound_email table in their own transaction and
+never talk to the SMTP server; a worker drains the queue over one SMTP
+connection per batch, retrying failed messages with exponential backoff.
+
+The worker runs on an in-process thread after each commit that queued mail
+(MAIL_QUEUE_RUNNER='thread') or from `flask send-queued-mail`, e.g. a cron
+job on serverless deployments (MAIL_QUEUE_RUNNER='external').
+"""
+
+import logging
+import threading
+from concurrent.futures import ThreadPoolExecutor
+from datetime import datetime, timedelta
+from flask import current_app, has_app_context
+from flask_mail import Message
+from sqlalchemy import event
+from sqlalchemy.orm import Session
+from models import db, OutboundEmail
+
+logger = logging.getLogger(__name__)
+
+_executor = None
+_executor_lock = threading.Lock()
+_retry_timer = None
+
+def queue_email(subject, recipients, body, html=None, kind=None):
+    """
+    Add a message to the outbound queue in the current transaction
+
+    The message is only sent once the caller commits, so a rolled back
+    change never sends its notification. With the thread runner the worker
+    is woken after that commit.
+
+    Returns:
+        OutboundEmail: The queued message
+    """
+    if isinstance(recipients, str):
+        recipients = [recipients]
+
+    email = OutboundEmail(
+        kind=kind,
+        recipients=','.join(recipients),
+        subject=subject,
+        body=body,
+        html=html
+    )
+    db.session.add(email)
+
+    # Picked up by _wake_after_commit
+    db.session.info['mail_queued'] = True
+
+    return email
+
+def _wake_after_commit(session):
+    """Start the worker once a transaction that queued mail is committed"""
+    if session.info.pop('mail_queued', False) and has_app_context():
+        app = current_app._get_current_object()
+        if app.config.get('MAIL_QUEUE_RUNNER', 'thread') == 'thread':
+            wake_mail_worker(app)
+
+def _forget_after_rollback(session):
+    session.info.pop('mail_queued', None)
+
+def init_mail_queue(app):
+    """Wake the worker after commits that queued mail"""
+    if event.contains(Session, 'after_commit', _wake_after_commit):
+        return
+    event.listen(Session, 'after_commit', _wake_after_commit)
+    event.listen(Session, 'after_rollback', _forget_after_rollback)
+
+def _get_executor():
+    """Single worker thread, so batches never race each other for rows"""
+    global _executor
+    with _executor_lock:
+        if _executor is None:
+            _executor = ThreadPoolExecutor(max_workers=1, thread_name_prefix='mail-queue')
+        return _executor
+
+def wake_mail_worker(app, delay=None):
+    """Drain the queue on the worker thread, now or after `delay` seconds"""
+    global _retry_timer
+    if delay is None:
+        _get_executor().submit(_drain_on_worker, app)
+        return
+    with _executor_lock:
+        if _retry_timer is not None:
+            _retry_timer.cancel()
+        _retry_timer = threading.Timer(delay, lambda: _get_executor().submit(_drain_on_worker, app))
+        _retry_timer.daemon = True
+        _retry_timer.start()
+
+def _drain_on_worker(app):
+    try:
+        send_queued_mail(app)
+    except Exception:
+        logger.exception("Mail queue worker failed")
+        return
+
+    # Come back for messages waiting out a retry backoff
+    with app.app_context():
+        next_attempt = db.session.query(db.func.min(OutboundEmail.next_attempt_at)).filter(
+            OutboundEmail.status == 'pending'
+        ).scalar()
+        db.session.remove()
+    if next_attempt is not None:
+        wake_mail_worker(app, delay=max((next_attempt - datetime.utcnow()).total_seconds(), 1))
+
+def _backoff(app, attempts):
+    """Delay before retry number `attempts`, doubling up to MAIL_QUEUE_MAX_BACKOFF"""
+    base = app.config.get('MAIL_QUEUE_RETRY_BACKOFF', 30)
+    return timedelta(seconds=min(base * 2 ** (attempts - 1), app.config.get('MAIL_QUEUE_MAX_BACKOFF', 3600)))
+
+def _claim_batch(app, limit):
+    """
+    Mark up to `limit` due messages as sending and return their ids
+
+    Messages stuck in sending past their claim (a worker died mid-batch)
+    are due again.
+    """
+    now = datetime.utcnow()
+    lease_until = now + timedelta(seconds=app.config.get('MAIL_QUEUE_CLAIM_SECONDS', 600))
+    table = OutboundEmail.__table__
+
+    with db.engine.begin() as connection:
+        ids = [row.id for row in connection.execute(
+            db.select(table.c.id).where(
+                table.c.status.in_(['pending', 'sending']),
+                table.c.next_attempt_at <= now
+            ).order_by(table.c.next_attempt_at, table.c.id).limit(limit)
+        )]
+        if not ids:
+            return []
+        connection.execute(
+            table.update().where(
+                table.c.id.in_(ids),
+                table.c.status.in_(['pending', 'sending']),
+                table.c.next_attempt_at <= now
+            ).values(status='sending', next_attempt_at=lease_until)
+        )
+        # Only rows carrying this claim's lease; another worker may have taken some
+        return [row.id for row in connection.execute(
+            db.select(table.c.id).where(
+                table.c.id.in_(ids),
+                table.c.status == 'sending',
+                table.c.next_attempt_at == lease_until
+            )
+        )]
+
+def _to_message(email):
+    return Message(
+        subject=email.subject,
+        recipients=[address for address in email.recipients.split(',') if address],
+        body=email.body,
+        html=email.html
+    )
+
+def _mark_failed_attempt(app, email, error):
+    email.attempts += 1
+    email.last_error = str(error)[:2000]
+    if email.attempts >= app.config.get('MAIL_QUEUE_MAX_ATTEMPTS', 5):
+        email.status = 'failed'
+        logger.error("Giving up on email %s after %d attempts: %s", email.id, email.attempts, error)
+    else:
+        email.status = 'pending'
+        email.next_attempt_at = datetime.utcnow() + _backoff(app, email.attempts)
+
+def send_queued_mail(app, batch_size=None, max_batches=None):
+    """
+    Send due messages, one SMTP connection per batch
+
+    A failure to connect puts the whole batch back for a retry; a failure
+    on one message only affects that message.
+
+    Returns:
+        tuple: (sent, failed) counts, where failed includes messages
+        rescheduled for a retry
+    """
+    batch_size = batch_size or app.config.get('MAIL_QUEUE_BATCH_SIZE', 50)
+    sent = failed = batches = 0
+
+    with app.app_context():
+        mail = app.extensions['mail']
+        try:
+            while max_batches is None or batches < max_batches:
+                ids = _claim_batch(app, batch_size)
+                if not ids:
+                    break
+                batches += 1
+                emails = OutboundEmail.query.filter(OutboundEmail.id.in_(ids)).order_by(OutboundEmail.id).all()
+
+                try:
+                    with mail.connect() as connection:
+                        for email in emails:
+                            try:
+                                connection.send(_to_message(email))
+                            except Exception as e:
+                                logger.warning("Sending email %s failed: %s", email.id, e)
+                                _mark_failed_attempt(app, email, e)
+                                failed += 1
+                            else:
+                                email.status = 'sent'
+                                email.sent_at = datetime.utcnow()
+                                email.last_error = None
+                                sent += 1
+                            # Record each outcome right away so a crash can't resend it
+                            db.session.commit()
+                except Exception as e:
+                    # Connecting (or closing) failed; retry whatever wasn't handled
+                    logger.warning("SMTP connection to %s failed: %s", app.config.get('MAIL_SERVER'), e)
+                    db.session.rollback()
+                    for email in emails:
+                        if email.status == 'sending':
+                            _mark_failed_attempt(app, email, e)
+                            failed += 1
+                    db.session.commit()
+        finally:
+            db.session.remove()
+
+    return sent, failed
+
+def purge_sent_mail(older_than_days=30):
+    """Delete sent messages older than the given age"""
+    cutoff = datetime.utcnow() - timedelta(days=older_than_days)
+    deleted = OutboundEmail.query.filter(
+        OutboundEmail.status == 'sent',
+        OutboundEmail.sent_at < cutoff
+    ).delete(synchronize_session=False)
+    db.session.commit()
+    return deleted
@@ -0,0 +1,132 @@
+"""
+Password hashing for the HR System.
+Runs argon2 hashing and verification under a concurrency cap so a burst of
+logins can't occupy every worker thread with CPU-bound hashing, and keeps
+counters for the admin metrics page.
+
+argon2-cffi releases the GIL while hashing, so callers hash on their own
+thread once they hold one of the max_concurrency slots; callers that can't
+get a slot within queue_timeout seconds get PasswordHashingBusy instead of
+queueing without bound.
+"""
+
+import time
+import threading
+from argon2 import PasswordHasher
+from argon2.exceptions import VerifyMismatchError, VerificationError, InvalidHashError
+
+class PasswordHashingBusy(Exception):
+    """Raised when no hashing slot frees up within the queue timeout"""
+
+class PasswordHashingPool:
+    """Bounded argon2 hasher with wait/run time and rejection counters"""
+
+    def __init__(self, hasher=None, max_concurrency=4, queue_timeout=5.0):
+        self.configure(hasher, max_concurrency, queue_timeout)
+        self._stats_lock = threading.Lock()
+        self.reset_stats()
+
+    def configure(self, hasher=None, max_concurrency=4, queue_timeout=5.0):
+        """Replace the hasher parameters and the concurrency cap"""
+        self.hasher = hasher or PasswordHasher()
+        self.max_concurrency = max_concurrency
+        self.queue_timeout = queue_timeout
+        self._slots = threading.BoundedSemaphore(max_concurrency)
+
+    def reset_stats(self):
+        with self._stats_lock:
+            self.in_flight = 0
+            self.peak_in_flight = 0
+            self.completed = 0
+            self.rejected = 0
+            self.rehashed = 0
+            self.wait_seconds = 0.0
+            self.run_seconds = 0.0
+
+    def _run(self, operation, *args):
+        """Run a hasher operation once a slot is free"""
+        # Hold on to this semaphore in case configure() swaps it meanwhile
+        slots = self._slots
+        queued = time.perf_counter()
+        if not slots.acquire(timeout=self.queue_timeout):
+            with self._stats_lock:
+                self.rejected += 1
+            raise PasswordHashingBusy("Too many concurrent password hashing requests")
+
+        started = time.perf_counter()
+        with self._stats_lock:
+            self.in_flight += 1
+            self.peak_in_flight = max(self.peak_in_flight, self.in_flight)
+            self.wait_seconds += started - queued
+        try:
+            return operation(*args)
+        finally:
+            slots.release()
+            with self._stats_lock:
+                self.in_flight -= 1
+                self.completed += 1
+                self.run_seconds += time.perf_counter() - started
+
+    def hash(self, password):
+        """Hash a password with the current parameters"""
+        return self._run(self.hasher.hash, password)
+
+    def verify(self, password_hash, password):
+        """Return True if the password matches the hash"""
+        try:
+            return self._run(self.hasher.verify, password_hash, password)
+        except (VerifyMismatchError, VerificationError, InvalidHashError):
+            return False
+
+    def needs_rehash(self, password_hash):
+        """True when the hash was made with other parameters than the current ones"""
+        try:
+            return self.hasher.check_needs_rehash(password_hash)
+        except InvalidHashError:
+            return False
+
+    def record_rehash(self):
+        with self._stats_lock:
+            self.rehashed += 1
+
+    def stats(self):
+        """Current load and counters"""
+        with self._stats_lock:
+            return {
+                'max_concurrency': self.max_concurrency,
+                'queue_timeout': self.queue_timeout,
+                'time_cost': self.hasher.time_cost,
+                'memory_cost': self.hasher.memory_cost,
+                'parallelism': self.hasher.parallelism,
+                'in_flight': self.in_flight,
+                'peak_in_flight': self.peak_in_flight,
+                'completed': self.completed,
+                'rejected': self.rejected,
+                'rehashed': self.rehashed,
+                'avg_wait_ms': round(self.wait_seconds / self.completed * 1000, 1) if self.completed else None,
+                'avg_run_ms': round(self.run_seconds / self.completed * 1000, 1) if self.completed else None
+            }
+
+# Shared by every request; reconfigured from the app config at startup
+password_hashing = PasswordHashingPool()
+
+def build_hasher(time_cost=None, memory_cost=None, parallelism=None):
+    """PasswordHasher with the given costs, falling back to argon2-cffi's defaults"""
+    defaults = PasswordHasher()
+    return PasswordHasher(
+        time_cost=time_cost or defaults.time_cost,
+        memory_cost=memory_cost or defaults.memory_cost,
+        parallelism=parallelism or defaults.parallelism
+    )
+
+def init_password_hashing(app):
+    """Apply the ARGON2_* and PASSWORD_HASH_* settings"""
+    password_hashing.configure(
+        hasher=build_hasher(
+            time_cost=app.config.get('ARGON2_TIME_COST'),
+            memory_cost=app.config.get('ARGON2_MEMORY_COST'),
+            parallelism=app.config.get('ARGON2_PARALLELISM')
+        ),
+        max_concurrency=app.config['PASSWORD_HASH_CONCURRENCY'],
+        queue_timeout=app.config['PASSWORD_HASH_QUEUE_TIMEOUT']
+    )
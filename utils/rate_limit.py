@@ -0,0 +1,279 @@
+"""
+Login rate limiting for the HR System.
+Answers "is this client locked out?" from a pluggable backend instead of
+counting LoginAttempt rows, and writes the LoginAttempt audit trail in
+batches off the request path.
+
+Backends:
+    memory    sliding window of failure times per client, per process
+    database  token bucket per client in the login_throttle table, shared
+              by every instance of the app
+"""
+
+import time
+import queue
+import atexit
+import logging
+import threading
+from collections import OrderedDict, deque
+from datetime import datetime
+from flask import current_app
+from sqlalchemy.exc import IntegrityError
+from models import db, LoginAttempt, LoginThrottle
+
+logger = logging.getLogger(__name__)
+
+class MemoryRateLimitBackend:
+    """
+    Sliding window of failed attempts per key, kept in process memory
+
+    A key is locked once it has max_attempts failures inside the window and
+    unlocks one window after its latest failure. Only the most recently
+    used max_keys keys are tracked.
+    """
+
+    def __init__(self, max_attempts, window_seconds, max_keys=100000):
+        self.max_attempts = max_attempts
+        self.window_seconds = window_seconds
+        self.max_keys = max_keys
+        self._failures = OrderedDict()
+        self._lock = threading.Lock()
+
+    def _window(self, key, now):
+        failures = self._failures.get(key)
+        if failures is None:
+            return None
+        # A locked key stays locked until one window after its latest failure
+        if len(failures) >= self.max_attempts and failures[-1] > now - self.window_seconds:
+            return failures
+        while failures and failures[0] <= now - self.window_seconds:
+            failures.popleft()
+        if not failures:
+            del self._failures[key]
+            return None
+        return failures
+
+    def _status(self, failures, now):
+        count = len(failures) if failures else 0
+        retry_after = 0
+        if count >= self.max_attempts:
+            retry_after = failures[-1] + self.window_seconds - now
+        return max(self.max_attempts - count, 0), retry_after
+
+    def peek(self, key, now):
+        with self._lock:
+            return self._status(self._window(key, now), now)
+
+    def consume(self, key, now):
+        with self._lock:
+            failures = self._window(key, now)
+            if failures is None:
+                failures = self._failures[key] = deque(maxlen=self.max_attempts)
+            failures.append(now)
+            self._failures.move_to_end(key)
+            while len(self._failures) > self.max_keys:
+                self._failures.popitem(last=False)
+            return self._status(failures, now)
+
+    def reset(self, key):
+        with self._lock:
+            self._failures.pop(key, None)
+
+class DatabaseRateLimitBackend:
+    """
+    Token bucket per key in the login_throttle table
+
+    Each key holds up to max_attempts tokens, refilled at max_attempts per
+    window; a failed attempt takes one token and a key without a whole
+    token is locked until one refills. Rows are updated under SELECT ...
+    FOR UPDATE so concurrent instances see each other's failures.
+    """
+
+    def __init__(self, max_attempts, window_seconds):
+        self.max_attempts = max_attempts
+        self.window_seconds = window_seconds
+        self.refill_rate = max_attempts / window_seconds
+
+    def _status(self, tokens):
+        retry_after = (1 - tokens) / self.refill_rate if tokens < 1 else 0
+        return int(tokens), retry_after
+
+    def _refilled(self, row, now):
+        if row is None:
+            return float(self.max_attempts)
+        return min(self.max_attempts, row.tokens + (now - row.updated_at) * self.refill_rate)
+
+    def peek(self, key, now):
+        table = LoginThrottle.__table__
+        with db.engine.connect() as connection:
+            row = connection.execute(
+                db.select(table.c.tokens, table.c.updated_at).where(table.c.key == key)
+            ).first()
+        return self._status(self._refilled(row, now))
+
+    def consume(self, key, now):
+        table = LoginThrottle.__table__
+        # Retry once if another instance inserted the key first
+        for _ in range(2):
+            try:
+                with db.engine.begin() as connection:
+                    row = connection.execute(
+                        db.select(table.c.tokens, table.c.updated_at)
+                        .where(table.c.key == key).with_for_update()
+                    ).first()
+                    tokens = max(self._refilled(row, now) - 1, 0)
+                    if row is None:
+                        connection.execute(table.insert().values(key=key, tokens=tokens, updated_at=now))
+                    else:
+                        connection.execute(
+                            table.update().where(table.c.key == key).values(tokens=tokens, updated_at=now)
+                        )
+                return self._status(tokens)
+            except IntegrityError:
+                continue
+        return self.peek(key, now)
+
+    def reset(self, key):
+        table = LoginThrottle.__table__
+        with db.engine.begin() as connection:
+            connection.execute(table.delete().where(table.c.key == key))
+
+RATE_LIMIT_BACKENDS = {
+    'memory': MemoryRateLimitBackend,
+    'database': DatabaseRateLimitBackend,
+}
+
+class LoginRateLimiter:
+    """Tracks failed logins per client and reports lockouts"""
+
+    def __init__(self, backend):
+        self.backend = backend
+        self.max_attempts = backend.max_attempts
+
+    def _result(self, remaining, retry_after):
+        """(is_limited, message, remaining_attempts), as the login route expects"""
+        if retry_after > 0:
+            seconds = int(retry_after) + 1
+            message = f"Too many failed login attempts. Please try again in {seconds // 60}m {seconds % 60}s."
+            return True, message, 0
+        return False, None, remaining
+
+    def check(self, key):
+        """Lockout status of a client without recording anything"""
+        return self._result(*self.backend.peek(key, time.time()))
+
+    def record_failure(self, key):
+        """Record a failed login and return the updated lockout status"""
+        return self._result(*self.backend.consume(key, time.time()))
+
+    def reset(self, key):
+        """Clear a client's failures (e.g. when an administrator lifts a lockout)"""
+        self.backend.reset(key)
+
+class LoginAuditWriter:
+    """
+    Writes LoginAttempt rows from a background thread in batches
+
+    Rows are queued by the request and inserted with one executemany per
+    batch_size rows or flush_interval seconds, whichever comes first. In
+    'sync' mode (for serverless deployments where threads do not outlive
+    the request) each row is inserted immediately on its own connection.
+    """
+
+    def __init__(self, app, mode='batch', batch_size=50, flush_interval=2.0):
+        self.app = app
+        self.mode = mode
+        self.batch_size = batch_size
+        self.flush_interval = flush_interval
+        self._queue = queue.Queue()
+        self._thread = None
+        self._lock = threading.Lock()
+
+    def record(self, ip_address, username_or_email=None, success=False, user_agent=None):
+        """Queue one audit row"""
+        row = {
+            'ip_address': ip_address,
+            'username_or_email': username_or_email,
+            'success': success,
+            'timestamp': datetime.utcnow(),
+            'user_agent': user_agent[:255] if user_agent else user_agent
+        }
+        if self.mode == 'sync':
+            self._insert([row])
+            return
+        self._queue.put(row)
+        self._ensure_thread()
+
+    def _ensure_thread(self):
+        with self._lock:
+            if self._thread is None:
+                # Rows still queued at shutdown are written by the exiting process
+                atexit.register(self.flush)
+            if self._thread is None or not self._thread.is_alive():
+                self._thread = threading.Thread(target=self._run, name='login-audit', daemon=True)
+                self._thread.start()
+
+    def _insert(self, rows):
+        with self.app.app_context():
+            with db.engine.begin() as connection:
+                connection.execute(LoginAttempt.__table__.insert(), rows)
+
+    def _drain(self, first=None):
+        """Take up to batch_size queued rows"""
+        rows = [] if first is None else [first]
+        while len(rows) < self.batch_size:
+            try:
+                rows.append(self._queue.get_nowait())
+            except queue.Empty:
+                break
+        return rows
+
+    def _write(self, rows):
+        try:
+            self._insert(rows)
+        except Exception:
+            logger.exception("Failed to write %d login attempts", len(rows))
+
+    def _run(self):
+        while True:
+            first = self._queue.get()
+            # Give a burst time to collect into one batch
+            deadline = time.monotonic() + self.flush_interval
+            rows = [first]
+            while len(rows) < self.batch_size:
+                try:
+                    rows.append(self._queue.get(timeout=max(deadline - time.monotonic(), 0)))
+                except queue.Empty:
+                    break
+            self._write(rows)
+
+    def flush(self):
+        """Write everything queued so far from the calling thread"""
+        rows = self._drain()
+        while rows:
+            self._write(rows)
+            rows = self._drain()
+
+def init_login_rate_limit(app):
+    """Create the login rate limiter and audit writer configured for the app"""
+    backend_class = RATE_LIMIT_BACKENDS[app.config['LOGIN_RATE_LIMIT_BACKEND']]
+    backend = backend_class(
+        max_attempts=app.config['LOGIN_RATE_LIMIT_ATTEMPTS'],
+        window_seconds=app.config['LOGIN_RATE_LIMIT_WINDOW']
+    )
+    app.extensions['login_rate_limiter'] = LoginRateLimiter(backend)
+    app.extensions['login_audit_writer'] = LoginAuditWriter(
+        app,
+        mode=app.config['LOGIN_AUDIT_WRITER'],
+        batch_size=app.config['LOGIN_AUDIT_BATCH_SIZE'],
+        flush_interval=app.config['LOGIN_AUDIT_FLUSH_SECONDS']
+    )
+
+def get_login_rate_limiter():
+    return current_app.extensions['login_rate_limiter']
+
+def record_login_attempt(ip_address, username_or_email=None, success=False, user_agent=None):
+    """Add a LoginAttempt audit row without holding up the request"""
+    current_app.extensions['login_audit_writer'].record(
+        ip_address, username_or_email, success=success, user_agent=user_agent
+    )
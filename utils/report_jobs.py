@@ -0,0 +1,217 @@
+"""
+Background report export jobs for the HR System.
+Queues long-running report exports in the report_job table and builds them
+outside the request, either on an in-process thread pool or from the
+`flask run-report-jobs` command. Jobs still running REPORT_JOB_TIMEOUT
+seconds after they started are marked failed, since their worker has died
+(or its serverless function was frozen) and nothing else would finish them.
+"""
+
+import os
+import json
+import logging
+from concurrent.futures import ThreadPoolExecutor
+from datetime import datetime, timedelta
+from threading import Lock
+from flask import current_app
+from models import db, ReportJob
+
+logger = logging.getLogger(__name__)
+
+# Export builders by job kind. Each builder takes (params, progress) and
+# returns a (path, filename, mimetype) tuple for the generated file.
+REPORT_BUILDERS = {}
+
+_executor = None
+_executor_lock = Lock()
+
+def register_report_builder(kind, builder):
+    """Register the export builder used for a report job kind"""
+    REPORT_BUILDERS[kind] = builder
+    return builder
+
+def _get_executor(app):
+    """Create the worker pool on first use"""
+    global _executor
+    with _executor_lock:
+        if _executor is None:
+            _executor = ThreadPoolExecutor(
+                max_workers=app.config.get('REPORT_JOB_WORKERS', 2),
+                thread_name_prefix='report-job'
+            )
+        return _executor
+
+def enqueue_report_job(kind, params, user_id):
+    """
+    Create a pending report job and hand it to the worker
+
+    With REPORT_JOB_RUNNER set to 'external' the job is only queued and is
+    picked up by `flask run-report-jobs` (for serverless deployments where
+    threads do not outlive the request).
+
+    Returns:
+        ReportJob: The queued job
+    """
+    if kind not in REPORT_BUILDERS:
+        raise ValueError(f"Unknown report type: {kind}")
+
+    job = ReportJob(
+        kind=kind,
+        params=json.dumps(params),
+        requested_by=user_id,
+        message='Waiting for a worker'
+    )
+    db.session.add(job)
+    db.session.commit()
+
+    app = current_app._get_current_object()
+    if app.config.get('REPORT_JOB_RUNNER', 'thread') == 'thread':
+        _get_executor(app).submit(run_report_job, app, job.id)
+
+    return job
+
+def _update_job(job_id, **values):
+    """Write job state on its own connection so the worker session is untouched"""
+    with db.engine.begin() as connection:
+        connection.execute(
+            ReportJob.__table__.update().where(ReportJob.id == job_id).values(**values)
+        )
+
+def _claim_job(job_id):
+    """Move a pending job to running; returns False if another worker got it first"""
+    with db.engine.begin() as connection:
+        result = connection.execute(
+            ReportJob.__table__.update()
+            .where(ReportJob.id == job_id, ReportJob.status == 'pending')
+            .values(status='running', progress=0, started_at=datetime.utcnow(),
+                    message='Starting export')
+        )
+        return result.rowcount == 1
+
+def expire_stale_jobs(timeout=None, job_id=None):
+    """
+    Fail running jobs whose worker has been gone for longer than the timeout
+
+    Args:
+        timeout: Seconds a job may run (default REPORT_JOB_TIMEOUT)
+        job_id: Only check this job
+
+    Returns:
+        int: Number of jobs marked failed
+    """
+    if timeout is None:
+        timeout = current_app.config.get('REPORT_JOB_TIMEOUT', 900)
+    now = datetime.utcnow()
+    conditions = [
+        ReportJob.status == 'running',
+        ReportJob.started_at < now - timedelta(seconds=timeout)
+    ]
+    if job_id is not None:
+        conditions.append(ReportJob.id == job_id)
+
+    with db.engine.begin() as connection:
+        expired = connection.execute(
+            ReportJob.__table__.update().where(*conditions).values(
+                status='failed',
+                message='Export timed out',
+                error=f"The export did not finish within {timeout} seconds",
+                finished_at=now
+            )
+        ).rowcount
+    if expired:
+        logger.warning("Marked %s stale report job(s) as failed", expired)
+    return expired
+
+def run_report_job(app, job_id):
+    """
+    Build the export for a single job and store the artifact
+
+    Returns:
+        bool: True if the job completed, False if it failed, None if it
+        was no longer pending
+    """
+    with app.app_context():
+        if not _claim_job(job_id):
+            return None
+
+        job = db.session.get(ReportJob, job_id)
+        builder = REPORT_BUILDERS.get(job.kind)
+
+        def progress(percent, message=None):
+            _update_job(job_id, progress=int(percent), message=message)
+
+        path = None
+        try:
+            if builder is None:
+                raise ValueError(f"Unknown report type: {job.kind}")
+
+            path, filename, mimetype = builder(json.loads(job.params or '{}'), progress)
+            progress(90, 'Saving export')
+
+            with open(path, 'rb') as artifact_file:
+                artifact = artifact_file.read()
+
+            db.session.rollback()
+            _update_job(
+                job_id,
+                status='completed',
+                progress=100,
+                message='Export ready',
+                filename=filename,
+                mimetype=mimetype,
+                artifact=artifact,
+                finished_at=datetime.utcnow()
+            )
+            return True
+        except Exception as e:
+            logger.exception("Report job %s failed", job_id)
+            db.session.rollback()
+            _update_job(
+                job_id,
+                status='failed',
+                message='Export failed',
+                error=str(e),
+                finished_at=datetime.utcnow()
+            )
+            return False
+        finally:
+            if path and os.path.exists(path):
+                os.remove(path)
+            db.session.remove()
+
+def run_pending_jobs(app, limit=None):
+    """
+    Run queued jobs one after another in the calling process
+
+    Returns:
+        tuple: (completed, failed) counts
+    """
+    with app.app_context():
+        expire_stale_jobs()
+        query = db.session.query(ReportJob.id).filter(
+            ReportJob.status == 'pending'
+        ).order_by(ReportJob.created_at)
+        if limit:
+            query = query.limit(limit)
+        job_ids = [row.id for row in query.all()]
+        db.session.remove()
+
+    completed = failed = 0
+    for job_id in job_ids:
+        result = run_report_job(app, job_id)
+        if result is True:
+            completed += 1
+        elif result is False:
+            failed += 1
+
+    return completed, failed
+
+def purge_report_jobs(older_than_days=7):
+    """Delete finished jobs (and their artifacts) older than the given age"""
+    cutoff = datetime.utcnow() - timedelta(days=older_than_days)
+    deleted = ReportJob.query.filter(
+        ReportJob.status.in_(['completed', 'failed']),
+        ReportJob.finished_at < cutoff
+    ).delete(synchronize_session=False)
+    db.session.commit()
+    return deleted
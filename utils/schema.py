@@ -0,0 +1,30 @@
+"""
+Schema upgrades for the HR System.
+Creates tables declared on the models that an existing database does not
+have yet (report_job, outbound_email, login_throttle, login_attempt_daily,
+chat_conversation, ...). Deployments where init_db() does not run, such as
+Vercel, pick them up through `flask create-tables` or /db/run-migrations.
+"""
+
+from models import db
+
+def missing_tables(engine=None):
+    """Model tables the database does not have, in dependency order"""
+    inspector = db.inspect(engine or db.engine)
+    return [table for table in db.metadata.sorted_tables if not inspector.has_table(table.name)]
+
+def create_missing_tables(engine=None):
+    """
+    Create the missing model tables with their indexes
+
+    Existing tables are left as they are; indexes added to them later are
+    created by `flask create-indexes`.
+
+    Returns:
+        list: Names of the tables created
+    """
+    engine = engine or db.engine
+    tables = missing_tables(engine)
+    if tables:
+        db.metadata.create_all(engine, tables=tables)
+    return [table.name for table in tables]
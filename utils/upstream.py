@@ -0,0 +1,248 @@
+"""
+Upstream call guarding for the HR System.
+Wraps calls to slow external services (the Gemini API) in a concurrency
+cap, a per-call deadline and a circuit breaker, so a slow or failing
+upstream ties up at most max_concurrency worker threads instead of all of
+them, and callers fail fast while it is down.
+
+The deadline is handed to the operation (the Gemini SDK enforces it as
+its HTTP timeout) and checked between chunks of a streamed response.
+After failure_threshold consecutive failures the breaker opens and calls
+are refused for reset_timeout seconds; then one probe call is let
+through, and its outcome closes the breaker or opens it again.
+"""
+
+import time
+import threading
+from collections import deque
+
+class UpstreamUnavailable(Exception):
+    """Raised instead of calling the upstream service"""
+
+class UpstreamBusy(UpstreamUnavailable):
+    """Raised when no call slot frees up within the queue timeout"""
+
+class CircuitOpen(UpstreamUnavailable):
+    """Raised while the circuit breaker is refusing calls"""
+
+class UpstreamTimeout(UpstreamUnavailable):
+    """Raised when a call runs past its deadline"""
+
+class CircuitBreaker:
+    """Consecutive failure counter with closed, open and half-open states"""
+
+    CLOSED = 'closed'
+    OPEN = 'open'
+    HALF_OPEN = 'half_open'
+
+    def __init__(self, failure_threshold=5, reset_timeout=30.0):
+        self.failure_threshold = failure_threshold
+        self.reset_timeout = reset_timeout
+        self._lock = threading.Lock()
+        self.state = self.CLOSED
+        self.consecutive_failures = 0
+        self.opened_at = None
+        self.times_opened = 0
+        self._probing = False
+
+    def allow(self):
+        """True if a call may go ahead; in half-open state only one probe at a time"""
+        with self._lock:
+            if self.state == self.OPEN and time.monotonic() - self.opened_at >= self.reset_timeout:
+                self.state = self.HALF_OPEN
+            if self.state == self.CLOSED:
+                return True
+            if self.state == self.HALF_OPEN and not self._probing:
+                self._probing = True
+                return True
+            return False
+
+    def release(self):
+        """Give back a probe that never reached the upstream"""
+        with self._lock:
+            self._probing = False
+
+    def record_success(self):
+        with self._lock:
+            self.state = self.CLOSED
+            self.consecutive_failures = 0
+            self._probing = False
+
+    def record_failure(self):
+        with self._lock:
+            self.consecutive_failures += 1
+            if self.state == self.HALF_OPEN or self.consecutive_failures >= self.failure_threshold:
+                if self.state != self.OPEN:
+                    self.times_opened += 1
+                self.state = self.OPEN
+                self.opened_at = time.monotonic()
+            self._probing = False
+
+    def stats(self):
+        with self._lock:
+            return {
+                'state': self.state,
+                'consecutive_failures': self.consecutive_failures,
+                'failure_threshold': self.failure_threshold,
+                'reset_timeout': self.reset_timeout,
+                'times_opened': self.times_opened,
+                'open_for_seconds': round(time.monotonic() - self.opened_at, 1) if self.state == self.OPEN else None
+            }
+
+class UpstreamGuard:
+    """Concurrency cap, deadline and circuit breaker for calls to one upstream service"""
+
+    def __init__(self, name, max_concurrency=4, queue_timeout=2.0, deadline=20.0,
+                 failure_threshold=5, reset_timeout=30.0, latency_samples=200):
+        self.name = name
+        self._stats_lock = threading.Lock()
+        self._latencies = deque(maxlen=latency_samples)
+        self.configure(max_concurrency, queue_timeout, deadline, failure_threshold, reset_timeout)
+        self.reset_stats()
+
+    def configure(self, max_concurrency=4, queue_timeout=2.0, deadline=20.0, failure_threshold=5, reset_timeout=30.0):
+        """Replace the limits; the breaker starts closed"""
+        self.max_concurrency = max_concurrency
+        self.queue_timeout = queue_timeout
+        self.deadline = deadline
+        self._slots = threading.BoundedSemaphore(max_concurrency)
+        self.breaker = CircuitBreaker(failure_threshold, reset_timeout)
+
+    def reset_stats(self):
+        with self._stats_lock:
+            self.in_flight = 0
+            self.peak_in_flight = 0
+            self.completed = 0
+            self.failures = 0
+            self.timeouts = 0
+            self.rejected_busy = 0
+            self.rejected_open = 0
+            self._latencies.clear()
+
+    def _enter(self):
+        """
+        Take a call slot once the breaker allows it
+
+        Returns:
+            tuple: (semaphore to release, monotonic start time)
+        """
+        if not self.breaker.allow():
+            with self._stats_lock:
+                self.rejected_open += 1
+            raise CircuitOpen(f"{self.name} is unavailable; not calling it for now")
+
+        # Hold on to this semaphore in case configure() swaps it meanwhile
+        slots = self._slots
+        if not slots.acquire(timeout=min(self.queue_timeout, self.deadline)):
+            self.breaker.release()
+            with self._stats_lock:
+                self.rejected_busy += 1
+            raise UpstreamBusy(f"Too many concurrent {self.name} calls")
+
+        started = time.monotonic()
+        with self._stats_lock:
+            self.in_flight += 1
+            self.peak_in_flight = max(self.peak_in_flight, self.in_flight)
+        return slots, started
+
+    def _exit(self, slots, started, error=None, aborted=False):
+        """Release the slot and record the outcome"""
+        slots.release()
+        elapsed = time.monotonic() - started
+        timed_out = error is not None and (isinstance(error, UpstreamTimeout) or elapsed >= self.deadline)
+        if aborted:
+            # The caller stopped reading; says nothing about the upstream
+            self.breaker.release()
+        elif error is None:
+            self.breaker.record_success()
+        else:
+            self.breaker.record_failure()
+        with self._stats_lock:
+            self.in_flight -= 1
+            self.completed += 1
+            self._latencies.append(elapsed)
+            if error is not None:
+                self.failures += 1
+                if timed_out:
+                    self.timeouts += 1
+        return timed_out
+
+    def call(self, operation):
+        """
+        Run operation(timeout) under the guard
+
+        Args:
+            operation: Callable making the upstream call, given the seconds
+                it may take; it is expected to enforce them itself
+
+        Raises:
+            UpstreamUnavailable: When the call is refused or times out
+        """
+        slots, started = self._enter()
+        try:
+            result = operation(self.deadline)
+        except Exception as e:
+            if self._exit(slots, started, error=e):
+                raise UpstreamTimeout(f"{self.name} call exceeded {self.deadline}s") from e
+            raise
+        self._exit(slots, started)
+        return result
+
+    def stream(self, operation):
+        """
+        Iterate the chunks of operation(timeout) under the guard
+
+        The slot is held until the stream ends, and the deadline covers the
+        whole stream: a stream still running past it is abandoned with
+        UpstreamTimeout at the next chunk.
+        """
+        slots, started = self._enter()
+        try:
+            for chunk in operation(self.deadline):
+                if time.monotonic() - started > self.deadline:
+                    raise UpstreamTimeout(f"{self.name} stream exceeded {self.deadline}s")
+                yield chunk
+        except GeneratorExit:
+            self._exit(slots, started, aborted=True)
+            raise
+        except Exception as e:
+            if self._exit(slots, started, error=e) and not isinstance(e, UpstreamTimeout):
+                raise UpstreamTimeout(f"{self.name} stream exceeded {self.deadline}s") from e
+            raise
+        self._exit(slots, started)
+
+    def stats(self):
+        """Load, latency and breaker state"""
+        with self._stats_lock:
+            latencies = sorted(self._latencies)
+            stats = {
+                'name': self.name,
+                'max_concurrency': self.max_concurrency,
+                'queue_timeout': self.queue_timeout,
+                'deadline': self.deadline,
+                'in_flight': self.in_flight,
+                'peak_in_flight': self.peak_in_flight,
+                'completed': self.completed,
+                'failures': self.failures,
+                'timeouts': self.timeouts,
+                'rejected_busy': self.rejected_busy,
+                'rejected_open': self.rejected_open,
+                'p50_ms': round(latencies[len(latencies) // 2] * 1000, 1) if latencies else None,
+                'p95_ms': round(latencies[int(len(latencies) * 0.95)] * 1000, 1) if latencies else None,
+                'max_ms': round(latencies[-1] * 1000, 1) if latencies else None
+            }
+        stats['breaker'] = self.breaker.stats()
+        return stats
+
+# Shared by every request; reconfigured from the app config at startup
+gemini_guard = UpstreamGuard('gemini')
+
+def init_gemini_guard(app):
+    """Apply the GEMINI_* call limits"""
+    gemini_guard.configure(
+        max_concurrency=app.config['GEMINI_MAX_CONCURRENCY'],
+        queue_timeout=app.config['GEMINI_QUEUE_TIMEOUT'],
+        deadline=app.config['GEMINI_TIMEOUT'],
+        failure_threshold=app.config['GEMINI_BREAKER_FAILURES'],
+        reset_timeout=app.config['GEMINI_BREAKER_RESET']
+    )
@@ -0,0 +1,95 @@
+"""
+Streaming Excel export helpers for the HR System.
+Writes rows straight from query results into xlsxwriter's constant_memory
+mode and spools the workbook to a temporary file, so an export never holds
+the whole dataset (or a pandas DataFrame) in memory.
+"""
+
+import tempfile
+
+XLSX_MIMETYPE = 'application/vnd.openxmlformats-officedocument.spreadsheetml.sheet'
+
+# Rows fetched per round trip when streaming query results
+DEFAULT_BATCH_SIZE = 1000
+
+
+def stream_query(query, batch_size=DEFAULT_BATCH_SIZE):
+    """
+    Iterate over a query in batches instead of loading every row at once
+
+    On PostgreSQL this uses a server-side cursor, so memory use stays flat
+    regardless of the number of rows.
+    """
+    return query.execution_options(yield_per=batch_size, stream_results=True)
+
+
+class StreamingWorkbook:
+    """xlsxwriter workbook in constant_memory mode, spooled to a temp file"""
+
+    def __init__(self, path=None):
+        # Imported here so the app starts without xlsxwriter installed
+        import xlsxwriter
+
+        if path is None:
+            with tempfile.NamedTemporaryFile(suffix='.xlsx', delete=False) as temp_file:
+                path = temp_file.name
+
+        self.path = path
+        self.workbook = xlsxwriter.Workbook(path, {
+            'constant_memory': True,
+            'tmpdir': tempfile.gettempdir(),
+            'default_date_format': 'yyyy-mm-dd',
+            'remove_timezone': True,
+        })
+        self.header_format = self.workbook.add_format({'bold': True})
+
+    def add_worksheet(self, name):
+        """Add a free-form worksheet (cells must still be written in row order)"""
+        return self.workbook.add_worksheet(name)
+
+    def write_sheet(self, name, headers, rows):
+        """
+        Write a header row followed by rows from any iterable
+
+        Each row is flushed to disk as soon as the next one starts, so rows
+        can come straight from a streaming query or generator.
+
+        Returns:
+            int: Number of data rows written
+        """
+        worksheet = self.workbook.add_worksheet(name)
+        worksheet.write_row(0, 0, headers, self.header_format)
+
+        count = 0
+        for count, row in enumerate(rows, start=1):
+            worksheet.write_row(count, 0, row)
+
+        return count
+
+    def sheet_writer(self, name, headers):
+        """
+        Start a worksheet and return a function that appends one row to it
+
+        Useful when rows are produced by a callback rather than an iterable.
+        """
+        worksheet = self.workbook.add_worksheet(name)
+        worksheet.write_row(0, 0, headers, self.header_format)
+        state = {'row': 0}
+
+        def write(row):
+            state['row'] += 1
+            worksheet.write_row(state['row'], 0, row)
+
+        return write
+
+    def close(self):
+        """Finish the workbook and return the path of the file"""
+        self.workbook.close()
+        return self.path
+
+    def __enter__(self):
+        return self
+
+    def __exit__(self, exc_type, exc_value, traceback):
+        self.workbook.close()
+        return False
@@ -2,10 +2,8 @@
 WSGI entry point for the application.
 This file is used by Gunicorn and other WSGI servers.
 """
-from app import create_app
-
-# Create the Flask application
-application = create_app()
+# app.py creates the application on import; reuse it rather than building a second one
+from app import app as application
 
 # For compatibility with some platforms
 app = application